@@ -1,3 +1,16 @@
 from django.contrib import admin
+from .models import OutboundEmail, RevokedToken
 
-# Register your models here.
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('to_email',)
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ('jti', 'user', 'expires_at', 'created_at')
+    search_fields = ('jti', 'user__email')
+    raw_id_fields = ('user',)
@@ -0,0 +1,67 @@
+"""
+JWT authentication without a database query per request.
+
+simplejwt's JWTAuthentication loads the token's user on every request.
+CachedJWTAuthentication keeps the users it loaded in a per-process
+TTLCache (USER_CACHE_SIZE users, for USER_CACHE_TTL seconds) and gives
+each request its own copy. The User post_save/post_delete signals drop the
+user's entry, so deactivating, deleting or changing a user takes effect
+immediately in this process; the TTL bounds how long other processes, and
+updates that send no signals (QuerySet.update()), go unnoticed.
+
+It also refuses revoked tokens: those whose jti, or whose refresh token's
+jti, authentication.revocation holds, and those issued before the user's
+last revoke_tokens().
+"""
+import copy
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from authentication.revocation import revoked_tokens
+from authentication.tokens import REFRESH_JTI_CLAIM, token_version
+from utils.cache import TTLCache
+
+users = TTLCache("USER_CACHE_SIZE", "USER_CACHE_TTL")
+
+
+def invalidate_user(user_id=None):
+    """Drop the cached user with this id, or every cached user."""
+    if user_id is None:
+        users.discard()
+    else:
+        users.discard(lambda key, value: key == str(user_id))
+
+
+def check_token_version(token, user):
+    if token_version(token) != user.token_version:
+        raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revoked_tokens.is_revoked(token.get(api_settings.JTI_CLAIM), token.get(REFRESH_JTI_CLAIM)):
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = users.get(str(user_id)) if user_id is not None else None
+        if user is None:
+            # loads the user and checks it is active; inactive users are
+            # never cached
+            user = super().get_user(validated_token)
+            users.set(str(user_id), copy.copy(user))
+            check_token_version(validated_token, user)
+            return user
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        check_token_version(validated_token, user)
+        # requests may change their user, e.g. its permission caches
+        return copy.copy(user)
@@ -0,0 +1,14 @@
+from django.contrib.auth import hashers
+
+from authentication.hashing import hashing_pool
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher, hashing in the password hashing pool (see
+    authentication.hashing). Hashes are unchanged, so it reads and writes
+    the same pbkdf2_sha256 passwords.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        return hashing_pool.run(super().encode, password, salt, iterations)
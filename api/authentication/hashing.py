@@ -0,0 +1,99 @@
+"""
+Password hashing off the request threads.
+
+Hashing a password (PBKDF2, hundreds of thousands of iterations) takes a
+core for a good fraction of a second. It is done in a pool of
+PASSWORD_HASHING_WORKERS threads, which keeps a login burst from taking
+every core (hashlib releases the GIL while it hashes, so threads run in
+parallel). At most PASSWORD_HASHING_QUEUE hashes wait for a thread; past
+that, requests that need one fail at once with 503 and Retry-After rather
+than queue for longer than the client will wait.
+
+authentication.hashers.PBKDF2PasswordHasher sends every hash here, so sync
+code simply blocks on the result. Async views await it with ``arun()``
+and ``aauthenticate()``, leaving the thread that runs their queries free.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+pool_thread = threading.local()
+
+
+class HashingOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-ins at once, try again shortly.'
+    default_code = 'hashing_overloaded'
+
+    def __init__(self):
+        super().__init__()
+        # sent as Retry-After by DRF's exception handler
+        self.wait = settings.PASSWORD_HASHING_RETRY_AFTER
+
+
+def mark_pool_thread():
+    pool_thread.active = True
+
+
+class PasswordHashingPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+
+    def submit(self, func, *args):
+        """Run func(*args) in the pool; raises HashingOverloaded if the queue is full."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    settings.PASSWORD_HASHING_WORKERS, thread_name_prefix="password-hashing",
+                    initializer=mark_pool_thread)
+            if self._pending >= settings.PASSWORD_HASHING_WORKERS + settings.PASSWORD_HASHING_QUEUE:
+                raise HashingOverloaded()
+            self._pending += 1
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def run(self, func, *args):
+        if getattr(pool_thread, "active", False):
+            return func(*args)
+        return self.submit(func, *args).result()
+
+    async def arun(self, func, *args):
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+
+hashing_pool = PasswordHashingPool()
+
+
+async def aauthenticate(email, password):
+    """
+    auth.authenticate(email=email, password=password) for async views, with
+    ModelBackend's behaviour: unknown emails still cost a hash, so they take
+    as long as wrong passwords, inactive users are refused, and hashes made
+    with outdated parameters are replaced.
+    """
+    from authentication.models import User
+
+    user = await User.objects.filter(email=email).afirst()
+    if user is None:
+        await hashing_pool.arun(make_password, password)
+        return None
+    # check_password() calls its setter when the hash needs upgrading
+    outdated = []
+    if not await hashing_pool.arun(check_password, password, user.password, outdated.append):
+        return None
+    if outdated:
+        user.password = await hashing_pool.arun(make_password, password)
+        await user.asave(update_fields=["password"])
+    return user if user.is_active else None
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from authentication.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound emails, one SMTP connection per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None,
+                            help="emails per batch (default EMAIL_OUTBOX_BATCH_SIZE)")
+        parser.add_argument("--loop", action="store_true",
+                            help="keep polling the outbox instead of exiting once it is drained")
+        parser.add_argument("--interval", type=float, default=5,
+                            help="seconds to wait between polls when the outbox is empty")
+
+    def handle(self, *args, **options):
+        while True:
+            counts = deliver_batch(options["batch_size"])
+            if any(counts.values()):
+                self.stdout.write(
+                    f"sent {counts['sent']}, retrying {counts['retried']}, dead-lettered {counts['dead']}")
+                continue
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -1,6 +1,7 @@
 from django.db import models
+from django.utils import timezone
 from utils.models import TrackingModel
-from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.tokens import RefreshToken
 
 
 # Create your models here.
@@ -10,7 +11,8 @@ from django.contrib.auth.models import (
 
 class UserManager(BaseUserManager):
 
-    def create_user(self, username, email, password=None):
+    def create_user(self, username, email, password=None, encoded_password=None):
+        # encoded_password: the password already hashed, by make_password()
 
         if not username:
             raise ValueError('Users should have a username')
@@ -19,7 +21,10 @@ class UserManager(BaseUserManager):
             raise ValueError('Users should have a email')
         
         user = self.model(username=username, email=self.normalize_email(email))
-        user.set_password(password)
+        if encoded_password is not None:
+            user.password = encoded_password
+        else:
+            user.set_password(password)
         user.save()
 
         return user
@@ -46,6 +51,8 @@ class User(AbstractBaseUser, PermissionsMixin, TrackingModel):
     is_active = models.BooleanField(default=True)
     is_schoolrep = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
+    # bumped by revoke_tokens(); tokens carrying an older version are refused
+    token_version = models.PositiveIntegerField(default=0)
     # auth_provider = models.CharField(
     #     max_length=255, blank=False,
     #     null=False, default=AUTH_PROVIDERS.get('email'))
@@ -65,6 +72,59 @@ class User(AbstractBaseUser, PermissionsMixin, TrackingModel):
             'access': str(refresh.access_token)
         }
 
+    def revoke_tokens(self):
+        """Revoke every access and refresh token issued to the user so far."""
+        self.token_version += 1
+        self.save(update_fields=['token_version'])
+
+
+class OutboundEmail(TrackingModel):
+    """
+    Outbox row for an email that is sent by the send_queued_email worker
+    instead of inside the request that asked for it.
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    DEAD = 'dead'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (DEAD, 'Dead'),
+    ]
+
+    to_email = models.EmailField(max_length=255)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # pending rows are picked up once this is in the past
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Outbound emails"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
 
+    def __str__(self) -> str:
+        return f'{self.subject} to {self.to_email} ({self.status})'
+
+
+class RevokedToken(TrackingModel):
+    """
+    A JWT revoked before it expired, by its jti. The rows are what
+    authentication.revocation builds its filters from; purge_revoked_tokens
+    deletes them once the tokens have expired anyway.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='revoked_tokens')
+    expires_at = models.DateTimeField(db_index=True)
 
-        
\ No newline at end of file
+    class Meta:
+        verbose_name_plural = "Revoked tokens"
+
+    def __str__(self) -> str:
+        return self.jti
@@ -0,0 +1,121 @@
+import os
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+def is_permanent(error):
+    """
+    Whether the address itself was refused (a 5xx reply to RCPT TO), so a
+    retry will not succeed. Everything else, including 5xx replies to the
+    login or the sender, is down to the connection or our configuration and
+    is retried with backoff, rather than dead-lettering every queued email.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(500 <= code < 600 for code, _ in error.recipients.values())
+    return False
+
+
+def retry_delay(attempts):
+    delay = settings.EMAIL_OUTBOX_RETRY_BASE * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_RETRY_MAX))
+
+
+def claim_batch(batch_size):
+    """
+    Lease up to batch_size due emails to this worker.
+
+    Leased rows get a next_attempt_at in the future, so other workers skip
+    them, and a worker that dies mid-batch only delays them by the lease.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE))
+    return emails
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=os.environ.get('EMAIL_HOST_USER'),
+        to=[email.to_email],
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def record_failure(email, error):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if is_permanent(error) or email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboundEmail.DEAD
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
+
+
+def record_failures(emails, error, counts):
+    for email in emails:
+        record_failure(email, error)
+        counts['dead' if email.status == OutboundEmail.DEAD else 'retried'] += 1
+
+
+def deliver_batch(batch_size=None):
+    """
+    Send one batch of due emails over a single SMTP connection.
+
+    Returns a dict with the number of emails sent, retried and dead-lettered.
+    """
+    emails = claim_batch(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    counts = {'sent': 0, 'retried': 0, 'dead': 0}
+    if not emails:
+        return counts
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except (smtplib.SMTPException, OSError) as error:
+        record_failures(emails, error, counts)
+        return counts
+
+    try:
+        for index, email in enumerate(emails):
+            try:
+                connection.send_messages([build_message(email, connection)])
+            except (smtplib.SMTPException, OSError) as error:
+                record_failures([email], error, counts)
+                if not is_permanent(error):
+                    # the session may be unusable after a transient failure
+                    try:
+                        connection.close()
+                        connection.open()
+                    except (smtplib.SMTPException, OSError) as reconnect_error:
+                        # the server is still down: the rest of the batch is
+                        # retried with backoff rather than killing the worker
+                        record_failures(emails[index + 1:], reconnect_error, counts)
+                        return counts
+                continue
+            email.status = OutboundEmail.SENT
+            email.attempts += 1
+            email.sent_at = timezone.now()
+            email.last_error = ''
+            email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error', 'updated_at'])
+            counts['sent'] += 1
+    finally:
+        connection.close()
+    return counts
@@ -1,14 +1,23 @@
-from rest_framework import renderers
-import json
+from rest_framework.exceptions import ErrorDetail
 
+from utils.renderers import JSONRenderer
 
-class UserRender(renderers.JSONRenderer):
+
+def has_error_detail(data):
+    if isinstance(data, ErrorDetail):
+        return True
+    if isinstance(data, dict):
+        return any(has_error_detail(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(has_error_detail(value) for value in data)
+    return False
+
+
+class UserRender(JSONRenderer):
     charset = 'utf-8'
-    def render(self, data, accepted_media_type=None, renderer_context=None):
-        response = ''
 
-        if 'ErrorDetail' in str(data):
-            response= json.dumps({'errors': data})
-        else:
-            response= json.dumps({'data': data})
-        return response
\ No newline at end of file
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # validation errors are made of ErrorDetail strings
+        if has_error_detail(data):
+            return super().render({'errors': data}, accepted_media_type, renderer_context)
+        return super().render({'data': data}, accepted_media_type, renderer_context)
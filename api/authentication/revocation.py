@@ -0,0 +1,106 @@
+"""
+Revoked JWTs, checked without a query per request.
+
+Logging out stores the jti of the refresh and access tokens as
+RevokedToken rows. Every authenticated request must then be checked
+against them, and most requests carry tokens that were never revoked.
+Each process therefore keeps a Bloom filter of the unexpired jtis, rebuilt
+from the table every REVOCATION_FILTER_TTL seconds. A jti the filter does
+not hold was not revoked when it was built. A jti it holds may be a false
+positive (about REVOCATION_FILTER_ERROR_RATE of unrevoked tokens), so the
+table is asked to confirm it.
+
+Revocations made by this process are added to its filter at once. Those
+made by other processes are seen when this process next rebuilds its
+filter, so they can take up to REVOCATION_FILTER_TTL seconds to apply
+there. Both the rebuild and the confirmation read the primary database,
+never a replica that may lag behind the revocation.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from utils.bloom import BloomFilter
+
+
+class RevocationSet:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._expires = 0.0
+        self._rebuilding = False
+        # revoked while the filter is rebuilt, for the new filter
+        self._added = []
+
+    def _rows(self):
+        from authentication.models import RevokedToken
+
+        return RevokedToken.objects.using(DEFAULT_DB_ALIAS).filter(expires_at__gt=timezone.now())
+
+    def bloom(self):
+        """
+        This process's filter. One thread rebuilds it once it is older than
+        REVOCATION_FILTER_TTL; the others keep checking the old one.
+        """
+        with self._lock:
+            if self._filter is not None and (self._rebuilding or time.monotonic() < self._expires):
+                return self._filter
+            self._rebuilding = True
+            self._added = []
+        try:
+            jtis = list(self._rows().values_list("jti", flat=True))
+            # room to add revocations until the next rebuild
+            bloom = BloomFilter(max(settings.REVOCATION_FILTER_CAPACITY, 2 * len(jtis)),
+                                settings.REVOCATION_FILTER_ERROR_RATE)
+            for jti in jtis:
+                bloom.add(jti)
+        except BaseException:
+            with self._lock:
+                self._rebuilding = False
+            raise
+        with self._lock:
+            for jti in self._added:
+                bloom.add(jti)
+            self._filter = bloom
+            self._expires = time.monotonic() + settings.REVOCATION_FILTER_TTL
+            self._rebuilding = False
+            return bloom
+
+    def discard(self):
+        """Drop the filter; the next check rebuilds it."""
+        with self._lock:
+            self._filter = None
+
+    def _add(self, jti):
+        self.bloom()
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+            if self._rebuilding:
+                self._added.append(jti)
+
+    def is_revoked(self, *jtis):
+        """Whether any of the jtis (None for a missing claim) has been revoked."""
+        bloom = self.bloom()
+        candidates = [jti for jti in jtis if jti is not None and jti in bloom]
+        if not candidates:
+            return False
+        return self._rows().filter(jti__in=candidates).exists()
+
+    def revoke(self, token, user=None):
+        from authentication.models import RevokedToken
+
+        jti = token[api_settings.JTI_CLAIM]
+        RevokedToken.objects.get_or_create(
+            jti=jti, defaults={"user": user, "expires_at": datetime_from_epoch(token["exp"])})
+        self._add(jti)
+        # again once committed, in case a rebuild read the table before then
+        transaction.on_commit(lambda: self._add(jti))
+
+
+revoked_tokens = RevocationSet()
@@ -2,6 +2,11 @@ from rest_framework import serializers
 from .models import User
 from django.contrib import auth
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from .revocation import revoked_tokens
+from .tokens import RefreshToken, token_version
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -43,10 +48,16 @@ class LoginSerializer(serializers.ModelSerializer):
         fields=['email', 'password', 'username', 'tokens']
 
     def validate(self, attrs):
+        if self.context.get('defer_authentication'):
+            # the async view authenticates, awaiting the password hash
+            return attrs
         email = attrs.get('email', '')
         password = attrs.get('password', '')
         user = auth.authenticate(email=email, password=password)
-        
+        return self.login(user)
+
+    def login(self, user):
+        """The validated data for the user authenticate() returned."""
         if not user:
             raise AuthenticationFailed('Invalid credentials, try again')
         if not user.is_active:
@@ -61,4 +72,31 @@ class LoginSerializer(serializers.ModelSerializer):
             'tokens': user.tokens
         }
 
-        return super().validate(attrs)
\ No newline at end of file
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """simplejwt's refresh, refusing revoked refresh tokens."""
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if revoked_tokens.is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise TokenError('Token has been revoked')
+        user = User.objects.filter(pk=refresh.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        if token_version(refresh) != user.token_version:
+            raise TokenError('Token has been revoked')
+        return super().validate(attrs)
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            refresh = RefreshToken(value)
+        except TokenError as e:
+            raise serializers.ValidationError(e.args[0])
+        if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(self.context['request'].user.pk):
+            raise serializers.ValidationError('Token belongs to another user')
+        return refresh
@@ -0,0 +1,52 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.backends import CachedJWTAuthentication, users
+from .test_setup import TestSetUp
+from ..models import User
+
+
+class TestCachedJWTAuthentication(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        users.discard()
+        self.user = User.objects.create_superuser(
+            self.user_data['username'], self.user_data['email'], self.user_data['password'])
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.url = reverse('cache_stats')
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [query for query in queries if User._meta.db_table in query['sql']]
+
+    def test_should_load_a_user_once(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+
+    def test_should_give_each_request_its_own_user(self):
+        request = APIRequestFactory().get(self.url, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        first, _ = CachedJWTAuthentication().authenticate(request)
+        second, _ = CachedJWTAuthentication().authenticate(request)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+
+    def test_should_see_changes_to_the_user(self):
+        self.user_queries()
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_should_reject_deleted_users(self):
+        self.user_queries()
+        self.user.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
@@ -0,0 +1,97 @@
+import threading
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.test import override_settings
+
+from authentication.hashers import PBKDF2PasswordHasher
+from authentication.hashing import hashing_pool
+from .test_setup import TestSetUp
+from ..models import User
+
+
+class TestPasswordHashing(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            self.user_data['username'], self.user_data['email'], self.user_data['password'])
+        self.user.is_verified = True
+        self.user.save()
+        self.credentials = {'email': self.user_data['email'], 'password': self.user_data['password']}
+
+    def test_should_hash_in_the_pool(self):
+        threads = []
+        encode = hashers.PBKDF2PasswordHasher.encode
+
+        def record(hasher, *args):
+            threads.append(threading.current_thread().name)
+            return encode(hasher, *args)
+
+        with patch.object(hashers.PBKDF2PasswordHasher, 'encode', record):
+            res = self.client.post(self.login_url, self.credentials, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith('password-hashing'))
+        # same hashes as Django's hasher
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+    def test_should_refuse_logins_when_the_queue_is_full(self):
+        release = threading.Event()
+        with override_settings(PASSWORD_HASHING_QUEUE=0):
+            blocked = [hashing_pool.submit(release.wait) for _ in range(settings.PASSWORD_HASHING_WORKERS)]
+            try:
+                res = self.client.post(self.login_url, self.credentials, format="json")
+                self.assertEqual(res.status_code, 503)
+                self.assertEqual(res['Retry-After'], '1')
+                res = self.client.post(self.register_url, {
+                    'email': 'new@example.com', 'username': 'newuser', 'password': 'password123'}, format="json")
+                self.assertEqual(res.status_code, 503)
+            finally:
+                release.set()
+                for future in blocked:
+                    future.result()
+        self.assertFalse(User.objects.filter(email='new@example.com').exists())
+        res = self.client.post(self.login_url, self.credentials, format="json")
+        self.assertEqual(res.status_code, 200)
+
+
+@override_settings(ROOT_URLCONF='backend.asgi_urls')
+class TestAsyncLoginAndRegistration(TestSetUp):
+    async def test_should_register_and_log_in(self):
+        res = await self.async_client.post(self.register_url, self.user_data, content_type='application/json')
+        self.assertEqual(res.status_code, 201)
+        user = await User.objects.aget(email=self.user_data['email'])
+        self.assertTrue(user.check_password(self.user_data['password']))
+
+        credentials = {'email': self.user_data['email'], 'password': self.user_data['password']}
+        res = await self.async_client.post(self.login_url, credentials, content_type='application/json')
+        self.assertEqual(res.json()['detail'], 'Email is not verified')
+
+        user.is_verified = True
+        await user.asave()
+        res = await self.async_client.post(self.login_url, credentials, content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('access', res.json()['tokens'])
+
+        res = await self.async_client.post(
+            self.login_url, {**credentials, 'password': 'wrong-password'}, content_type='application/json')
+        self.assertEqual(res.json()['detail'], 'Invalid credentials, try again')
+        res = await self.async_client.post(
+            self.login_url, {**credentials, 'email': 'nobody@example.com'}, content_type='application/json')
+        self.assertEqual(res.json()['detail'], 'Invalid credentials, try again')
+
+    async def test_should_upgrade_outdated_hashes(self):
+        password = self.user_data['password']
+        outdated = PBKDF2PasswordHasher().encode(password, hashers.get_random_string(22), iterations=1000)
+        await User.objects.acreate(
+            username='olduser', email=self.user_data['email'], password=outdated, is_verified=True)
+
+        res = await self.async_client.post(
+            self.login_url, {'email': self.user_data['email'], 'password': password},
+            content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        user = await User.objects.aget(email=self.user_data['email'])
+        self.assertNotEqual(user.password, outdated)
+        self.assertEqual(hashers.identify_hasher(user.password).decode(user.password)['iterations'],
+                         PBKDF2PasswordHasher.iterations)
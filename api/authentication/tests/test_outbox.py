@@ -0,0 +1,224 @@
+import smtplib
+import socketserver
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .test_setup import TestSetUp
+from ..models import OutboundEmail
+from ..outbox import deliver_batch, is_permanent
+from ..utils import Util
+
+
+class FlakyBackend(LocmemBackend):
+    """locmem backend that fails the first `failures` sends with a transient error."""
+    failures = 0
+
+    def send_messages(self, messages):
+        if FlakyBackend.failures:
+            FlakyBackend.failures -= 1
+            raise smtplib.SMTPServerDisconnected("connection dropped")
+        return super().send_messages(messages)
+
+
+class UnreachableBackend(LocmemBackend):
+    """locmem backend whose connection drops on the first send and then cannot be reopened."""
+    opened = 0
+
+    def open(self):
+        UnreachableBackend.opened += 1
+        if UnreachableBackend.opened > 1:
+            raise ConnectionRefusedError("connection refused")
+
+    def send_messages(self, messages):
+        raise smtplib.SMTPServerDisconnected("connection dropped")
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    Minimal SMTP server that records messages, refuses recipients containing
+    'bounce' and rejects every login.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.connections = 0
+        self.messages = []
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost stand-in")
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            command = line[:4].upper()
+            if not line or command == "QUIT":
+                self.reply("221 bye")
+                return
+            if command == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250-AUTH PLAIN")
+                self.reply("250 8BITMIME")
+            elif command == "AUTH":
+                self.reply("535 5.7.8 authentication failed")
+            elif command == "RCPT" and "bounce" in line:
+                self.reply("550 no such user")
+            elif command == "RCPT":
+                recipients.append(line.split(":", 1)[1].strip("<> "))
+                self.reply("250 ok")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.messages.extend(recipients)
+                recipients = []
+                self.reply("250 queued")
+            else:
+                # HELO, MAIL, RSET, NOOP
+                if command == "RSET":
+                    recipients = []
+                self.reply("250 ok")
+
+
+def queue(to_email):
+    return Util.queue_email({
+        'to_email': to_email,
+        'email_subject': 'Subject',
+        'email_body': '<p>Hello</p>',
+    })
+
+
+class TestEmailOutbox(TestSetUp):
+    def test_register_queues_email_instead_of_sending(self):
+        res = self.client.post(self.register_url, self.user_data, format="json")
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+
+        email = OutboundEmail.objects.get(to_email=self.user_data['email'])
+        self.assertEqual(email.status, OutboundEmail.PENDING)
+
+        call_command('send_queued_email', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user_data['email']])
+        self.assertIn('Activate your Account', mail.outbox[0].body)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.SENT)
+
+    @override_settings(
+        EMAIL_BACKEND='authentication.tests.test_outbox.FlakyBackend',
+        EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_RETRY_BASE=60)
+    def test_transient_failures_are_retried_with_backoff_then_dead_lettered(self):
+        email = queue('student@example.com')
+        FlakyBackend.failures = 1
+        self.assertEqual(deliver_batch(), {'sent': 0, 'retried': 1, 'dead': 0})
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+        # not due yet
+        self.assertEqual(deliver_batch(), {'sent': 0, 'retried': 0, 'dead': 0})
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_batch(), {'sent': 1, 'retried': 0, 'dead': 0})
+        self.assertEqual(len(mail.outbox), 1)
+
+        dead = queue('unlucky@example.com')
+        FlakyBackend.failures = 10
+        for _ in range(3):
+            OutboundEmail.objects.filter(pk=dead.pk).update(next_attempt_at=timezone.now())
+            deliver_batch()
+        FlakyBackend.failures = 0
+        dead.refresh_from_db()
+        self.assertEqual(dead.status, OutboundEmail.DEAD)
+        self.assertEqual(dead.attempts, 3)
+        self.assertIn('SMTPServerDisconnected', dead.last_error)
+
+    @override_settings(
+        EMAIL_BACKEND='authentication.tests.test_outbox.UnreachableBackend', EMAIL_OUTBOX_RETRY_BASE=60)
+    def test_failed_reconnect_retries_the_rest_of_the_batch(self):
+        first, second, third = (queue(f'student{i}@example.com') for i in range(3))
+        UnreachableBackend.opened = 0
+        out = StringIO()
+        call_command('send_queued_email', stdout=out)
+        self.assertIn('retrying 3', out.getvalue())
+
+        for email in (first, second, third):
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboundEmail.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertIn('SMTPServerDisconnected', first.last_error)
+        self.assertIn('ConnectionRefusedError', second.last_error)
+        self.assertIn('ConnectionRefusedError', third.last_error)
+
+
+class TestIsPermanent(TestCase):
+    def test_only_refused_addresses_are_permanent(self):
+        self.assertTrue(is_permanent(smtplib.SMTPRecipientsRefused({'a@example.com': (550, b'no such user')})))
+        # a full mailbox or greylisting may clear up
+        self.assertFalse(is_permanent(smtplib.SMTPRecipientsRefused({'a@example.com': (452, b'mailbox full')})))
+        for error in (smtplib.SMTPAuthenticationError(535, b'bad credentials'),
+                      smtplib.SMTPSenderRefused(553, b'sender not allowed', 'noreply@example.com'),
+                      smtplib.SMTPConnectError(554, b'no service'),
+                      smtplib.SMTPDataError(554, b'transaction failed'),
+                      smtplib.SMTPServerDisconnected('connection dropped')):
+            self.assertFalse(is_permanent(error), error)
+
+
+class TestEmailOutboxSMTP(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        self.server = SMTPStandIn()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_batch_reuses_one_connection_and_dead_letters_refused_addresses(self):
+        for address in ('one@example.com', 'bounce@example.com', 'two@example.com'):
+            queue(address)
+
+        with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                EMAIL_HOST='127.0.0.1', EMAIL_PORT=self.server.server_address[1],
+                EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD=''):
+            counts = deliver_batch()
+
+        self.assertEqual(counts, {'sent': 2, 'retried': 0, 'dead': 1})
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(sorted(self.server.messages), ['one@example.com', 'two@example.com'])
+        bounced = OutboundEmail.objects.get(to_email='bounce@example.com')
+        self.assertEqual(bounced.status, OutboundEmail.DEAD)
+        self.assertEqual(bounced.attempts, 1)
+
+    @override_settings(EMAIL_OUTBOX_RETRY_BASE=60)
+    def test_rejected_login_retries_the_batch(self):
+        emails = [queue(address) for address in ('one@example.com', 'two@example.com')]
+
+        with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                EMAIL_HOST='127.0.0.1', EMAIL_PORT=self.server.server_address[1],
+                EMAIL_USE_TLS=False, EMAIL_HOST_USER='mailer', EMAIL_HOST_PASSWORD='wrong'):
+            counts = deliver_batch()
+
+        self.assertEqual(counts, {'sent': 0, 'retried': 2, 'dead': 0})
+        self.assertEqual(self.server.messages, [])
+        for email in emails:
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboundEmail.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+            self.assertIn('SMTPAuthenticationError', email.last_error)
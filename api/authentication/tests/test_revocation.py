@@ -0,0 +1,130 @@
+import datetime
+import time
+from io import StringIO
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from authentication.backends import users
+from authentication.revocation import revoked_tokens
+from authentication.tokens import RefreshToken
+from utils.bloom import BloomFilter
+from .test_setup import TestSetUp
+from ..models import RevokedToken, User
+
+
+class TestBloomFilter(TestSetUp):
+    def test_should_hold_what_was_added(self):
+        bloom = BloomFilter(1000, 0.01)
+        items = [f'jti-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TestTokenRevocation(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        users.discard()
+        revoked_tokens.discard()
+        self.user = User.objects.create_user(
+            self.user_data['username'], self.user_data['email'], self.user_data['password'])
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+        self.url = reverse('review_list')
+        self.refresh_url = reverse('token_refresh')
+        self.logout_url = reverse('logout')
+
+    def get(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return self.client.get(self.url)
+
+    def refresh_access(self, refresh):
+        return self.client.post(self.refresh_url, {'refresh': str(refresh)}, format='json')
+
+    def revocation_queries(self, access):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get(access).status_code, 200)
+        return [query for query in queries if RevokedToken._meta.db_table in query['sql']]
+
+    def test_should_refresh_access_tokens(self):
+        res = self.refresh_access(self.refresh)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.get(res.json()['access']).status_code, 200)
+
+        res = self.refresh_access('not-a-token')
+        self.assertEqual(res.status_code, 401)
+
+    def test_should_revoke_tokens_on_logout(self):
+        other = self.refresh.access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        res = self.client.post(self.logout_url, {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(RevokedToken.objects.filter(user=self.user).count(), 2)
+
+        self.assertEqual(self.get(self.access).status_code, 401)
+        # made from the revoked refresh token
+        self.assertEqual(self.get(other).status_code, 401)
+        self.assertEqual(self.refresh_access(self.refresh).status_code, 401)
+
+        # other sessions are unaffected
+        session = RefreshToken.for_user(self.user)
+        self.assertEqual(self.get(session.access_token).status_code, 200)
+        self.assertEqual(self.refresh_access(session).status_code, 200)
+
+    def test_should_not_revoke_other_users_tokens(self):
+        other = User.objects.create_user('otheruser', 'other@example.com', 'password123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        res = self.client.post(self.logout_url, {'refresh': str(RefreshToken.for_user(other))}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(RevokedToken.objects.exists())
+        self.assertEqual(self.get(self.access).status_code, 200)
+
+    def test_should_revoke_every_token_of_the_user(self):
+        other = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        self.assertEqual(self.client.post(reverse('logout_all')).status_code, 200)
+
+        self.assertEqual(self.get(self.access).status_code, 401)
+        self.assertEqual(self.get(other.access_token).status_code, 401)
+        self.assertEqual(self.refresh_access(other).status_code, 401)
+
+        # tokens issued from now on are valid
+        tokens = User.objects.get(pk=self.user.pk).tokens()
+        self.assertEqual(self.get(tokens['access']).status_code, 200)
+        self.assertEqual(self.refresh_access(tokens['refresh']).status_code, 200)
+
+    def test_should_not_query_for_unrevoked_tokens(self):
+        self.revocation_queries(self.access)
+        self.assertEqual(self.revocation_queries(self.access), [])
+
+    def test_should_confirm_filter_hits_in_the_database(self):
+        self.revocation_queries(self.access)
+        # every jti looks revoked: each request asks the table, which
+        # clears the unrevoked token
+        with patch.object(BloomFilter, '__contains__', return_value=True):
+            self.assertEqual(len(self.revocation_queries(self.access)), 1)
+            self.assertEqual(self.refresh_access(self.refresh).status_code, 200)
+
+    def test_should_see_revocations_from_other_processes(self):
+        self.revocation_queries(self.access)
+        RevokedToken.objects.create(jti=self.access['jti'], expires_at=timezone.now() + datetime.timedelta(minutes=5))
+        # until this process rebuilds its filter
+        self.assertEqual(self.get(self.access).status_code, 200)
+        later = time.monotonic() + settings.REVOCATION_FILTER_TTL
+        with patch('authentication.revocation.time.monotonic', return_value=later):
+            self.assertEqual(self.get(self.access).status_code, 401)
+
+    def test_should_purge_expired_revocations(self):
+        now = timezone.now()
+        RevokedToken.objects.create(jti='expired', expires_at=now - datetime.timedelta(seconds=1))
+        RevokedToken.objects.create(jti='current', expires_at=now + datetime.timedelta(minutes=5))
+        call_command('purge_revoked_tokens', stdout=StringIO())
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['current'])
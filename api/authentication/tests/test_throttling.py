@@ -0,0 +1,62 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import override_settings
+
+from utils.throttling import get_store
+from .test_setup import TestSetUp
+from ..models import User
+
+
+@override_settings(THROTTLE_ENABLED=True, THROTTLE_RATES={
+    'login.ip': '4/min', 'login.email': '2/min', 'register.email': '1/hour'})
+class TestAuthThrottling(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        get_store().clear()
+        self.addCleanup(get_store().clear)
+
+    def login(self, email, address):
+        return self.client.post(self.login_url, {'email': email, 'password': 'wrong-password'},
+                                format='json', REMOTE_ADDR=address)
+
+    def test_should_limit_logins_per_email_and_address(self):
+        self.assertEqual(self.login('a@example.com', '10.0.0.1').status_code, 401)
+        self.assertEqual(self.login('a@example.com', '10.0.0.2').status_code, 401)
+        # from any address
+        res = self.login('A@example.com', '10.0.0.3')
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(res['RateLimit-Remaining'], '0')
+
+        self.assertEqual(self.login('b@example.com', '10.0.0.1').status_code, 401)
+        self.assertEqual(self.login('c@example.com', '10.0.0.1').status_code, 401)
+        self.assertEqual(self.login('d@example.com', '10.0.0.1').status_code, 401)
+        # the address's fifth attempt
+        self.assertEqual(self.login('e@example.com', '10.0.0.1').status_code, 429)
+
+    def test_should_limit_registrations_per_email(self):
+        res = self.client.post(self.register_url, self.user_data, format='json')
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res['RateLimit-Remaining'], '0')
+        res = self.client.post(self.register_url, {**self.user_data, 'username': 'otheruser'}, format='json')
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(User.objects.filter(email=self.user_data['email']).count(), 1)
+
+
+@override_settings(
+    ROOT_URLCONF='backend.asgi_urls', THROTTLE_ENABLED=True, THROTTLE_RATES={'login.email': '1/min'},
+    THROTTLE_STORE='utils.throttling.CacheStore', THROTTLE_CACHE_ALIAS='throttle',
+    CACHES={**settings.CACHES, 'throttle': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'throttle_cache'}})
+class TestAsyncAuthThrottling(TestSetUp):
+    def setUp(self):
+        super().setUp()
+        call_command('createcachetable', 'throttle_cache', stdout=StringIO())
+
+    async def test_should_throttle_async_logins_with_a_database_store(self):
+        credentials = {'email': 'a@example.com', 'password': 'wrong-password'}
+        res = await self.async_client.post(self.login_url, credentials, content_type='application/json')
+        self.assertEqual(res.status_code, 401)
+        res = await self.async_client.post(self.login_url, credentials, content_type='application/json')
+        self.assertEqual(res.status_code, 429)
@@ -3,6 +3,7 @@ from ..models import User
 from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from datetime import datetime, timedelta
+import json
 import jwt
 
 
@@ -10,6 +11,13 @@ class TestViews(TestSetUp):
     def test_user_cannot_register_with_no_data(self):
         res = self.client.post(self.register_url)
         self.assertEqual(res.status_code, 400)
+        self.assertIn('email', json.loads(res.content)['errors'])
+
+    def test_registration_is_rendered_under_data(self):
+        res = self.client.post(
+            self.register_url, {**self.user_data, 'username': 'ErrorDetail'}, format="json")
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(json.loads(res.content)['data']['username'], 'ErrorDetail')
 
     def test_user_can_register_correctly(self):
         res = self.client.post(
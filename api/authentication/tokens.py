@@ -0,0 +1,33 @@
+"""
+JWTs carrying the claims revocation needs.
+
+``ver`` is the user's token_version when the refresh token was issued and
+is copied into its access tokens; User.revoke_tokens() bumps the version,
+which revokes every token issued before. ``rjti`` is the jti of the refresh
+token an access token was made from, so revoking a refresh token on logout
+revokes its access tokens too.
+"""
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.settings import api_settings
+
+TOKEN_VERSION_CLAIM = "ver"
+REFRESH_JTI_CLAIM = "rjti"
+
+
+def token_version(token):
+    # tokens issued before the claim existed count as version 0
+    return token.get(TOKEN_VERSION_CLAIM, 0)
+
+
+class RefreshToken(tokens.RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        access[REFRESH_JTI_CLAIM] = self[api_settings.JTI_CLAIM]
+        return access
@@ -1,6 +1,7 @@
 from django.shortcuts import render
 from rest_framework import generics,status, views
-from .serializers import RegisterSerializer, EmailVerificationSerializer, LoginSerializer
+from .serializers import (
+    RegisterSerializer, EmailVerificationSerializer, LoginSerializer, TokenRefreshSerializer, LogoutSerializer)
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import User
@@ -9,21 +10,36 @@ from django.contrib.sites.shortcuts import get_current_site
 from django.urls import reverse
 import jwt
 from django.conf import settings
+from django.db import transaction
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from .renderers import UserRender
+from .hashing import aauthenticate, hashing_pool
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from utils.async_views import AsyncAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt import views as jwt_views
+from .revocation import revoked_tokens
+from utils.throttling import EmailRateThrottle, IPRateThrottle
 
 
 class RegisterView(generics.GenericAPIView):
 
     serializer_class = RegisterSerializer
     renderer_classes = (UserRender, )
+    throttle_classes = (IPRateThrottle, EmailRateThrottle)
+    throttle_scope = 'register'
 
     def post(self, request):
         user = request.data
         serializer = self.serializer_class(data=user)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        return self.register(request, serializer)
+
+    @transaction.atomic
+    def register(self, request, serializer, encoded_password=None):
+        serializer.save(encoded_password=encoded_password)
         user_data = serializer.data
 
         user = User.objects.get(email=user_data['email'])
@@ -76,7 +92,8 @@ class RegisterView(generics.GenericAPIView):
         # f'Hi {user.username} \n User the link below to verify your email. \n {absurl}'
         data = {'email_body': email_body, 'to_email': user.email, 'email_subject': 'MyCourseEvaluation Account Activation'}
 
-        Util.send_email(data)
+        # delivered by the send_queued_email worker, not within this request
+        Util.queue_email(data)
         
         return Response(user_data, status=status.HTTP_201_CREATED)
 
@@ -106,8 +123,71 @@ class VerifyEmail(views.APIView):
 
 class LoginAPIView(generics.GenericAPIView):
     serializer_class = LoginSerializer
+    throttle_classes = (IPRateThrottle, EmailRateThrottle)
+    throttle_scope = 'login'
+
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class TokenRefreshView(jwt_views.TokenRefreshView):
+    """A new access token for an unrevoked refresh token."""
+    serializer_class = TokenRefreshSerializer
+
+
+class LogoutAPIView(generics.GenericAPIView):
+    """
+    Revokes the access token the request is made with and, if it is given,
+    the refresh token, with every access token made from it.
+    """
+    serializer_class = LogoutSerializer
+    permission_classes = (IsAuthenticated,)
+
+    @transaction.atomic
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        revoked_tokens.revoke(request.auth, request.user)
+        if 'refresh' in serializer.validated_data:
+            revoked_tokens.revoke(serializer.validated_data['refresh'], request.user)
+        return Response({"message": "Logged out successfully", "data": []}, status=status.HTTP_200_OK)
+
+
+class LogoutAllAPIView(views.APIView):
+    """Revokes every token issued to the user, on every device."""
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        User.objects.get(pk=request.user.pk).revoke_tokens()
+        return Response({"message": "Logged out of all sessions", "data": []}, status=status.HTTP_200_OK)
+
+
+class AsyncRegisterView(AsyncAPIView, RegisterView):
+    """
+    RegisterView for the ASGI server: the password is hashed in the hashing
+    pool while the request waits without holding a thread.
+    """
+    http_method_names = ["post", "options"]
+
+    async def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        # checks that the email and username are free
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        encoded_password = await hashing_pool.arun(make_password, serializer.validated_data['password'])
+        return await sync_to_async(self.register)(request, serializer, encoded_password)
+
+
+class AsyncLoginAPIView(AsyncAPIView, LoginAPIView):
+    """
+    LoginAPIView for the ASGI server, awaiting the password check.
+    """
+    http_method_names = ["post", "options"]
+
+    async def post(self, request):
+        serializer = self.serializer_class(data=request.data, context={'defer_authentication': True})
+        serializer.is_valid(raise_exception=True)
+        user = await aauthenticate(serializer.validated_data['email'], serializer.validated_data['password'])
+        return Response(self.serializer_class(serializer.login(user)).data, status=status.HTTP_200_OK)
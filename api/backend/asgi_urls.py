@@ -0,0 +1,44 @@
+"""
+The URLconf for ASGI servers: backend.urls, with GETs to the read-heavy
+endpoints going to async views and every other method to the sync views,
+and registration and login served by async views that await password
+hashing (see authentication.hashing).
+"""
+from django.urls import URLPattern
+
+from authentication import views as authentication_views
+from backend.urls import urlpatterns as sync_urlpatterns
+from review import views as review_views
+from school import views as school_views
+from utils.async_views import read_async
+
+# URL name: async read view
+READ_VIEWS = {
+    'schools': school_views.SchoolReadAPIView,
+    'school': school_views.SchoolReadAPIView,
+    'review_list': review_views.ReviewReadAPIView,
+    'review_detail': review_views.ReviewReadAPIView,
+    'school_reviews': review_views.ReviewReadAPIView,
+    'school_courses': school_views.CourseReadAPIView,
+}
+
+
+# URL name: async view for every method
+ASYNC_VIEWS = {
+    'register': authentication_views.AsyncRegisterView,
+    'login': authentication_views.AsyncLoginAPIView,
+}
+
+
+def async_views(pattern):
+    name = getattr(pattern, 'name', None)
+    if name in ASYNC_VIEWS:
+        view = ASYNC_VIEWS[name].as_view()
+    elif name in READ_VIEWS:
+        view = read_async(READ_VIEWS[name].as_view(), pattern.callback)
+    else:
+        return pattern
+    return URLPattern(pattern.pattern, view, pattern.default_args, pattern.name)
+
+
+urlpatterns = [async_views(pattern) for pattern in sync_urlpatterns]
@@ -0,0 +1,323 @@
+"""
+Per-request profiling.
+
+ProfilingMiddleware measures, for every request, the wall time, the number
+and total time of database queries, the time spent turning serializers into
+data (Serializer.data) and rendering responses, and the response size. The
+numbers are sent back in a Server-Timing header and added up per URL name
+in ``request_metrics`` (served by the metrics endpoint), with a latency
+histogram per URL name.
+
+Views may set ``query_budget``: a number of queries, or a {method: number}
+dict. A request that goes over it is logged, or fails with
+QueryBudgetExceeded when QUERY_BUDGET_RAISE is set (as it is by
+backend.test_runner), so N+1 queries show up as failing tests.
+
+Both run in the sync (WSGI) and async (ASGI) request paths; see
+utils.async_views.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+logger = logging.getLogger(__name__)
+
+# upper bounds of the latency histogram buckets, in milliseconds; the last
+# bucket counts everything slower
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+current_profile = ContextVar("current_profile", default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        # serializer .data calls made while another is running are part of it
+        self.serializing = False
+
+
+def profile_queries(execute, sql, params, many, context):
+    """
+    Execute wrapper installed once on every connection, adding each query to
+    the profile of the request being served by the current thread, if any.
+    """
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db_time += time.perf_counter() - started
+
+
+def profiled_data(data_property):
+    """Wrap a serializer's data property to add its time to the current request's profile."""
+    def data(self):
+        profile = current_profile.get()
+        if profile is None or profile.serializing:
+            return data_property.fget(self)
+        profile.serializing = True
+        started = time.perf_counter()
+        try:
+            return data_property.fget(self)
+        finally:
+            profile.serialize_time += time.perf_counter() - started
+            profile.serializing = False
+    return property(data)
+
+
+_instrumented = False
+_instrument_lock = threading.Lock()
+
+
+def instrument_serializers():
+    global _instrumented
+    with _instrument_lock:
+        if _instrumented:
+            return
+        for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+            serializer_class.data = profiled_data(serializer_class.data)
+        _instrumented = True
+
+
+class RequestMetrics:
+    """Per-process totals and latency histograms of profiled requests, by URL name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, name, status_code, elapsed, profile, response_bytes):
+        with self._lock:
+            endpoint = self._endpoints.get(name)
+            if endpoint is None:
+                endpoint = self._endpoints[name] = {
+                    "requests": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "db_ms": 0.0,
+                    "serialize_ms": 0.0,
+                    "render_ms": 0.0,
+                    "response_bytes": 0,
+                    "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+            elapsed_ms = elapsed * 1000
+            endpoint["requests"] += 1
+            endpoint["errors"] += status_code >= 500
+            endpoint["total_ms"] += elapsed_ms
+            endpoint["max_ms"] = max(endpoint["max_ms"], elapsed_ms)
+            endpoint["queries"] += profile.queries
+            endpoint["max_queries"] = max(endpoint["max_queries"], profile.queries)
+            endpoint["db_ms"] += profile.db_time * 1000
+            endpoint["serialize_ms"] += profile.serialize_time * 1000
+            endpoint["render_ms"] += profile.render_time * 1000
+            endpoint["response_bytes"] += response_bytes
+            endpoint["histogram"][bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    @staticmethod
+    def percentile(histogram, fraction):
+        """Upper bound of the bucket holding the given fraction of requests (None past the last bound)."""
+        target = fraction * sum(histogram)
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + (None,), histogram):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {name: dict(endpoint, histogram=list(endpoint["histogram"]))
+                         for name, endpoint in self._endpoints.items()}
+        summary = {}
+        for name, endpoint in sorted(endpoints.items()):
+            requests = endpoint["requests"]
+            histogram = endpoint.pop("histogram")
+            summary[name] = {
+                **{key: round(value, 3) if isinstance(value, float) else value for key, value in endpoint.items()},
+                "mean_ms": round(endpoint["total_ms"] / requests, 3),
+                "mean_queries": round(endpoint["queries"] / requests, 2),
+                "p50_ms": self.percentile(histogram, 0.50),
+                "p95_ms": self.percentile(histogram, 0.95),
+                "p99_ms": self.percentile(histogram, 0.99),
+                "histogram": {
+                    **{f"le_{bound}ms": count for bound, count in zip(LATENCY_BUCKETS_MS, histogram)},
+                    "slower": histogram[-1],
+                },
+            }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+def query_budget(view_class, method):
+    budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(method)
+    return budget
+
+
+def install_query_profiler(connection, **kwargs):
+    # first, so connection.execute_wrapper() blocks, which pop the last
+    # wrapper, never remove it
+    if profile_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, profile_queries)
+
+
+def install_query_profilers():
+    """Install profile_queries on the current thread's open connections."""
+    for connection in connections.all(initialized_only=True):
+        install_query_profiler(connection)
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_serializers()
+        # connections are per thread, and async views query from a thread
+        # other than the one running the middleware: connections opened
+        # from now on are covered by the signal, open ones by
+        # install_query_profilers() in that thread
+        connection_created.connect(install_query_profiler, dispatch_uid="install_query_profiler")
+        self.profiling_async_queries = False
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.PROFILING_ENABLED:
+            return self.get_response(request)
+
+        profile, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not settings.PROFILING_ENABLED:
+            return await self.get_response(request)
+        if not self.profiling_async_queries:
+            # there is no single async ORM thread: under ASGIHandler each
+            # request's queries run in a thread of its own, whose new
+            # connections the signal covers. Outside a ThreadSensitiveContext
+            # (e.g. the test AsyncClient) they run in the shared sync thread,
+            # which may hold a connection opened before the signal was
+            # connected, so cover that one once
+            await sync_to_async(install_query_profilers)()
+            self.profiling_async_queries = True
+
+        profile, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        return self.finish(request, response, profile)
+
+    def start(self):
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        install_query_profilers()
+        return profile, token
+
+    def finish(self, request, response, profile):
+        elapsed = time.perf_counter() - profile.started
+
+        match = request.resolver_match
+        name = (match.url_name or match.view_name) if match else "unresolved"
+        response_bytes = 0 if response.streaming else len(response.content)
+        request_metrics.record(name, response.status_code, elapsed, profile, response_bytes)
+        if settings.SERVER_TIMING_ENABLED:
+            response["Server-Timing"] = ", ".join((
+                f'db;dur={profile.db_time * 1000:.1f};desc="{profile.queries} queries"',
+                f"serialize;dur={profile.serialize_time * 1000:.1f}",
+                f"render;dur={profile.render_time * 1000:.1f}",
+                f"total;dur={elapsed * 1000:.1f}",
+            ))
+
+        budget = query_budget(getattr(match.func, "view_class", None), request.method) if match else None
+        # a server error has already failed, and reporting it may run queries of its own
+        if budget is not None and profile.queries > budget and response.status_code < 500:
+            message = f"{request.method} {name} ran {profile.queries} queries, over its budget of {budget}."
+            if settings.QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns, by the handler
+        profile = current_profile.get()
+        if profile is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                profile.render_time += time.perf_counter() - started
+            response.add_post_render_callback(rendered)
+        return response
+
+    async def aprocess_template_response(self, request, response):
+        # as a coroutine, so the async handler does not run it in a thread
+        return ProfilingMiddleware.process_template_response(self, request, response)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, able to run in the async request path. WhiteNoise's own
+    middleware is sync only, which under ASGI would make Django run every
+    request below it through a single thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,125 @@
+"""
+PostgreSQL with a connection pool in each process.
+
+Django opens a connection per thread and, with CONN_MAX_AGE = 0, closes it
+at the end of every request. Under ASGI every request runs in a thread of
+its own, so even a CONN_MAX_AGE above 0 never reuses a connection there.
+Connection setup (TCP, TLS and authentication) then dominates the latency
+of small endpoints. This backend keeps closed connections open in a pool
+shared by the process's threads, and hands them out again on the next
+connect, so requests under WSGI and ASGI alike mostly skip the setup.
+
+The pool keeps at most POOL["SIZE"] idle connections; more are opened when
+more threads use the database at once and closed when they are returned to
+a full pool, so it bounds the connections kept open, not the number in
+use (put PgBouncer in front of the database for that). With
+CONN_HEALTH_CHECKS, a connection is checked with SELECT 1 before it is
+handed out again, so one the server dropped is replaced rather than
+failing the request.
+"""
+import os
+import threading
+
+from django.db.backends.postgresql import base
+
+
+class ConnectionPool:
+    """Idle connections for one set of connection parameters."""
+
+    def __init__(self, size):
+        self.size = size
+        self.isolation_level = None
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def take(self, usable):
+        """The most recently returned idle connection that usable() accepts, or None."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection = self._idle.pop()
+            if usable(connection):
+                return connection
+            close(connection)
+
+    def give(self, connection):
+        """Keep connection for reuse, or close it if the pool is full or it is unusable."""
+        try:
+            if not connection.closed and not connection.autocommit:
+                # a transaction the caller left open is not handed on
+                connection.rollback()
+        except Exception:
+            close(connection)
+            return
+        with self._lock:
+            if not connection.closed and len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+        close(connection)
+
+
+def close(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+# connections inherited through fork() share their socket with the parent:
+# never used or closed in the child, only kept from being finalized there
+_inherited = []
+
+
+def get_pool(alias, conn_params, size):
+    key = (alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(size)
+        return _pools[key]
+
+
+def forget_pools():
+    global _pools_lock
+    # another thread of the parent may have held the lock when it forked
+    _pools_lock = threading.Lock()
+    for pool in _pools.values():
+        _inherited.extend(pool._idle)
+    _pools.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=forget_pools)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        self.connection_pool = get_pool(self.alias, conn_params, self.settings_dict["POOL"]["SIZE"])
+        connection = self.connection_pool.take(self.is_reusable)
+        if connection is not None:
+            self.isolation_level = self.connection_pool.isolation_level
+            return connection
+        connection = super().get_new_connection(conn_params)
+        self.connection_pool.isolation_level = self.isolation_level
+        return connection
+
+    def is_reusable(self, connection):
+        if connection.closed:
+            return False
+        if not self.settings_dict["CONN_HEALTH_CHECKS"]:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not connection.autocommit:
+                connection.rollback()
+        except self.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.connection_pool.give(self.connection)
@@ -0,0 +1,114 @@
+"""
+Read replicas.
+
+DATABASE_REPLICAS names database aliases that replicate the default one.
+GET and HEAD requests to views that set ``read_replica = True`` read from
+one of them, picked per request; everything else reads and writes the
+default database.
+
+Replicas lag behind, so a client that has just written reads its own
+writes from the default database: a successful POST, PUT, PATCH or DELETE
+sets a cookie that keeps the client off the replicas for
+REPLICA_STICKY_SECONDS, and a request that writes reads from the default
+database from then on.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+READ_METHODS = ("GET", "HEAD")
+
+current_routing = ContextVar("current_routing", default=None)
+
+
+def reads_primary(request):
+    """Whether the client wrote in the last REPLICA_STICKY_SECONDS, so must read its writes."""
+    return bool(settings.DATABASE_REPLICAS) and settings.REPLICA_STICKY_COOKIE in request.COOKIES
+
+
+class RequestRouting:
+    """Where the current request reads from, decided at its first read."""
+
+    def __init__(self, request):
+        self.request = request
+        self.wrote = False
+        self.replica = None
+
+    def read_alias(self):
+        if self.wrote:
+            return DEFAULT_DB_ALIAS
+        if self.replica is None:
+            self.replica = self.choose_replica()
+        return self.replica
+
+    def choose_replica(self):
+        request = self.request
+        match = request.resolver_match
+        view_class = getattr(match.func, "view_class", None) if match else None
+        if (
+            request.method not in READ_METHODS
+            or not getattr(view_class, "read_replica", False)
+            or reads_primary(request)
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = current_routing.get()
+        if routing is None:
+            return DEFAULT_DB_ALIAS
+        return routing.read_alias()
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing.get()
+        if routing is not None:
+            routing.wrote = True
+        # explicitly, or rows read from a replica would be saved there
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the default database
+        return True
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = current_routing.set(RequestRouting(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.stick(request, response)
+
+    async def __acall__(self, request):
+        token = current_routing.set(RequestRouting(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.stick(request, response)
+
+    def stick(self, request, response):
+        if request.method not in READ_METHODS + ("OPTIONS",) and response.status_code < 400:
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE, "1", max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite="Lax")
+        return response
@@ -71,10 +71,17 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'backend.replicas.ReplicaMiddleware',
+    # WhiteNoise, async capable (see backend.middleware)
+    'backend.middleware.StaticFilesMiddleware',
+    'backend.middleware.ProfilingMiddleware',
 ]
 
-ROOT_URLCONF = 'backend.urls'
+# backend.asgi sets ASYNC_READ_VIEWS, so under an ASGI server the read-heavy
+# endpoints are served by async views (backend.asgi_urls); WSGI keeps the
+# sync views, which async ones would only slow down there.
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', 'False').lower() in ('true', '1', 'yes')
+ROOT_URLCONF = 'backend.asgi_urls' if ASYNC_READ_VIEWS else 'backend.urls'
 
 TEMPLATES = [
     {
@@ -98,21 +105,191 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {'default': dj_database_url.config(default='sqlite:///db.sqlite3')}
+# Database connections, set through the environment:
+#
+# - DB_POOL_SIZE: PostgreSQL databases use backend.postgresql_pool, which
+#   keeps up to this many idle connections open in each process and hands
+#   them out again instead of connecting per request. This is what reuses
+#   connections under ASGI (uvicorn, as the Dockerfile runs it), where
+#   every request runs in a thread of its own. 0 turns the pool off.
+# - DB_CONN_MAX_AGE: seconds a thread keeps its connection between requests
+#   (Django's CONN_MAX_AGE; 0 closes it, or returns it to the pool, after
+#   each request). For the sync path (WSGI: gunicorn, or runserver) without
+#   the pool, set it to e.g. 60: each worker thread serves request after
+#   request and keeps its connection for this long. It does nothing under
+#   ASGI, where threads do not outlive their request.
+# - DB_CONN_HEALTH_CHECKS: check a kept or pooled connection (SELECT 1)
+#   before reusing it, so one the server dropped is replaced rather than
+#   failing a request (Django's CONN_HEALTH_CHECKS). On by default.
+# - DB_POOLED: set behind a transaction-mode pooler such as PgBouncer, which
+#   cannot keep server-side cursors open across transactions.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 0))
+DB_CONN_HEALTH_CHECKS = os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() in ('true', '1', 'yes')
+DB_POOLED = os.environ.get('DB_POOLED', 'False').lower() in ('true', '1', 'yes')
+DB_OPTIONS = {
+    'conn_max_age': DB_CONN_MAX_AGE,
+    'conn_health_checks': DB_CONN_HEALTH_CHECKS,
+    'disable_server_side_cursors': DB_POOLED,
+}
+
+
+def database(url):
+    config = dj_database_url.parse(url, **DB_OPTIONS)
+    if DB_POOL_SIZE and config['ENGINE'] == 'django.db.backends.postgresql':
+        config.update(ENGINE='backend.postgresql_pool', POOL={'SIZE': DB_POOL_SIZE})
+    return config
+
+
+DATABASES = {'default': database(os.environ.get('DATABASE_URL') or 'sqlite:///db.sqlite3')}
+
+# Read replicas (see backend.replicas): DATABASE_REPLICA_URLS is a comma
+# separated list of database URLs. Reads of views with read_replica = True
+# go to them, except for clients that wrote in the last
+# REPLICA_STICKY_SECONDS, which should be longer than the replicas' lag.
+for index, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), 1):
+    DATABASES[f'replica_{index}'] = {**database(url.strip()), 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+REPLICA_STICKY_COOKIE = 'read_primary'
+DATABASE_ROUTERS = ['backend.replicas.ReplicaRouter']
+
+TEST_RUNNER = 'backend.test_runner.TestRunner'
 
 REST_FRAMEWORK = {
     'NON_FIELD_ERRORS_KEY': 'error',
+    # simplejwt's JWTAuthentication, with users cached per process
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'authentication.backends.CachedJWTAuthentication',
+    ),
+    # orjson when installed (see utils.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'utils.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+}
+
+# The default cache is per-process; point CACHE_BACKEND/CACHE_LOCATION at a
+# shared backend (e.g. django.core.cache.backends.redis.RedisCache) so all
+# workers share cached responses and their invalidations.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'course-evaluation'),
+    }
+}
 
+# Cached GET responses for schools and reviews (see utils.cache). Writes
+# through the API invalidate them; the timeout bounds how long writes made
+# elsewhere (admin, shell, imports) can go unnoticed.
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+RESPONSE_CACHE_ALIAS = os.environ.get('RESPONSE_CACHE_ALIAS', 'default')
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+
+# Rate limits for the auth and write endpoints (see utils.throttling), as
+# "<throttle_scope>.<ip|user|email>": "<requests>/<sec|min|hour|day>".
+# LocalStore applies them per worker process; set THROTTLE_STORE to
+# utils.throttling.CacheStore and THROTTLE_CACHE_ALIAS to a shared cache
+# (Redis, memcached or the database cache) to apply them across workers.
+# The test runner (backend.test_runner) turns them off, except in the tests
+# for them.
+THROTTLE_ENABLED = os.environ.get('THROTTLE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+THROTTLE_STORE = os.environ.get('THROTTLE_STORE', 'utils.throttling.LocalStore')
+THROTTLE_CACHE_ALIAS = os.environ.get('THROTTLE_CACHE_ALIAS', 'default')
+THROTTLE_LOCAL_MAX_KEYS = int(os.environ.get('THROTTLE_LOCAL_MAX_KEYS', 100000))
+THROTTLE_RATES = {
+    'login.ip': '30/min',
+    'login.email': '5/min',
+    'register.ip': '10/hour',
+    # each registration sends an activation email
+    'register.email': '3/hour',
+    'reviews.user': '30/hour',
+    'school_requests.ip': '10/hour',
 }
 
+# Keyset pagination for list endpoints. Clients may ask for a smaller or
+# larger page with ?page_size=, but never more than API_MAX_PAGE_SIZE rows.
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 200))
+
+# Admin changelists using utils.pagination.EstimatedCountPaginator show the
+# database's row estimate instead of counting tables at least this large.
+ADMIN_ESTIMATED_COUNT_MIN = int(os.environ.get('ADMIN_ESTIMATED_COUNT_MIN', 10000))
+
+# Course typeahead: how many results a search may return, and how long a
+# process may keep its in-memory course index before rebuilding it.
+COURSE_SEARCH_DEFAULT_LIMIT = int(os.environ.get('COURSE_SEARCH_DEFAULT_LIMIT', 10))
+COURSE_SEARCH_MAX_LIMIT = int(os.environ.get('COURSE_SEARCH_MAX_LIMIT', 50))
+COURSE_SEARCH_INDEX_TTL = int(os.environ.get('COURSE_SEARCH_INDEX_TTL', 300))
+
+# School short_name and "SUBJ NUM" course code lookups: how many resolved
+# keys a process keeps, and for how long (see school.resolver).
+IDENTIFIER_CACHE_SIZE = int(os.environ.get('IDENTIFIER_CACHE_SIZE', 10000))
+IDENTIFIER_CACHE_TTL = int(os.environ.get('IDENTIFIER_CACHE_TTL', 300))
+
+# Users authenticated by access token: how many a process keeps, and for
+# how long (see authentication.backends). Saving or deleting a user drops
+# it at once in the process that did it; the TTL bounds the others.
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+
+# Revoked token jtis are checked against a per-process Bloom filter,
+# rebuilt from the RevokedToken table every REVOCATION_FILTER_TTL seconds
+# (see authentication.revocation); revocations made by other processes
+# apply within that time. The filter is sized for at least
+# REVOCATION_FILTER_CAPACITY jtis, and about REVOCATION_FILTER_ERROR_RATE
+# of unrevoked tokens cost a query to rule out.
+REVOCATION_FILTER_TTL = int(os.environ.get('REVOCATION_FILTER_TTL', 10))
+REVOCATION_FILTER_CAPACITY = int(os.environ.get('REVOCATION_FILTER_CAPACITY', 10000))
+REVOCATION_FILTER_ERROR_RATE = float(os.environ.get('REVOCATION_FILTER_ERROR_RATE', 0.001))
+
+# Review search ranks at most this many of the newest matching reviews
+# (0 ranks every match, whatever it costs).
+REVIEW_SEARCH_MAX_CANDIDATES = int(os.environ.get('REVIEW_SEARCH_MAX_CANDIDATES', 10000))
+
+# Request profiling (see backend.middleware): per-URL metrics, a
+# Server-Timing header, and views' query budgets, which fail requests
+# instead of logging a warning under the test runner (backend.test_runner).
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'True').lower() in ('true', '1', 'yes')
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'True').lower() in ('true', '1', 'yes')
+QUERY_BUDGET_RAISE = os.environ.get('QUERY_BUDGET_RAISE', 'False').lower() in ('true', '1', 'yes')
+
+# Largest batch accepted by the bulk review endpoint.
+REVIEW_BULK_MAX_ITEMS = int(os.environ.get('REVIEW_BULK_MAX_ITEMS', 10000))
+
+# Review exports read the table this many rows at a time (see review.export).
+REVIEW_EXPORT_CHUNK_SIZE = int(os.environ.get('REVIEW_EXPORT_CHUNK_SIZE', 2000))
+
+# Helpful votes update the review row immediately, unless buffered: then
+# each process adds them up and writes them FLUSH_INTERVAL seconds after
+# the first pending one or at FLUSH_SIZE votes, whichever comes first. A
+# process killed without exiting cleanly loses up to FLUSH_INTERVAL
+# seconds of increments (see review.helpful).
+REVIEW_HELPFUL_BUFFERED = os.environ.get('REVIEW_HELPFUL_BUFFERED', 'False').lower() in ('true', '1', 'yes')
+REVIEW_HELPFUL_FLUSH_INTERVAL = float(os.environ.get('REVIEW_HELPFUL_FLUSH_INTERVAL', 5))
+REVIEW_HELPFUL_FLUSH_SIZE = int(os.environ.get('REVIEW_HELPFUL_FLUSH_SIZE', 500))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': datetime.timedelta(minutes=10),
     'REFRESH_TOKEN_LIFETIME': datetime.timedelta(days=1),
 }
 
+# Passwords are hashed in a pool of PASSWORD_HASHING_WORKERS threads (see
+# authentication.hashing), leaving the other cores to requests during login
+# bursts; once PASSWORD_HASHING_QUEUE hashes are waiting, logins and
+# registrations get 503 with Retry-After: PASSWORD_HASHING_RETRY_AFTER.
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+PASSWORD_HASHING_QUEUE = int(os.environ.get('PASSWORD_HASHING_QUEUE', 16))
+PASSWORD_HASHING_RETRY_AFTER = int(os.environ.get('PASSWORD_HASHING_RETRY_AFTER', 1))
+
+PASSWORD_HASHERS = [
+    'authentication.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -168,3 +345,15 @@ EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
+
+# Outgoing email is queued in authentication.OutboundEmail and delivered by
+# `python manage.py send_queued_email`. Failed sends are retried with
+# exponential backoff (RETRY_BASE * 2^n seconds, capped at RETRY_MAX) and
+# dead-lettered after MAX_ATTEMPTS or a permanent (5xx) refusal of the
+# address; login and sender errors are retried like any other failure.
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 6))
+EMAIL_OUTBOX_RETRY_BASE = int(os.environ.get('EMAIL_OUTBOX_RETRY_BASE', 60))
+EMAIL_OUTBOX_RETRY_MAX = int(os.environ.get('EMAIL_OUTBOX_RETRY_MAX', 3600))
+# how long a worker owns the emails it claimed before others may retry them
+EMAIL_OUTBOX_LEASE = int(os.environ.get('EMAIL_OUTBOX_LEASE', 300))
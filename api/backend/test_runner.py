@@ -0,0 +1,29 @@
+"""
+The test runner (TEST_RUNNER), which applies the settings the test suite
+runs under before any test database is set up.
+"""
+import os
+
+from django.conf import settings
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+# a stand-in for a read replica, deliberately not a mirror of default, so
+# that reads reaching it show in the data (see TestReadReplicas)
+REPLICA_TEST_DATABASE = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': settings.BASE_DIR / 'replica_test.sqlite3'}
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # tests read their own writes; the routing tests turn replicas on
+        settings.DATABASE_REPLICAS = []
+        settings.DATABASES['replica_test'] = REPLICA_TEST_DATABASE
+        # the connection handler may already have read DATABASES
+        connections.settings = connections.configure_settings(settings.DATABASES)
+        # throttles are off except in the tests for them, and views going over
+        # their query budget fail; either can still be set in the environment
+        if 'THROTTLE_ENABLED' not in os.environ:
+            settings.THROTTLE_ENABLED = False
+        if 'QUERY_BUDGET_RAISE' not in os.environ:
+            settings.QUERY_BUDGET_RAISE = True
@@ -6,6 +6,7 @@ from school import views as school_views
 from review import views as review_views
 from authentication import views as authentication_views
 from requestschool import views as request_school_views
+from utils import views as utils_views
 from django.conf.urls import handler400, handler403, handler404, handler500
 
 from drf_yasg import openapi
@@ -41,12 +42,32 @@ urlpatterns = [
     # listing all reviews or creating a new review
     path(f'{base_url}/reviews/',
          review_views.ReviewAPIView.as_view(), name='review_list'),
+    # importing reviews in batches (admin only)
+    path(f'{base_url}/reviews/bulk/',
+         review_views.ReviewBulkAPIView.as_view(), name='review_bulk'),
+    # streaming NDJSON/CSV export of reviews for analytics (admin only)
+    path(f'{base_url}/reviews/export/',
+         review_views.ReviewExportAPIView.as_view(), name='review_export'),
+    # full-text search over review text, ranked and highlighted
+    path(f'{base_url}/reviews/search/',
+         review_views.ReviewSearchAPIView.as_view(), name='review_search'),
     # getting, updating, or deleting a specific review
     path(f'{base_url}/reviews/<uuid:review_id>/',
          review_views.ReviewAPIView.as_view(), name='review_detail'),
+    # marking a review as helpful (authenticated, once per user)
+    path(f'{base_url}/reviews/<uuid:review_id>/helpful/',
+         review_views.ReviewHelpfulAPIView.as_view(), name='review_helpful'),
     # listing reviews for a specific school (will be for courses later)
     path(f'{base_url}/school/<str:short_name>/reviews/',
          review_views.ReviewAPIView.as_view(), name='school_reviews'),
+    # listing a school's courses, or typeahead search with ?q=
+    path(f'{base_url}/school/<str:short_name>/courses/',
+         school_views.CourseAPIView.as_view(), name='school_courses'),
+    # precomputed review aggregates for a school or one of its courses
+    path(f'{base_url}/school/<str:short_name>/stats/',
+         review_views.ReviewStatsAPIView.as_view(), name='school_stats'),
+    path(f'{base_url}/school/<str:short_name>/courses/<str:subject>/<str:catalog_number>/stats/',
+         review_views.ReviewStatsAPIView.as_view(), name='course_stats'),
   
     path(f'{base_url}/school/', school_views.SchoolAPIView.as_view(), name='schools'),
     path(f'{base_url}/school/<str:short_name>/', school_views.SchoolAPIView.as_view(), name='school'),
@@ -56,9 +77,17 @@ urlpatterns = [
     path(f'{base_url}/request-school/', request_school_views.RequestSchoolAPIView.as_view(), name='school_requests'),
     path(f'{base_url}/request-school/<str:school_name>/', request_school_views.RequestSchoolAPIView.as_view(), name='school_request'),
     
+    # response cache hit/miss counters (admin only)
+    path(f'{base_url}/cache/stats/', utils_views.CacheStatsAPIView.as_view(), name='cache_stats'),
+    # per-URL latency histograms, query counts and sizes (admin only)
+    path(f'{base_url}/metrics/', utils_views.RequestMetricsAPIView.as_view(), name='request_metrics'),
+
     # authentication
     path(f'{base_url}/auth/register/', authentication_views.RegisterView.as_view(), name='register'),
     path(f'{base_url}/auth/email-verify/', authentication_views.VerifyEmail.as_view(), name='email-verify'),
-    path(f'{base_url}/auth/login/', authentication_views.LoginAPIView.as_view(), name='login')
+    path(f'{base_url}/auth/login/', authentication_views.LoginAPIView.as_view(), name='login'),
+    path(f'{base_url}/auth/token/refresh/', authentication_views.TokenRefreshView.as_view(), name='token_refresh'),
+    path(f'{base_url}/auth/logout/', authentication_views.LogoutAPIView.as_view(), name='logout'),
+    path(f'{base_url}/auth/logout/all/', authentication_views.LogoutAllAPIView.as_view(), name='logout_all'),
 
 ]
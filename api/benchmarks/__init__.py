@@ -0,0 +1,14 @@
+"""
+Performance benchmarks for the API.
+
+Benchmarks run against a throwaway test database, never the configured one.
+Run them from the api directory:
+
+    python -m benchmarks <name> [options]
+
+e.g. ``python -m benchmarks course_search --courses 30000``. ``api`` runs
+every route at several generated dataset sizes; ``compare`` checks its JSON
+results against benchmarks/baselines/api.json. ``concurrency`` loads the
+read endpoints with many connections through gunicorn (WSGI) and uvicorn
+(ASGI) servers.
+"""
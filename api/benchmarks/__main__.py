@@ -0,0 +1,28 @@
+import importlib
+import pkgutil
+import sys
+
+import benchmarks
+
+
+# modules that support the benchmarks rather than being one
+HELPERS = ("utils", "dataset")
+
+
+def available():
+    return sorted(
+        module.name for module in pkgutil.iter_modules(benchmarks.__path__)
+        if not module.name.startswith("_") and module.name not in HELPERS
+    )
+
+
+def main(argv):
+    if not argv or argv[0] not in available():
+        print(f"usage: python -m benchmarks <{'|'.join(available())}> [options]")
+        return 2
+    module = importlib.import_module(f"benchmarks.{argv[0]}")
+    return module.main(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
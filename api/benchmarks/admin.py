@@ -0,0 +1,71 @@
+"""
+Review admin changelist load times, with the ReviewAdmin options from
+before it was tuned for large tables and with ReviewAdmin.
+
+    python -m benchmarks admin --reviews 1000000
+
+The previous options loaded each row's school and course separately and
+listed every school, course and year in the sidebar. They also counted
+the whole table on every page. Pages are rendered through
+changelist_view() as a superuser, and each is reported with its query
+count.
+"""
+import argparse
+
+from benchmarks.utils import benchmark_database, measure, print_summary, summarize
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks admin")
+    parser.add_argument("--reviews", type=int, default=1000000)
+    parser.add_argument("--schools", type=int, default=20)
+    parser.add_argument("--courses-per-school", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with benchmark_database() as connection:
+        from django.contrib import admin
+        from django.test import RequestFactory, override_settings
+        from django.test.utils import CaptureQueriesContext
+
+        from authentication.models import User
+        from benchmarks.dataset import Dataset
+        from review.admin import ReviewAdmin
+        from review.models import Review
+
+        class PreviousReviewAdmin(admin.ModelAdmin):
+            list_display = ReviewAdmin.list_display
+            list_filter = ('school', 'course', 'term', 'grade_received', 'delivery_method', 'year_taken',
+                           'textbook_required', 'recommended')
+
+        courses = args.schools * args.courses_per_school
+        dataset = Dataset.generate(schools=args.schools, courses_per_school=args.courses_per_school,
+                                   reviews_per_course=-(-args.reviews // courses))
+        print(f"{dataset.review_count} reviews, {courses} courses")
+        superuser = User.objects.create_superuser("benchmarkadmin", "benchmarkadmin@example.com", "password123")
+        school_id, short_name = dataset.schools[0]
+
+        def changelist(admin_class, params):
+            request = RequestFactory().get("/admin/review/review/", params)
+            request.user = superuser
+            response = admin_class(Review, admin.site).changelist_view(request)
+            response.render()
+            assert response.status_code == 200, response.status_code
+
+        pages = (
+            ("first page", {}, {}),
+            ("page 100", {"p": "99"}, {"p": "99"}),
+            ("one school", {"school__id__exact": str(school_id)}, {"school": short_name}),
+        )
+        # the admin's pages link static files, which are not collected here
+        with override_settings(STORAGES={
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}}):
+            for label, previous, current in pages:
+                print(label)
+                for name, admin_class, params in (("before", PreviousReviewAdmin, previous),
+                                                  ("ReviewAdmin", ReviewAdmin, current)):
+                    with CaptureQueriesContext(connection) as queries:
+                        changelist(admin_class, params)
+                    samples = measure(lambda: changelist(admin_class, params), args.repeat)
+                    print_summary(f"  {name:<12} {len(queries):4d} queries", summarize(samples))
+    return 0
@@ -0,0 +1,299 @@
+"""
+Latency and queries per request of every API route, at several dataset
+sizes, with JSON results for ``python -m benchmarks compare``.
+
+    python -m benchmarks api --sizes 2x10x10 5x40x25 --json results.json
+
+A size is SCHOOLSxCOURSES_PER_SCHOOLxREVIEWS_PER_COURSE, generated with
+benchmarks.dataset (20x500x100 is a million reviews). Requests go through
+the whole Django stack with JWT bearer tokens; request bodies are built
+and fixtures (rows to delete, users to vote with) created outside the
+timed part. The response cache is off unless --cache is given, so
+repeated GETs measure the views rather than cache hits.
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+from dataclasses import dataclass
+
+from benchmarks.dataset import PASSWORD
+from benchmarks.utils import benchmark_database, percentile
+
+DEFAULT_SIZES = ("2x10x10", "5x40x25", "10x100x50")
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # build(context, i) -> (path, data), called outside the timed part
+    build: object
+    admin: bool = False
+    user: bool = False
+    # requests that are slow by design (password hashing) run fewer times
+    repeat: int = None
+
+
+def parse_size(text):
+    try:
+        schools, courses, reviews = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text!r} is not SCHOOLSxCOURSESxREVIEWS")
+    return schools, courses, reviews
+
+
+class Context:
+    """Dataset identifiers plus counters for rows scenarios create."""
+
+    def __init__(self, dataset, seed):
+        from faker import Faker
+
+        self.dataset = dataset
+        fake = Faker()
+        fake.seed_instance(seed)
+        self.words = fake.words(20, unique=True)
+        self.counter = itertools.count()
+
+    def school(self, i):
+        return self.dataset.schools[i % len(self.dataset.schools)]
+
+    def course(self, i):
+        return self.dataset.courses[(i * 7919) % len(self.dataset.courses)]
+
+    def review_id(self, i):
+        return self.dataset.reviews[i % len(self.dataset.reviews)]
+
+    def unique(self):
+        return next(self.counter)
+
+    def review_data(self, i):
+        _, short_name, code = self.course(i)
+        return {
+            "school": short_name, "course": code, "review_text": f"Benchmark review {i} " + " ".join(self.words),
+            "term": "Fall", "grade_received": "A", "delivery_method": "Online", "year_taken": 2023,
+        }
+
+    def create_review(self, i):
+        from review import stats
+        from review.models import Review
+
+        course_id, short_name, _ = self.course(i)
+        school_id = next(pk for pk, name in self.dataset.schools if name == short_name)
+        review = Review.objects.create(
+            school_id=school_id, course_id=course_id, review_text="To be deleted",
+            term="Fall", grade_received="A", delivery_method="Online")
+        stats.update_review_stats(added=[review])
+        return review.pk
+
+
+def school_data(n):
+    return {
+        "long_name": f"Benchmark College {n}", "short_name": f"N{n}"[:5], "website": "https://example.edu",
+        "city": "Las Vegas", "state": "Nevada", "country": "USA",
+    }
+
+
+def scenarios():
+    from django.urls import reverse
+
+    from school.models import School
+    from requestschool.models import RequestSchool
+
+    def new_school(context, i):
+        n = context.unique()
+        School.objects.create(**school_data(n))
+        return f"N{n}"[:5]
+
+    def new_school_request(context, i):
+        name = f"Requested College {context.unique()}"
+        RequestSchool.objects.create(school_name=name, website="https://example.edu")
+        return name
+
+    def verify_token(context, i):
+        from authentication.models import User
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        user = User.objects.get(email=context.dataset.users[i % len(context.dataset.users)])
+        return str(RefreshToken.for_user(user).access_token)
+
+    return [
+        Scenario("schools", "get", lambda c, i: (reverse("schools"), None)),
+        Scenario("school", "get", lambda c, i: (reverse("school", args=[c.school(i)[1]]), None)),
+        Scenario("school_create", "post", lambda c, i: (reverse("schools"), school_data(c.unique()))),
+        Scenario("school_update", "put", lambda c, i: (
+            reverse("school", args=[c.school(i)[1]]),
+            {**school_data(0), "short_name": c.school(i)[1], "long_name": f"Updated {c.school(i)[1]}"})),
+        Scenario("school_delete", "delete", lambda c, i: (reverse("school", args=[new_school(c, i)]), None)),
+        Scenario("review_list", "get", lambda c, i: (reverse("review_list"), None)),
+        Scenario("review_detail", "get", lambda c, i: (reverse("review_detail", args=[c.review_id(i)]), None)),
+        Scenario("school_reviews", "get", lambda c, i: (reverse("school_reviews", args=[c.school(i)[1]]), None)),
+        Scenario("review_create", "post", lambda c, i: (reverse("review_list"), c.review_data(i))),
+        Scenario("review_update", "put", lambda c, i: (
+            reverse("review_detail", args=[c.review_id(i)]), c.review_data(i))),
+        Scenario("review_delete", "delete", lambda c, i: (
+            reverse("review_detail", args=[c.create_review(i)]), None)),
+        Scenario("review_bulk", "post", lambda c, i: (
+            reverse("review_bulk"), [c.review_data(i * 100 + j) for j in range(100)]), admin=True),
+        Scenario("review_search", "get", lambda c, i: (
+            reverse("review_search") + f"?q={c.words[i % len(c.words)]}", None)),
+        Scenario("review_helpful", "post", lambda c, i: (
+            reverse("review_helpful", args=[c.review_id(i // len(c.dataset.users))]), None), user=True),
+        Scenario("review_export", "get", lambda c, i: (
+            reverse("review_export") + f"?school={c.school(i)[1]}", None), admin=True),
+        Scenario("school_courses", "get", lambda c, i: (reverse("school_courses", args=[c.school(i)[1]]), None)),
+        Scenario("school_courses_search", "get", lambda c, i: (
+            reverse("school_courses", args=[c.school(i)[1]]) + f"?q={c.course(i)[2][:3]}", None)),
+        Scenario("school_stats", "get", lambda c, i: (reverse("school_stats", args=[c.school(i)[1]]), None)),
+        Scenario("course_stats", "get", lambda c, i: (
+            reverse("course_stats", args=[c.course(i)[1], *c.course(i)[2].split()]), None)),
+        Scenario("school_requests", "get", lambda c, i: (reverse("school_requests"), None)),
+        Scenario("school_request_create", "post", lambda c, i: (
+            reverse("school_requests"),
+            {"school_name": f"Requested University {c.unique()}", "website": "https://example.edu"})),
+        Scenario("school_request", "get", lambda c, i: (
+            reverse("school_request", args=[new_school_request(c, i)]), None)),
+        Scenario("school_request_delete", "delete", lambda c, i: (
+            reverse("school_request", args=[new_school_request(c, i)]), None)),
+        Scenario("cache_stats", "get", lambda c, i: (reverse("cache_stats"), None), admin=True),
+        Scenario("request_metrics", "get", lambda c, i: (reverse("request_metrics"), None), admin=True),
+        Scenario("register", "post", lambda c, i: (reverse("register"), {
+            "username": f"newuser{c.unique()}", "email": f"newuser{i}-{c.unique()}@example.com",
+            "password": PASSWORD}), repeat=10),
+        Scenario("login", "post", lambda c, i: (reverse("login"), {
+            "email": c.dataset.users[i % len(c.dataset.users)], "password": PASSWORD}), repeat=10),
+        Scenario("email_verify", "get", lambda c, i: (reverse("email-verify") + f"?token={verify_token(c, i)}", None)),
+    ]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def bearer(user):
+    from rest_framework_simplejwt.tokens import RefreshToken
+    return f"Bearer {RefreshToken.for_user(user).access_token}"
+
+
+def run_scenario(scenario, context, repeat, warmup, tokens):
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    if scenario.admin:
+        client.credentials(HTTP_AUTHORIZATION=tokens["admin"])
+    samples, queries, errors = [], [], 0
+    for i in range(warmup + repeat):
+        path, data = scenario.build(context, i)
+        if scenario.user:
+            client.credentials(HTTP_AUTHORIZATION=tokens["users"][i % len(tokens["users"])])
+        send = getattr(client, scenario.method)
+        # counted with a wrapper: the query log is cleared when a request starts
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            response = send(path, data, format="json") if data is not None else send(path)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - started
+        if i < warmup:
+            continue
+        samples.append(elapsed)
+        queries.append(counter.count)
+        errors += response.status_code >= 400
+    return {
+        "scenario": scenario.name,
+        "requests": repeat,
+        "errors": errors,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "queries": round(sum(queries) / len(queries), 2),
+    }
+
+
+def run_size(size, args):
+    from django.conf import settings
+
+    from authentication.models import User
+    from benchmarks.dataset import Dataset
+
+    settings.RESPONSE_CACHE_ENABLED = args.cache
+    started = time.perf_counter()
+    dataset = Dataset.generate(*size, seed=args.seed)
+    print(f"{dataset.label}: {len(dataset.schools)} schools, {len(dataset.courses)} courses, "
+          f"{dataset.review_count} reviews generated in {time.perf_counter() - started:.1f}s")
+
+    admin = User.objects.create_superuser("benchadmin", "benchadmin@example.com", PASSWORD)
+    tokens = {
+        "admin": bearer(admin),
+        "users": [bearer(user) for user in User.objects.filter(email__in=dataset.users).order_by("username")],
+    }
+    context = Context(dataset, args.seed)
+    results = []
+    for scenario in scenarios():
+        if args.scenario and scenario.name not in args.scenario:
+            continue
+        repeat = min(args.repeat, scenario.repeat or args.repeat)
+        result = run_scenario(scenario, context, repeat, args.warmup, tokens)
+        result.update(size=dataset.label, reviews=dataset.review_count)
+        results.append(result)
+        flag = f"  ({result['errors']} errors)" if result["errors"] else ""
+        print(f"  {scenario.name:<24} p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms "
+              f"p99={result['p99_ms']:8.2f}ms queries={result['queries']:6.2f}{flag}")
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks api")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=[parse_size(s) for s in DEFAULT_SIZES],
+                        help="SCHOOLSxCOURSES_PER_SCHOOLxREVIEWS_PER_COURSE, e.g. 10x100x50")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=472)
+    parser.add_argument("--cache", action="store_true", help="leave the response cache on")
+    parser.add_argument("--scenario", nargs="+", help="only run these scenarios")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with benchmark_database() as connection:
+        from django.core.cache import cache
+        from django.core.management import call_command
+
+        from school.resolver import identifiers
+
+        vendor = connection.vendor
+        for size in args.sizes:
+            # sizes must not see each other's rows, or cached lookups of them
+            call_command("flush", interactive=False, verbosity=0)
+            cache.clear()
+            identifiers.invalidate()
+            results.extend(run_size(size, args))
+
+    if args.json:
+        report = {
+            "benchmark": "api",
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "cache": args.cache,
+            "database": vendor,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "results": results,
+        }
+        with open(args.json, "w") as output:
+            json.dump(report, output, indent=2)
+            output.write("\n")
+        print(f"results written to {args.json}", file=sys.stderr)
+    return 0
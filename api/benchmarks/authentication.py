@@ -0,0 +1,66 @@
+"""
+Authenticated GET throughput with simplejwt's JWTAuthentication, which
+loads the user for every request, and with CachedJWTAuthentication.
+
+    python -m benchmarks authentication --requests 2000 --users 20
+
+Requests go through the whole Django stack with bearer tokens of --users
+users, round robin. The response cache is left on, as deployed, so the
+views are cheap and authentication is a large share of each request; pass
+--no-cache to measure against uncached views.
+"""
+import argparse
+import time
+
+from benchmarks.utils import benchmark_database, print_summary, summarize
+
+
+def run(client, paths, tokens, count):
+    samples = []
+    started = time.perf_counter()
+    for i in range(count):
+        client.credentials(HTTP_AUTHORIZATION=tokens[i % len(tokens)])
+        request_started = time.perf_counter()
+        response = client.get(paths[i % len(paths)])
+        samples.append(time.perf_counter() - request_started)
+        assert response.status_code == 200, response.status_code
+    return samples, count / (time.perf_counter() - started)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks authentication")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--no-cache", action="store_true", help="turn the response cache off")
+    args = parser.parse_args(argv)
+
+    with benchmark_database():
+        from django.conf import settings
+        from django.urls import reverse
+        from rest_framework import views
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        from authentication.backends import CachedJWTAuthentication
+        from authentication.models import User
+        from benchmarks.dataset import Dataset
+
+        settings.RESPONSE_CACHE_ENABLED = not args.no_cache
+        dataset = Dataset.generate(schools=2, courses_per_school=10, reviews_per_course=10, users=args.users)
+        tokens = [f"Bearer {RefreshToken.for_user(user).access_token}"
+                  for user in User.objects.filter(email__in=dataset.users)]
+        paths = [reverse("school", args=[dataset.schools[0][1]]), reverse("review_list")]
+        client = APIClient()
+
+        # every view not overriding authentication_classes uses APIView's
+        default = views.APIView.authentication_classes
+        try:
+            for authentication in (JWTAuthentication, CachedJWTAuthentication):
+                views.APIView.authentication_classes = (authentication,)
+                run(client, paths, tokens, len(tokens) * 2)
+                samples, rps = run(client, paths, tokens, args.requests)
+                print_summary(f"{authentication.__name__:<24} {rps:5.0f} req/s", summarize(samples))
+        finally:
+            views.APIView.authentication_classes = default
+    return 0
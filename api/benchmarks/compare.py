@@ -0,0 +1,73 @@
+"""
+Compare ``python -m benchmarks api --json`` results against a baseline and
+fail on regressions.
+
+    python -m benchmarks compare benchmarks/baselines/api.json results.json
+
+Results are matched by (size, scenario). A scenario regresses when it runs
+more queries per request than the baseline, or when its latency (p50 by
+default) is both --latency-tolerance slower, relatively, and --min-ms
+slower, absolutely; the absolute floor keeps millisecond noise from
+failing the check. Query counts carry over between machines, latencies do
+not: regenerate the baseline where the check runs. Exits 1 if anything
+regressed.
+"""
+import argparse
+import json
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "mean_ms")
+
+
+def load(path):
+    with open(path) as report:
+        return {(result["size"], result["scenario"]): result for result in json.load(report)["results"]}
+
+
+def compare(baseline, current, metric="p50_ms", latency_tolerance=0.25, min_ms=2.0, query_tolerance=0.0):
+    """Yield (key, old, new, problems) for every result in both reports."""
+    for key in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[key], current[key]
+        problems = []
+        if new["queries"] > old["queries"] + query_tolerance:
+            problems.append(f"queries {old['queries']:g} -> {new['queries']:g}")
+        slower = new[metric] - old[metric]
+        if slower > min_ms and new[metric] > old[metric] * (1 + latency_tolerance):
+            problems.append(f"{metric} +{slower / old[metric]:.0%}")
+        if new["errors"] > old["errors"]:
+            problems.append(f"errors {old['errors']} -> {new['errors']}")
+        yield key, old, new, problems
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks compare")
+    parser.add_argument("baseline")
+    parser.add_argument("results")
+    parser.add_argument("--metric", choices=METRICS, default="p50_ms")
+    parser.add_argument("--latency-tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument("--min-ms", type=float, default=2.0,
+                        help="slowdowns smaller than this many milliseconds never count")
+    parser.add_argument("--query-tolerance", type=float, default=0.0,
+                        help="allowed increase in mean queries per request")
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.results)
+    regressions = 0
+    print(f"{'size':<12} {'scenario':<24} {'base ' + args.metric:>14} {args.metric:>10} "
+          f"{'base q':>7} {'q':>7}  result")
+    for (size, scenario), old, new, problems in compare(
+            baseline, current, args.metric, args.latency_tolerance, args.min_ms, args.query_tolerance):
+        regressions += bool(problems)
+        print(f"{size:<12} {scenario:<24} {old[args.metric]:14.2f} {new[args.metric]:10.2f} "
+              f"{old['queries']:7g} {new['queries']:7g}  {'; '.join(problems) or 'ok'}")
+
+    for key in sorted(baseline.keys() - current.keys()):
+        print(f"{key[0]:<12} {key[1]:<24} missing from {args.results}")
+    for key in sorted(current.keys() - baseline.keys()):
+        print(f"{key[0]:<12} {key[1]:<24} not in the baseline")
+
+    if regressions:
+        print(f"{regressions} regression(s) against {args.baseline}")
+        return 1
+    print(f"no regressions against {args.baseline}")
+    return 0
@@ -0,0 +1,316 @@
+"""
+Throughput and latency of the read endpoints under many concurrent
+connections, served by gunicorn (WSGI, sync workers) and by uvicorn (ASGI,
+async read views), at several worker counts.
+
+    python -m benchmarks concurrency --connections 100 1000 --workers 1 2 4
+    python -m benchmarks concurrency --connections 50 --logins 50
+
+
+The dataset is generated once into a temporary SQLite file that every
+server process opens. Each of the --connections clients loops over the
+read scenarios for --duration seconds, keeping its connection alive where
+the server allows it (gunicorn's sync workers close it after every
+response, so those clients reconnect). Latency includes waiting in the
+listen backlog; requests that fail, time out or return 4xx/5xx count as
+errors. The response cache is off, so every request reaches the views.
+With --logins, that many more connections log in over and over meanwhile,
+and their results are reported separately from the reads'.
+
+A sync worker holds one connection at a time, so a WSGI deployment needs
+workers (or --threads) in proportion to the connections it should serve
+at once; an ASGI worker keeps all of them open and parks each request on
+a coroutine while it waits. Both still run one request's Python at a
+time per process: on a single core the throughput is about the same and
+what changes is how many connections are served rather than queued.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+from benchmarks.utils import percentile
+
+READ_SCENARIOS = ("schools", "school", "review_list", "review_detail", "school_reviews",
+                  "school_courses", "school_courses_search")
+API_DIR = Path(__file__).resolve().parent.parent
+
+
+def seed_database(path, size, seed):
+    """
+    Migrate a SQLite database at path and fill it; returns the requests per
+    scenario, as (path, body) pairs.
+    """
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from benchmarks.utils import setup_django
+    setup_django()
+    from django.core.management import call_command
+    from django.db import connections
+    from django.urls import reverse
+
+    from benchmarks.dataset import PASSWORD, Dataset
+
+    call_command("migrate", interactive=False, verbosity=0)
+    dataset = Dataset.generate(*size, seed=seed)
+    print(f"{dataset.label}: {len(dataset.schools)} schools, {len(dataset.courses)} courses, "
+          f"{dataset.review_count} reviews")
+
+    def school(i):
+        return dataset.schools[i % len(dataset.schools)][1]
+
+    def course(i):
+        return dataset.courses[(i * 7919) % len(dataset.courses)]
+
+    paths = {
+        "schools": lambda i: reverse("schools"),
+        "school": lambda i: reverse("school", args=[school(i)]),
+        "review_list": lambda i: reverse("review_list"),
+        "review_detail": lambda i: reverse("review_detail", args=[dataset.reviews[i % len(dataset.reviews)]]),
+        "school_reviews": lambda i: reverse("school_reviews", args=[school(i)]),
+        "school_courses": lambda i: reverse("school_courses", args=[school(i)]),
+        "school_courses_search": lambda i: (
+            reverse("school_courses", args=[course(i)[1]]) + f"?q={quote(course(i)[2][:3])}"),
+    }
+    scenarios = {name: [(paths[name](i), None) for i in range(200)] for name in READ_SCENARIOS}
+    scenarios["login"] = [(reverse("login"), json.dumps({"email": email, "password": PASSWORD}))
+                          for email in dataset.users]
+    connections.close_all()
+    return scenarios
+
+
+def server_command(server, workers, threads, port):
+    if server == "wsgi":
+        command = ["gunicorn", "backend.wsgi", "--bind", f"127.0.0.1:{port}", "--workers", str(workers),
+                   "--backlog", "4096", "--timeout", "120", "--log-level", "warning"]
+        if threads > 1:
+            command += ["--threads", str(threads)]
+        return command
+    return ["uvicorn", "backend.asgi:application", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--backlog", "4096", "--no-access-log", "--log-level", "warning"]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(server, workers, threads, database, probe):
+    port = free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{database}",
+        "RESPONSE_CACHE_ENABLED": "False",
+        "THROTTLE_ENABLED": "False",
+        "ASYNC_READ_VIEWS": "True" if server == "asgi" else "False",
+    }
+    process = subprocess.Popen(server_command(server, workers, threads, port), cwd=API_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{server} server exited with {process.returncode}")
+        try:
+            status, _ = asyncio.run(fetch_once(port, *probe))
+            if status == 200:
+                return process, port
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{server} server did not start on port {port}")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def read_response(reader):
+    """(status, keep_alive) of one HTTP/1.1 response, reading its body."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("connection", "").lower() != "close"
+
+
+def request_bytes(path, body=None):
+    if body is None:
+        return f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: application/json\r\n\r\n".encode()
+    body = body.encode()
+    return (f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: application/json\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+async def fetch_once(port, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(request_bytes(path, body))
+        return await read_response(reader)
+    finally:
+        writer.close()
+
+
+async def client(port, requests, offset, stop_at, timeout, samples, errors):
+    connection = None
+    i = offset
+    while time.monotonic() < stop_at:
+        path, body = requests[i % len(requests)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+            reader, writer = connection
+            writer.write(request_bytes(path, body))
+            status, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+            errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+            if connection is not None:
+                connection[1].close()
+            connection = None
+            continue
+        samples.append(time.perf_counter() - started)
+        if status >= 400:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+        if not keep_alive:
+            writer.close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def load(port, streams, duration, timeout):
+    """Run streams, {name: (requests, connections)}, at once; returns {name: result}."""
+    stop_at = time.monotonic() + duration
+    started = time.perf_counter()
+    outcomes = {name: ([], {}) for name in streams}
+    await asyncio.gather(*(
+        client(port, requests, i * 7, stop_at, timeout, *outcomes[name])
+        for name, (requests, connections) in streams.items() for i in range(connections)))
+    elapsed = time.perf_counter() - started
+    return {name: summarize_load(samples, errors, elapsed) for name, (samples, errors) in outcomes.items()}
+
+
+def summarize_load(samples, errors, elapsed):
+    result = {
+        "requests": len(samples),
+        "errors": sum(errors.values()),
+        "error_kinds": errors,
+        # successful responses per second
+        "rps": round((len(samples) - sum(n for kind, n in errors.items() if kind.isdigit())) / elapsed, 1),
+    }
+    if samples:
+        result.update({
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+        })
+    return result
+
+
+def run(server, workers, connections, requests, args):
+    process, port = start_server(server, workers, args.threads, args.database, requests["reads"][0])
+    streams = {"reads": (requests["reads"], connections)}
+    if args.logins:
+        streams["logins"] = (requests["logins"], args.logins)
+    try:
+        # warm every worker's caches and connections
+        asyncio.run(load(port, {"reads": (requests["reads"], min(connections, 4 * workers))}, 1.0, args.timeout))
+        results = asyncio.run(load(port, streams, args.duration, args.timeout))
+    finally:
+        stop_server(process)
+    return {
+        "server": server,
+        "workers": workers,
+        "threads": args.threads if server == "wsgi" else 1,
+        "connections": connections,
+        **results.pop("reads"),
+        **results,
+    }
+
+
+def print_load(label, result):
+    flag = f"  errors={result['errors']} {result['error_kinds']}" if result["errors"] else ""
+    print(f"  {label} rps={result['rps']:8.1f} p50={result.get('p50_ms', 0):8.1f}ms "
+          f"p95={result.get('p95_ms', 0):8.1f}ms p99={result.get('p99_ms', 0):8.1f}ms{flag}")
+
+
+def main(argv):
+    from benchmarks.api import parse_size
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks concurrency")
+    parser.add_argument("--size", type=parse_size, default=parse_size("5x40x25"),
+                        help="SCHOOLSxCOURSES_PER_SCHOOLxREVIEWS_PER_COURSE")
+    parser.add_argument("--servers", nargs="+", choices=("wsgi", "asgi"), default=["wsgi", "asgi"])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn threads per WSGI worker")
+    parser.add_argument("--connections", nargs="+", type=int, default=[100, 1000])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per run")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds before a request counts as failed")
+    parser.add_argument("--scenario", nargs="+", choices=READ_SCENARIOS, help="only request these scenarios")
+    parser.add_argument("--logins", type=int, default=0, help="connections logging in while the reads run")
+    parser.add_argument("--seed", type=int, default=472)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        args.database = Path(directory) / "concurrency.sqlite3"
+        scenarios = seed_database(args.database, args.size, args.seed)
+        # interleaved, so every connection requests every scenario
+        requests = {
+            "reads": [request for group in zip(*(scenarios[name] for name in args.scenario or READ_SCENARIOS))
+                      for request in group],
+            "logins": scenarios["login"],
+        }
+        for server in args.servers:
+            for workers in args.workers:
+                for connections in args.connections:
+                    result = run(server, workers, connections, requests, args)
+                    results.append(result)
+                    print_load(f"{server} workers={workers:<3} connections={connections:<5}", result)
+                    if "logins" in result:
+                        print_load(f"{'':>4} {args.logins:>4} connections logging in   ", result["logins"])
+
+    if args.json:
+        report = {
+            "benchmark": "concurrency",
+            "size": "x".join(str(part) for part in args.size),
+            "duration": args.duration,
+            "logins": args.logins,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "results": results,
+        }
+        with open(args.json, "w") as output:
+            json.dump(report, output, indent=2)
+            output.write("\n")
+        print(f"results written to {args.json}", file=sys.stderr)
+    return 0
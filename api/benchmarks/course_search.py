@@ -0,0 +1,64 @@
+"""
+Course typeahead latency, cold (index rebuilt from the database) and warm.
+
+    python -m benchmarks course_search --courses 30000
+"""
+import argparse
+import random
+import string
+
+from benchmarks.utils import benchmark_database, measure, print_summary, summarize
+
+TITLE_WORDS = (
+    "Introduction Advanced Computer Science Systems Calculus Composition Logic Design Data Structures "
+    "Algorithms Biology Chemistry Physics History Literature Economics Accounting Statistics Networks "
+    "Databases Theory Applied Methods Seminar Research Analysis Principles Engineering Music Art"
+).split()
+QUERIES = ("CS 1", "cs13", "Compu", "comp sci", "intro", "a", "MATH 2", "Data Str", "zzzz", "Seminar in")
+
+
+def create_courses(count, seed):
+    from school.models import Course, School
+
+    rng = random.Random(seed)
+    school = School.objects.create(long_name="Benchmark University", short_name="BENCH")
+    subjects = ["CS", "CPE", "MATH"] + [
+        "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 4))) for _ in range(300)
+    ]
+    seen = set()
+    courses = []
+    while len(courses) < count:
+        code = (rng.choice(subjects), str(rng.randint(100, 799)) + rng.choice(["", "", "L", "R"]))
+        if code in seen:
+            continue
+        seen.add(code)
+        title = " ".join(rng.sample(TITLE_WORDS, rng.randint(2, 5)))
+        courses.append(Course(school=school, subject=code[0], catalog_number=code[1], title=title[:55]))
+    Course.objects.bulk_create(courses, batch_size=2000)
+    return school
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks course_search")
+    parser.add_argument("--courses", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=472)
+    args = parser.parse_args(argv)
+
+    with benchmark_database():
+        from school.search import course_indexes
+
+        school = create_courses(args.courses, args.seed)
+
+        def cold():
+            course_indexes.invalidate(school.pk)
+            course_indexes.get(school.pk).search("CS 1")
+
+        print(f"{args.courses} courses")
+        print_summary("cold (rebuild + search)", summarize(measure(cold, max(3, args.repeat // 20))))
+
+        index = course_indexes.get(school.pk)
+        for query in QUERIES:
+            samples = measure(lambda: course_indexes.get(school.pk).search(query, 10), args.repeat)
+            print_summary(f"warm q={query!r} ({len(index.search(query, 10))} hits)", summarize(samples))
+    return 0
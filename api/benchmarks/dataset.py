@@ -0,0 +1,108 @@
+"""
+Seeded synthetic data for benchmarks: N schools, M courses per school and
+K reviews per course, plus users to log in with.
+
+The same seed always produces the same rows. Names come from Faker; review
+texts are drawn from a pool of Faker paragraphs so that generating millions
+of reviews costs little more than inserting them. Rows are written with
+bulk_create in batches, then the review stats are rebuilt once.
+
+    from benchmarks.dataset import Dataset
+    dataset = Dataset.generate(schools=10, courses_per_school=100, reviews_per_course=50)
+"""
+import random
+import string
+from dataclasses import dataclass, field
+
+from faker import Faker
+
+TERMS = ("Spring", "Summer", "Fall")
+GRADES = ("A+", "A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D", "F", "N/A")
+METHODS = ("Online", "In Person", "Hybrid")
+TEXT_POOL_SIZE = 2000
+
+# what benchmark users log in with
+PASSWORD = "benchmark-password"
+
+
+@dataclass
+class Dataset:
+    """Identifiers of the generated rows that scenarios need."""
+    seed: int
+    schools: list = field(default_factory=list)
+    courses: list = field(default_factory=list)
+    reviews: list = field(default_factory=list)
+    users: list = field(default_factory=list)
+    review_count: int = 0
+
+    @property
+    def label(self):
+        return (f"{len(self.schools)}x{len(self.courses) // max(1, len(self.schools))}"
+                f"x{self.review_count // max(1, len(self.courses))}")
+
+    @classmethod
+    def generate(cls, schools, courses_per_school, reviews_per_course, users=20, seed=472, batch_size=5000):
+        from django.contrib.auth.hashers import make_password
+
+        from authentication.models import User
+        from review.models import Review
+        from review.stats import rebuild_review_stats
+        from school.models import Course, School
+
+        rng = random.Random(seed)
+        fake = Faker()
+        fake.seed_instance(seed)
+        dataset = cls(seed=seed)
+
+        school_rows = []
+        for i in range(schools):
+            city = fake.city()
+            school_rows.append(School(
+                long_name=f"{city[:14]} University {i}"[:25], short_name=f"S{i}"[:5],
+                website=f"https://s{i}.example.edu", city=city[:25], state=fake.state()[:25], country="USA",
+            ))
+        School.objects.bulk_create(school_rows, batch_size=batch_size)
+
+        subjects = sorted({"".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 4)))
+                           for _ in range(max(4, courses_per_school // 10))})
+        course_rows = []
+        for school in school_rows:
+            codes = set()
+            while len(codes) < courses_per_school:
+                codes.add((rng.choice(subjects), str(rng.randint(100, 999))))
+            for subject, catalog_number in sorted(codes):
+                title = fake.catch_phrase().title()[:55]
+                course_rows.append(Course(school=school, subject=subject, catalog_number=catalog_number, title=title))
+        Course.objects.bulk_create(course_rows, batch_size=batch_size)
+
+        texts = [fake.paragraph(nb_sentences=rng.randint(1, 6))[:500] for _ in range(TEXT_POOL_SIZE)]
+        batch = []
+        for course in course_rows:
+            for _ in range(reviews_per_course):
+                batch.append(Review(
+                    school_id=course.school_id, course=course, review_text=rng.choice(texts),
+                    term=rng.choice(TERMS), grade_received=rng.choice(GRADES),
+                    delivery_method=rng.choice(METHODS), year_taken=rng.randint(2015, 2024),
+                    textbook_required=rng.random() < 0.4, recommended=rng.random() < 0.7,
+                ))
+                if len(batch) >= batch_size:
+                    Review.objects.bulk_create(batch)
+                    dataset.reviews.extend(review.pk for review in batch[:10])
+                    dataset.review_count += len(batch)
+                    batch = []
+        Review.objects.bulk_create(batch)
+        dataset.reviews.extend(review.pk for review in batch[:10])
+        dataset.review_count += len(batch)
+        rebuild_review_stats()
+
+        # hashing is deliberately slow, so every user shares one hash
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            User(username=f"bench{i}", email=f"bench{i}@example.com", password=password, is_verified=True)
+            for i in range(users))
+
+        dataset.schools = [(school.pk, school.short_name) for school in school_rows]
+        dataset.courses = [(course.pk, course.school.short_name, f"{course.subject} {course.catalog_number}")
+                           for course in course_rows]
+        dataset.users = [f"bench{i}@example.com" for i in range(users)]
+        return dataset
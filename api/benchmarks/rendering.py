@@ -0,0 +1,59 @@
+"""
+Time to render review lists to JSON with DRF's stdlib renderer and with
+utils.renderers.JSONRenderer, and the old and new authentication UserRender.
+
+    python -m benchmarks rendering --reviews 50 1000 10000
+
+Payloads are the review list endpoint's response data, serialized once
+outside the timed part, so only rendering is measured.
+"""
+import argparse
+import json
+
+from benchmarks.utils import benchmark_database, measure, print_summary, summarize
+
+
+class StringUserRender:
+    """UserRender before orjson: str() of the payload, then json.dumps."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if 'ErrorDetail' in str(data):
+            return json.dumps({'errors': data})
+        return json.dumps({'data': data})
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks rendering")
+    parser.add_argument("--reviews", type=int, nargs="+", default=[50, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with benchmark_database():
+        from rest_framework import renderers
+
+        from authentication.renderers import UserRender
+        from benchmarks.dataset import Dataset
+        from review.serializers import ReviewReadSerializer
+        from review.views import ReviewAPIView
+        from utils.renderers import JSONRenderer
+
+        largest = max(args.reviews)
+        Dataset.generate(schools=1, courses_per_school=100, reviews_per_course=-(-largest // 100))
+        reviews = list(ReviewAPIView().get_queryset()[:largest])
+        user = {"email": "benchmark@example.com", "username": "benchmark", "tokens": "x" * 400}
+
+        for count in sorted(args.reviews):
+            data = {
+                "message": "Reviews listed successfully",
+                "data": ReviewReadSerializer(reviews[:count], many=True).data,
+                "next": None, "previous": None,
+            }
+            size = len(renderers.JSONRenderer().render(data))
+            print(f"{count} reviews, {size / 1024:.0f} KiB of JSON")
+            for label, renderer in (("DRF JSONRenderer", renderers.JSONRenderer()),
+                                    ("utils.renderers.JSONRenderer", JSONRenderer())):
+                print_summary(f"  {label}", summarize(measure(lambda: renderer.render(data), args.repeat)))
+
+        for label, renderer in (("UserRender, str() check", StringUserRender()), ("UserRender", UserRender())):
+            print_summary(label, summarize(measure(lambda: renderer.render(user), args.repeat * 100)))
+    return 0
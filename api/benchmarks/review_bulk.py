@@ -0,0 +1,77 @@
+"""
+Review import throughput: the bulk endpoint against one POST per review.
+
+    python -m benchmarks review_bulk --reviews 50000 --batch-size 5000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.utils import benchmark_database
+
+TERMS = ("Spring", "Summer", "Fall")
+GRADES = ("A", "A-", "B+", "B", "C", "D", "F")
+METHODS = ("Online", "In Person", "Hybrid")
+
+
+def make_items(count, courses, rng, codes=True):
+    items = []
+    for i in range(count):
+        course = rng.choice(courses)
+        items.append({
+            "school": course.school.short_name,
+            # half the items name the course by code, half by id
+            "course": f"{course.subject} {course.catalog_number}" if codes and i % 2 else str(course.pk),
+            "review_text": f"Imported review {i} " + "lorem ipsum " * rng.randint(1, 20),
+            "term": rng.choice(TERMS),
+            "grade_received": rng.choice(GRADES),
+            "delivery_method": rng.choice(METHODS),
+            "year_taken": rng.randint(2015, 2023),
+            "recommended": rng.random() < 0.7,
+        })
+    return items
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks review_bulk")
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--single", type=int, default=500, help="reviews sent one POST at a time, for comparison")
+    parser.add_argument("--seed", type=int, default=472)
+    args = parser.parse_args(argv)
+
+    with benchmark_database() as connection:
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+
+        from authentication.models import User
+        from review.models import Review
+        from school.models import Course, School
+
+        rng = random.Random(args.seed)
+        schools = School.objects.bulk_create(
+            School(long_name=f"Benchmark University {i}", short_name=f"BENCH{i}") for i in range(5))
+        courses = Course.objects.bulk_create(
+            Course(school=school, subject="CS", catalog_number=str(100 + i), title=f"Course {i}")
+            for school in schools for i in range(100))
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser("bench", "bench@example.com", "bench"))
+
+        # ReviewAPIView.post looks course codes up across all schools
+        items = make_items(args.single, courses, rng, codes=False)
+        started = time.perf_counter()
+        for item in items:
+            client.post(reverse("review_list"), item, format="json")
+        elapsed = time.perf_counter() - started
+        print(f"single POST: {args.single} reviews in {elapsed:.2f}s ({args.single / elapsed:,.0f} reviews/sec)")
+
+        items = make_items(args.reviews, courses, rng)
+        started = time.perf_counter()
+        for start in range(0, len(items), args.batch_size):
+            response = client.post(reverse("review_bulk"), items[start:start + args.batch_size], format="json")
+            assert not response.data["data"]["errors"], response.data["data"]["errors"][:3]
+        elapsed = time.perf_counter() - started
+        print(f"bulk ({args.batch_size}/request): {args.reviews} reviews in {elapsed:.2f}s "
+              f"({args.reviews / elapsed:,.0f} reviews/sec) on {connection.vendor}")
+        assert Review.objects.count() == args.reviews + args.single
+    return 0
@@ -0,0 +1,76 @@
+"""
+Peak Python memory of the streaming review export against the paginated
+list endpoint serialized in one go, at growing table sizes.
+
+    python -m benchmarks review_export --reviews 10000 100000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.utils import benchmark_database
+
+
+def create_reviews(count, courses):
+    from review.models import Review
+
+    batch = []
+    for i in range(count):
+        course = courses[i % len(courses)]
+        batch.append(Review(school_id=course.school_id, course=course,
+                            review_text=f"Exported review {i} " + "lorem ipsum " * 20,
+                            term="Fall", grade_received="A", delivery_method="Online"))
+        if len(batch) == 5000:
+            Review.objects.bulk_create(batch)
+            batch = []
+    Review.objects.bulk_create(batch)
+
+
+def traced(func):
+    """(seconds, peak traced bytes) of func()."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks review_export")
+    parser.add_argument("--reviews", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson", dest="output_format")
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args(argv)
+
+    with benchmark_database() as connection:
+        from review import export
+        from review.models import Review
+        from review.serializers import ReviewReadSerializer
+        from school.models import Course, School
+
+        school = School.objects.create(long_name="Benchmark University", short_name="BENCH")
+        courses = Course.objects.bulk_create(
+            Course(school=school, subject="CS", catalog_number=str(100 + i), title=f"Course {i}")
+            for i in range(50))
+        created = 0
+        for count in sorted(args.reviews):
+            create_reviews(count - created, courses)
+            created = count
+
+            def stream():
+                size = 0
+                for chunk in export.export_reviews(export.export_queryset(), args.output_format, args.gzip):
+                    size += len(chunk)
+                return size
+
+            def serialize_all():
+                reviews = Review.objects.select_related("school", "course")
+                return len(ReviewReadSerializer(reviews, many=True).data)
+
+            for label, func in (("streamed export", stream), ("serialized list", serialize_all)):
+                elapsed, peak = traced(func)
+                print(f"{label:<16} {count:>8} reviews: {elapsed:6.2f}s, peak {peak / 2 ** 20:8.1f} MiB "
+                      f"on {connection.vendor}")
+    return 0
@@ -0,0 +1,99 @@
+"""
+Review full-text search latency against a LIKE scan, on generated reviews.
+
+    python -m benchmarks review_search --reviews 1000000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.utils import benchmark_database, measure, print_summary, summarize
+
+# a few hundred words with a Zipf-like frequency, so that some queries match
+# a large share of the reviews and others only a handful
+COMMON = (
+    "the class was and professor lectures homework exams really good hard easy "
+    "textbook online quizzes grading fair helpful office hours project final midterm"
+).split()
+RARE = (
+    "calculus derivatives integrals recursion pointers compilers thermodynamics "
+    "photosynthesis sonnets microeconomics regression eigenvalues syllabus tutoring"
+).split()
+QUERIES = ("professor", "homework exams", "eigenvalues", "recursion pointers", "zzzz")
+
+
+def vocabulary(rng):
+    words = COMMON + RARE + ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 9)))
+                             for _ in range(400)]
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def create_reviews(count, seed):
+    from review.models import Review
+    from school.models import Course, School
+
+    rng = random.Random(seed)
+    words, weights = vocabulary(rng)
+    schools = School.objects.bulk_create(
+        School(long_name=f"Benchmark University {i}", short_name=f"BENCH{i}") for i in range(10))
+    courses = Course.objects.bulk_create(
+        Course(school=school, subject="CS", catalog_number=str(100 + i), title=f"Course {i}")
+        for school in schools for i in range(20))
+
+    batch = []
+    for i in range(count):
+        course = courses[i % len(courses)]
+        text = " ".join(rng.choices(words, weights, k=rng.randint(10, 60)))
+        batch.append(Review(school_id=course.school_id, course=course, review_text=text[:500],
+                            term="Fall", grade_received="A", delivery_method="Online"))
+        if len(batch) == 5000:
+            Review.objects.bulk_create(batch)
+            batch = []
+    Review.objects.bulk_create(batch)
+    return schools[0]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks review_search")
+    parser.add_argument("--reviews", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=472)
+    parser.add_argument("--max-candidates", type=int, default=None,
+                        help="override REVIEW_SEARCH_MAX_CANDIDATES (0 ranks every match)")
+    args = parser.parse_args(argv)
+
+    with benchmark_database() as connection:
+        from django.conf import settings
+        from review.models import Review
+        from review.search import search_reviews
+
+        if args.max_candidates is not None:
+            settings.REVIEW_SEARCH_MAX_CANDIDATES = args.max_candidates
+
+        started = time.perf_counter()
+        school = create_reviews(args.reviews, args.seed)
+        print(f"{args.reviews} reviews on {connection.vendor}, created and indexed in "
+              f"{time.perf_counter() - started:.1f}s; ranking at most "
+              f"{settings.REVIEW_SEARCH_MAX_CANDIDATES or 'all'} candidates")
+
+        limit = args.page_size + 1
+        for query in QUERIES:
+            first = search_reviews(query, limit=limit)
+            print_summary(f"search q={query!r}", summarize(
+                measure(lambda: search_reviews(query, limit=limit), args.repeat)))
+            print_summary(f"search q={query!r} school", summarize(
+                measure(lambda: search_reviews(query, school.pk, limit=limit), args.repeat)))
+            if len(first) == limit:
+                after = (first[-2].rank, first[-2].pk)
+                print_summary(f"search q={query!r} page 2", summarize(
+                    measure(lambda: search_reviews(query, after=after, limit=limit), args.repeat)))
+
+            # what filtering without the index costs: a scan of every review_text
+            word = query.split()[0]
+            print_summary(f"LIKE scan {word!r}", summarize(measure(
+                lambda: list(Review.objects.filter(review_text__icontains=word)
+                             .values_list("id", flat=True)[:limit]),
+                max(3, args.repeat // 10))))
+    return 0
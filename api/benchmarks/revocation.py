@@ -0,0 +1,64 @@
+"""
+Per-request cost of checking tokens against the revocation set, with
+--revoked unexpired revocations in the table.
+
+    python -m benchmarks revocation --revoked 1000 100000
+
+For each size it times a filter rebuild, a check of an unrevoked token
+(the usual request: a filter miss), the query a check would make without
+the filter, and CachedJWTAuthentication.authenticate() with and without
+the revocation check.
+"""
+import argparse
+import datetime
+
+from benchmarks.utils import benchmark_database, measure, print_summary, summarize
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks revocation")
+    parser.add_argument("--revoked", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with benchmark_database():
+        from django.utils import timezone
+        from rest_framework.test import APIRequestFactory
+        from rest_framework_simplejwt.settings import api_settings
+
+        from authentication.backends import CachedJWTAuthentication
+        from authentication.models import RevokedToken, User
+        from authentication.revocation import revoked_tokens
+        from authentication.tokens import REFRESH_JTI_CLAIM, RefreshToken
+
+        class UncheckedJWTAuthentication(CachedJWTAuthentication):
+            def get_validated_token(self, raw_token):
+                return super(CachedJWTAuthentication, self).get_validated_token(raw_token)
+
+        user = User.objects.create_user("benchmark", "benchmark@example.com", "password123")
+        access = RefreshToken.for_user(user).access_token
+        jtis = (access[api_settings.JTI_CLAIM], access[REFRESH_JTI_CLAIM])
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        expires_at = timezone.now() + datetime.timedelta(days=1)
+
+        for count in sorted(args.revoked):
+            RevokedToken.objects.bulk_create(
+                [RevokedToken(jti=f"revoked-{i}", expires_at=expires_at)
+                 for i in range(RevokedToken.objects.count(), count)], batch_size=5000)
+            print(f"{count} revoked tokens")
+
+            def rebuild():
+                revoked_tokens.discard()
+                revoked_tokens.bloom()
+
+            print_summary("  rebuild the filter", summarize(measure(rebuild, 5)))
+            print_summary("  is_revoked(), unrevoked token",
+                          summarize(measure(lambda: revoked_tokens.is_revoked(*jtis), args.repeat)))
+            print_summary("  query per request instead",
+                          summarize(measure(lambda: RevokedToken.objects.filter(jti__in=jtis).exists(),
+                                            args.repeat)))
+            for authentication in (UncheckedJWTAuthentication(), CachedJWTAuthentication()):
+                authentication.authenticate(request)
+                print_summary(f"  {type(authentication).__name__}.authenticate()",
+                              summarize(measure(lambda: authentication.authenticate(request), args.repeat)))
+    return 0
@@ -0,0 +1,63 @@
+"""
+Time a throttle takes to admit a request: utils.throttling's GCRA throttle
+with each store, and DRF's sliding-window-log AnonRateThrottle.
+
+    python -m benchmarks throttling --keys 1 10000
+
+Requests come from --keys addresses, round robin, under a limit none of
+them reaches, so every check admits its request and updates the key.
+"""
+import argparse
+
+from benchmarks.utils import benchmark_database, measure, print_summary, summarize
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks throttling")
+    parser.add_argument("--keys", type=int, nargs="+", default=[1, 10000])
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    with benchmark_database():
+        from django.conf import settings
+        from rest_framework import throttling
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+        from rest_framework.views import APIView
+
+        from utils.throttling import IPRateThrottle, get_store
+
+        class View(APIView):
+            throttle_scope = "benchmark"
+
+        class AnonRateThrottle(throttling.AnonRateThrottle):
+            rate = "1000000/hour"
+
+        settings.THROTTLE_ENABLED = True
+        settings.THROTTLE_RATES = {"benchmark.ip": "1000000/hour"}
+        throttles = (
+            ("IPRateThrottle, LocalStore", IPRateThrottle, "utils.throttling.LocalStore"),
+            ("IPRateThrottle, CacheStore", IPRateThrottle, "utils.throttling.CacheStore"),
+            ("DRF AnonRateThrottle", AnonRateThrottle, None),
+        )
+        for count in args.keys:
+            print(f"{count} keys ({settings.CACHES[settings.THROTTLE_CACHE_ALIAS]['BACKEND'].rsplit('.', 1)[-1]})")
+            requests = [Request(APIRequestFactory().post("/", REMOTE_ADDR=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"))
+                        for i in range(count)]
+            for label, throttle_class, store in throttles:
+                if store:
+                    settings.THROTTLE_STORE = store
+                    get_store().clear()
+                else:
+                    throttling.AnonRateThrottle.cache.clear()
+                view = View()
+                calls = iter(range(args.repeat * 2))
+
+                def check():
+                    request = requests[next(calls) % count]
+                    view.headers = {}
+                    assert throttle_class().allow_request(request, view)
+
+                measure(check, args.repeat)
+                print_summary(f"  {label}", summarize(measure(check, args.repeat)))
+    return 0
@@ -0,0 +1,64 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+    # the benchmarks send far more requests than the rate limits allow; the
+    # throttling benchmark turns them on itself
+    os.environ.setdefault("THROTTLE_ENABLED", "False")
+    import django
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """Create the test database (in memory for SQLite) and drop it afterwards."""
+    setup_django()
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat):
+    """Call func() repeat times and return the wall time of each call in seconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def print_summary(label, summary):
+    print(
+        f"{label:<40} n={summary['count']:<6} "
+        f"p50={summary['p50_ms']:8.3f}ms p95={summary['p95_ms']:8.3f}ms "
+        f"p99={summary['p99_ms']:8.3f}ms max={summary['max_ms']:8.3f}ms"
+    )
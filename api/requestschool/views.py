@@ -5,6 +5,8 @@ from rest_framework.parsers import JSONParser
 from rest_framework import views, status
 from rest_framework.response import Response
 from .models import RequestSchool
+from utils.conditional import conditional_response, get_validators
+from utils.throttling import IPRateThrottle
 
 
 class RequestSchoolAPIView(views.APIView):
@@ -12,6 +14,9 @@ class RequestSchoolAPIView(views.APIView):
     Endpoints for creating, listing, and deleting school requests
     """
     serializer_class = RequestSchoolSerializer
+    query_budget = {"GET": 4}
+    throttle_classes = (IPRateThrottle,)
+    throttle_scope = {"POST": "school_requests"}
 
     """Create a new school request"""
     def post(self, request):
@@ -30,6 +35,13 @@ class RequestSchoolAPIView(views.APIView):
     
     """Get school requests"""
     def get(self, request, school_name=None):
+        request_schools = RequestSchool.objects.all()
+        if school_name:
+            request_schools = request_schools.filter(school_name=school_name)
+        return conditional_response(request, lambda: self.get_school_requests(school_name),
+                                    lambda: get_validators(request, request_schools))
+
+    def get_school_requests(self, school_name=None):
         try:
             if school_name:
                 request_school_object = RequestSchool.objects.get(school_name=school_name)
@@ -1,5 +1,90 @@
+import datetime
+
 from django.contrib import admin
-from .models import Review
+from django.db import transaction
+from review import stats
+from school.resolver import identifiers, parse_uuid
+from utils.pagination import EstimatedCountPaginator
+from .models import Review, ReviewVote
+
+
+class IdentifierFilter(admin.ListFilter):
+    """
+    A sidebar filter with a search box for a school or course identifier,
+    rather than a link for each of the thousands of schools or courses, so
+    rendering it costs no query.
+    """
+    template = 'admin/review/identifier_filter.html'
+    parameter_name = None
+    placeholder = ''
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.value = params.pop(self.parameter_name, '').strip()
+        if self.value:
+            self.used_parameters[self.parameter_name] = self.value
+
+    def has_output(self):
+        return True
+
+    def expected_parameters(self):
+        return [self.parameter_name]
+
+    def choices(self, changelist):
+        yield {
+            'parameter_name': self.parameter_name,
+            'value': self.value,
+            'placeholder': self.placeholder,
+            # the other filters and the ordering, kept when this one is submitted
+            'hidden': [(name, value) for name, value in changelist.params.items() if name != self.parameter_name],
+            'reset_url': changelist.get_query_string(remove=[self.parameter_name]),
+        }
+
+
+class SchoolFilter(IdentifierFilter):
+    title = 'school'
+    parameter_name = 'school'
+    placeholder = 'Short name or id'
+
+    def queryset(self, request, queryset):
+        if not self.value:
+            return queryset
+        school_id = identifiers.school_id(self.value)
+        return queryset.filter(school_id=school_id) if school_id else queryset.none()
+
+
+class CourseFilter(IdentifierFilter):
+    title = 'course'
+    parameter_name = 'course'
+    placeholder = 'SUBJ NUM or id'
+
+    def queryset(self, request, queryset):
+        if not self.value:
+            return queryset
+        school = request.GET.get(SchoolFilter.parameter_name, '').strip()
+        if school or parse_uuid(self.value):
+            course_id = identifiers.course_id(identifiers.school_id(school), self.value)
+            return queryset.filter(course_id=course_id) if course_id else queryset.none()
+        # a course code in every school
+        parts = self.value.split()
+        if len(parts) != 2:
+            return queryset.none()
+        return queryset.filter(course__subject=parts[0], course__catalog_number=parts[1])
+
+
+class YearTakenFilter(admin.SimpleListFilter):
+    """The last ten years, instead of the distinct years found by scanning every review."""
+    title = 'year taken'
+    parameter_name = 'year_taken'
+
+    def lookups(self, request, model_admin):
+        year = datetime.date.today().year
+        return [(str(value), str(value)) for value in range(year, year - 10, -1)]
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().isdigit():
+            return queryset.filter(year_taken=self.value())
+        return queryset
 
 
 @admin.register(Review)
@@ -19,14 +104,49 @@ class ReviewAdmin(admin.ModelAdmin):
         'created_at',
         'updated_at'
     )
+    # school and course are shown on every row
+    list_select_related = ('school', 'course')
 
     list_filter = (
-        'school',
-        'course',
+        SchoolFilter,
+        CourseFilter,
         'term',
         'grade_received',
         'delivery_method',
-        'year_taken',
+        YearTakenFilter,
         'textbook_required',
         'recommended'
     )
+
+    autocomplete_fields = ('school', 'course')
+    # the review table is too large to count on every page load
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # the stats tables follow every write, as through the API
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            previous = stats.stored_snapshots(Review.objects.filter(pk=obj.pk)) if change else []
+            super().save_model(request, obj, form, change)
+            stats.update_review_stats(added=[obj], removed=previous)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            stats.update_review_stats(removed=[obj])
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            removed = stats.stored_snapshots(queryset)
+            super().delete_queryset(request, queryset)
+            stats.update_review_stats(removed=removed)
+
+
+@admin.register(ReviewVote)
+class ReviewVoteAdmin(admin.ModelAdmin):
+    list_display = ('review', 'user', 'created_at')
+    # reviews are shown by their school and course
+    list_select_related = ('review__school', 'review__course', 'user')
+    raw_id_fields = ('review', 'user')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
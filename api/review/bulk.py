@@ -0,0 +1,169 @@
+"""
+Bulk review writes for imports.
+
+Every item is validated on its own and reported back with its index, so
+one bad row does not fail the batch. Work that the single-review endpoint
+does per review is done once per batch instead: schools, courses and
+existing reviews are each resolved with one query, the serializer's fields
+are built once, and the rows are written with bulk_create/bulk_update and
+one stats update in a single transaction.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from review import stats
+from review.models import Review
+from review.serializers import ReviewBulkSerializer
+from school.models import Course, School
+from school.resolver import parse_uuid
+
+# bulk_update writes the same columns for every row; fields an item leaves
+# out keep their current values
+UPDATE_FIELDS = (
+    "school", "course", "review_text", "term", "grade_received", "delivery_method",
+    "year_taken", "textbook_required", "recommended", "updated_at",
+)
+
+
+def lookup_key(identifier):
+    """The key an id (in any UUID spelling) or a name is resolved under."""
+    identifier_id = parse_uuid(identifier)
+    return str(identifier_id) if identifier_id else str(identifier)
+
+
+def course_identifier(item):
+    identifier = item.get("course")
+    # form-style clients send the course as a one-element list, like ReviewAPIView.post accepts
+    if isinstance(identifier, list):
+        identifier = identifier[0] if identifier else None
+    return identifier
+
+
+def resolve_schools(items):
+    """{id or short_name: School} for every school identifier in items, in one query."""
+    identifiers = {lookup_key(item["school"]) for item in items if item.get("school")}
+    ids = {parse_uuid(identifier) for identifier in identifiers} - {None}
+    resolved = {}
+    for school in School.objects.filter(Q(pk__in=ids) | Q(short_name__in=identifiers)):
+        resolved[str(school.pk)] = resolved[school.short_name] = school
+    return resolved
+
+
+def resolve_courses(items, schools):
+    """
+    {id: Course} for course ids, and {(school_id, subject, catalog_number): Course}
+    for "SUBJ NUM" codes, which are looked up within the item's school; one query.
+    """
+    ids, codes = set(), set()
+    for item in items:
+        identifier = course_identifier(item)
+        if not identifier:
+            continue
+        course_id = parse_uuid(identifier)
+        school = schools.get(lookup_key(item.get("school")))
+        if course_id:
+            ids.add(course_id)
+        elif school is not None and len(str(identifier).split()) == 2:
+            codes.add((school.pk, *str(identifier).split()))
+
+    by_id, by_code = {}, {}
+    if not ids and not codes:
+        return by_id, by_code
+    # narrowed by each column separately, then matched exactly by the caller
+    condition = Q(pk__in=ids)
+    if codes:
+        condition |= Q(
+            school__in={code[0] for code in codes},
+            subject__in={code[1] for code in codes},
+            catalog_number__in={code[2] for code in codes},
+        )
+    for course in Course.objects.filter(condition):
+        by_id[str(course.pk)] = course
+        by_code[(course.school_id, course.subject, course.catalog_number)] = course
+    return by_id, by_code
+
+
+def bulk_write_reviews(items):
+    """
+    Create the items without an "id" and update the ones with one.
+
+    Returns (results, errors, schools): results holds {"index", "id",
+    "status"} for every item written, errors holds {"index", "errors"} for
+    every item rejected, and schools are the schools whose reviews changed.
+    """
+    records = [item for item in items if isinstance(item, dict)]
+    serializer = ReviewBulkSerializer()
+    schools = resolve_schools(records)
+    courses_by_id, courses_by_code = resolve_courses(records, schools)
+    update_ids = {parse_uuid(item["id"]) for item in records if item.get("id")} - {None}
+    existing = Review.objects.select_related("school").in_bulk(update_ids) if update_ids else {}
+
+    now = timezone.now()
+    created, updated, removed = [], [], []
+    results, errors, seen = [], [], set()
+    changed_schools = set()
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({"index": index, "errors": {"error": ["Expected a review object."]}})
+            continue
+
+        item_errors = {}
+        try:
+            values = serializer.run_validation(item)
+        except ValidationError as error:
+            item_errors.update(error.detail)
+            values = {}
+
+        school = schools.get(lookup_key(item.get("school")))
+        if not item.get("school"):
+            item_errors["school"] = ["This field is required."]
+        elif school is None:
+            item_errors["school"] = ["School not found with the provided identifier."]
+
+        identifier = course_identifier(item)
+        course = courses_by_id.get(lookup_key(identifier))
+        if course is None and school is not None and identifier:
+            course = courses_by_code.get((school.pk, *str(identifier).split()))
+        if not identifier:
+            item_errors["course"] = ["Course identifier is required."]
+        elif course is None:
+            item_errors["course"] = ["Invalid course identifier format or course not found."]
+        elif school is not None and course.school_id != school.pk:
+            item_errors["course"] = ["The course must be from the selected school."]
+
+        review = None
+        if item.get("id"):
+            review_id = parse_uuid(item["id"])
+            review = existing.get(review_id)
+            if review is None:
+                item_errors["id"] = ["Review not found."]
+            elif review_id in seen:
+                item_errors["id"] = ["This review appears more than once in the batch."]
+            seen.add(review_id)
+
+        if item_errors:
+            errors.append({"index": index, "errors": item_errors})
+            continue
+
+        changed_schools.add(school)
+        if review is None:
+            review = Review(school=school, course=course, **values)
+            created.append(review)
+            results.append({"index": index, "id": review.pk, "status": "created"})
+        else:
+            removed.append(stats.snapshot(review))
+            changed_schools.add(review.school)
+            review.school, review.course, review.updated_at = school, course, now
+            for field, value in values.items():
+                setattr(review, field, value)
+            updated.append(review)
+            results.append({"index": index, "id": review.pk, "status": "updated"})
+
+    with transaction.atomic():
+        Review.objects.bulk_create(created, batch_size=500)
+        Review.objects.bulk_update(updated, UPDATE_FIELDS, batch_size=500)
+        stats.update_review_stats(added=created + updated, removed=removed)
+
+    return results, errors, [school for school in changed_schools if school is not None]
@@ -0,0 +1,165 @@
+"""
+Streaming review exports for analytics.
+
+Reviews are read with QuerySet.iterator(), as tuples rather than model
+instances, and written out as NDJSON or CSV a chunk at a time, so memory
+stays flat however many rows are exported. Rows come in (updated_at, id)
+order: an incremental pull can pass the largest updated_at it has seen as
+``since`` next time.
+
+Under ASGI, Django would read a sync iterator into a list before sending
+any of it, so the export view hands the server aexport() of the chunks
+instead, which reads them one at a time in a thread.
+"""
+import csv
+import datetime
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from review.models import Review
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+COLUMNS = (
+    "id", "school", "course", "review_text", "term", "grade_received", "delivery_method",
+    "helpful_count", "year_taken", "textbook_required", "recommended", "created_at", "updated_at",
+)
+# the queried values behind COLUMNS; school and course are exported by name
+# like the review endpoints render them
+FIELDS = (
+    "id", "school__short_name", "course__subject", "course__catalog_number", "review_text", "term",
+    "grade_received", "delivery_method", "helpful_count", "year_taken", "textbook_required",
+    "recommended", "created_at", "updated_at",
+)
+
+# text is handed on in pieces of about this many characters
+BUFFER_SIZE = 64 * 1024
+
+
+def parse_since(value):
+    """
+    An aware datetime from an ISO 8601 date or datetime; naive values are
+    taken in the current time zone. Raises ValueError for anything else.
+    """
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"{value!r} is not an ISO 8601 date or datetime.")
+        since = datetime.datetime.combine(date, datetime.time())
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def export_queryset(school_id=None, course_id=None, term=None, since=None):
+    reviews = Review.objects.all()
+    if school_id is not None:
+        reviews = reviews.filter(school_id=school_id)
+    if course_id is not None:
+        reviews = reviews.filter(course_id=course_id)
+    if term:
+        reviews = reviews.filter(term=term)
+    if since is not None:
+        reviews = reviews.filter(updated_at__gte=since)
+    return reviews.order_by("updated_at", "id").values_list(*FIELDS)
+
+
+def isoformat(value):
+    # as DRF renders datetimes in the API responses
+    if value is None:
+        return None
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def export_rows(reviews):
+    """COLUMNS-ordered tuples of plain values for each review, read chunk by chunk."""
+    for row in reviews.iterator(chunk_size=settings.REVIEW_EXPORT_CHUNK_SIZE):
+        (pk, school, subject, catalog_number, review_text, term, grade_received, delivery_method,
+         helpful_count, year_taken, textbook_required, recommended, created_at, updated_at) = row
+        yield (
+            str(pk), school, f"{subject} {catalog_number}" if subject else None, review_text, term,
+            grade_received, delivery_method, helpful_count, year_taken, textbook_required, recommended,
+            isoformat(created_at), isoformat(updated_at),
+        )
+
+
+def ndjson_lines(rows):
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    for row in rows:
+        yield encode(dict(zip(COLUMNS, row))) + "\n"
+
+
+class LineBuffer:
+    """A write()-able that hands back what csv.writer wrote."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(LineBuffer())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def buffered(lines, size=BUFFER_SIZE):
+    """Join lines into pieces of about size characters."""
+    pieces, length = [], 0
+    for line in lines:
+        pieces.append(line)
+        length += len(line)
+        if length >= size:
+            yield "".join(pieces)
+            pieces, length = [], 0
+    if pieces:
+        yield "".join(pieces)
+
+
+def encode(chunks, compress=False):
+    """UTF-8 bytes of chunks, gzipped on the fly if compress."""
+    if not compress:
+        for chunk in chunks:
+            yield chunk.encode()
+        return
+    # wbits=31 writes a gzip header and trailer
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_reviews(reviews, output_format="ndjson", compress=False):
+    """Bytes of the export of reviews (an export_queryset()), chunk by chunk."""
+    rows = export_rows(reviews)
+    lines = csv_lines(rows) if output_format == "csv" else ndjson_lines(rows)
+    return encode(buffered(lines), compress)
+
+
+async def aexport(chunks):
+    """An async iterator over chunks (an export_reviews()), reading each one in a thread."""
+    # thread-sensitive, so every chunk is read in the thread holding the
+    # database cursor the rows come from
+    next_chunk = sync_to_async(next)
+    done = object()
+    try:
+        while True:
+            chunk = await next_chunk(chunks, done)
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        # a client that went away leaves the cursor open until closed
+        await sync_to_async(chunks.close)()
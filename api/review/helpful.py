@@ -0,0 +1,138 @@
+"""
+Helpful votes.
+
+A vote is a ReviewVote row, so each user counts once. Review.helpful_count
+is moved with UPDATE ... SET helpful_count = helpful_count + n, never read
+and written back, so concurrent votes cannot overwrite each other.
+
+With REVIEW_HELPFUL_BUFFERED the increments are collected in memory and
+written in batches, so a popular review takes one row update per batch
+instead of one per vote. A batch is written once it holds
+REVIEW_HELPFUL_FLUSH_SIZE votes, at exit, and otherwise by a timer thread
+REVIEW_HELPFUL_FLUSH_INTERVAL seconds after its first vote, even if no
+more votes come. Votes themselves are always written immediately. A
+process that dies without exiting cleanly (a crash, SIGKILL, or a worker
+timeout) therefore loses at most the increments of the last
+REVIEW_HELPFUL_FLUSH_INTERVAL seconds. Until a failed write succeeds, the
+timer keeps retrying it and more can pile up.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from review.models import Review, ReviewVote
+from utils.cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+
+def increment(counts):
+    """Add {review_id: n} to helpful_count, one UPDATE per distinct n."""
+    by_amount = defaultdict(list)
+    for review_id, amount in counts.items():
+        by_amount[amount].append(review_id)
+    now = timezone.now()
+    with transaction.atomic():
+        for amount, review_ids in sorted(by_amount.items()):
+            # updated_at moves too, so the ETags of cached responses change
+            Review.objects.filter(pk__in=sorted(review_ids)).update(
+                helpful_count=F("helpful_count") + amount, updated_at=now)
+
+        short_names = set(
+            Review.objects.filter(pk__in=counts).values_list("school__short_name", flat=True))
+        # after commit, or a concurrent read could cache the old count under the new version
+        transaction.on_commit(lambda: response_cache.invalidate(
+            "reviews",
+            *(f"review:{review_id}" for review_id in counts),
+            *(f"reviews:{short_name}" for short_name in short_names if short_name),
+        ))
+
+
+class HelpfulVoteBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    def pending(self, review_id):
+        with self._lock:
+            return self._pending[review_id]
+
+    def add(self, review_id):
+        with self._lock:
+            self._pending[review_id] += 1
+            due = (sum(self._pending.values()) >= settings.REVIEW_HELPFUL_FLUSH_SIZE
+                   or time.monotonic() - self._last_flush >= settings.REVIEW_HELPFUL_FLUSH_INTERVAL)
+            if not due and self._timer is None:
+                self._schedule()
+        if due:
+            self.flush()
+
+    def _schedule(self):
+        # called with the lock held
+        self._timer = threading.Timer(settings.REVIEW_HELPFUL_FLUSH_INTERVAL, self._flush_on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Writing buffered helpful votes failed; retrying later")
+        finally:
+            # the connection this thread opened
+            connections.close_all()
+
+    def flush(self):
+        """Write the pending increments; returns how many votes were written."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+        try:
+            increment(pending)
+        except Exception:
+            # keep the increments for the next flush instead of dropping them
+            with self._lock:
+                self._pending.update(pending)
+                if self._timer is None:
+                    self._schedule()
+            raise
+        return sum(pending.values())
+
+
+helpful_votes = HelpfulVoteBuffer()
+atexit.register(helpful_votes.flush)
+
+
+def record_vote(review, user):
+    """
+    Count user's vote for review. Returns (created, helpful_count), where
+    helpful_count includes increments that are still buffered.
+    """
+    try:
+        with transaction.atomic():
+            ReviewVote.objects.create(review=review, user=user)
+            if not settings.REVIEW_HELPFUL_BUFFERED:
+                increment({review.pk: 1})
+        created = True
+    except IntegrityError:
+        # already voted
+        created = False
+
+    if created and settings.REVIEW_HELPFUL_BUFFERED:
+        helpful_votes.add(review.pk)
+    helpful_count = Review.objects.filter(pk=review.pk).values_list("helpful_count", flat=True).first()
+    return created, (helpful_count or 0) + helpful_votes.pending(review.pk)
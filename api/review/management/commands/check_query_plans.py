@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from utils.plans import sample_ids, view_query_checks
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the views' queries and fail if one stops using its index, scans a whole table "
+        "or sorts rows an index should return in order."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--generate", metavar="SCHOOLSxCOURSESxREVIEWS",
+            help="Check a throwaway database seeded with this many schools, courses per school and "
+                 "reviews per course (e.g. 10x100x50) instead of the configured one.")
+        parser.add_argument("--seed", type=int, default=472, help="Seed for --generate.")
+
+    def handle(self, *args, **options):
+        if not options["generate"]:
+            return self.check_plans(options["verbosity"])
+
+        from argparse import ArgumentTypeError
+
+        from benchmarks.api import parse_size
+        from benchmarks.dataset import Dataset
+        from benchmarks.utils import benchmark_database
+
+        try:
+            size = parse_size(options["generate"])
+        except ArgumentTypeError as error:
+            raise CommandError(str(error))
+        with benchmark_database():
+            Dataset.generate(*size, seed=options["seed"])
+            self.check_plans(options["verbosity"])
+
+    def check_plans(self, verbosity):
+        sample = sample_ids()
+        if sample is None:
+            raise CommandError("There are no reviews to plan queries for; try --generate.")
+
+        failures = 0
+        for check in view_query_checks(sample):
+            plan = check.explain()
+            problems = check.problems(plan, connection.vendor)
+            failures += bool(problems)
+            if problems:
+                self.stderr.write(f"{check.name}: {'; '.join(problems)}")
+            else:
+                self.stdout.write(f"{check.name}: ok")
+            if problems or verbosity > 1:
+                self.stdout.write("    " + plan.replace("\n", "\n    "))
+        if failures:
+            raise CommandError(f"{failures} queries no longer use their indexes.")
+        self.stdout.write(self.style.SUCCESS("Every query uses its index."))
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from review import export
+from review.models import Review
+from school.resolver import identifiers
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream reviews as NDJSON or CSV to a file or stdout, in (updated_at, id) order, "
+        "without loading them all into memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=tuple(export.FORMATS), default="ndjson", dest="output_format")
+        parser.add_argument("--output", "-o", help="File to write; stdout if left out.")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output (needs --output).")
+        parser.add_argument("--school", help="Only this school's reviews (id or short name).")
+        parser.add_argument("--course", help='Only this course\'s reviews (id, or "SUBJ NUM" with --school).')
+        parser.add_argument("--term", choices=tuple(dict(Review.TERM_CHOICES)))
+        parser.add_argument(
+            "--since", help="Only reviews updated at or after this ISO 8601 date or datetime.")
+
+    def handle(self, *args, **options):
+        if options["gzip"] and not options["output"]:
+            raise CommandError("--gzip needs --output.")
+
+        school_id = course_id = since = None
+        if options["school"]:
+            school_id = identifiers.school_id(options["school"])
+            if school_id is None:
+                raise CommandError(f"School {options['school']!r} does not exist.")
+        if options["course"]:
+            course_id = identifiers.course_id(school_id, options["course"])
+            if course_id is None:
+                raise CommandError(f"Course {options['course']!r} does not exist.")
+        if options["since"]:
+            try:
+                since = export.parse_since(options["since"])
+            except ValueError as error:
+                raise CommandError(str(error))
+
+        reviews = export.export_queryset(school_id, course_id, options["term"], since)
+        chunks = export.export_reviews(reviews, options["output_format"], options["gzip"])
+        started = time.perf_counter()
+        written = 0
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+                    written += len(chunk)
+            elapsed = time.perf_counter() - started
+            self.stderr.write(f"Wrote {written} bytes to {options['output']} in {elapsed:.2f}s.")
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending="")
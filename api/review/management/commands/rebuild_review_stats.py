@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from review.stats import rebuild_review_stats, verify_review_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-course and per-school review aggregates from the review table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify-only",
+            action="store_true",
+            help="Compare the stored aggregates with a fresh computation without rebuilding.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["verify_only"]:
+            deltas = rebuild_review_stats()
+            self.stdout.write(f"Rebuilt {len(deltas)} review stats rows.")
+
+        problems = verify_review_stats()
+        for problem in problems:
+            self.stderr.write(problem)
+        if problems:
+            raise CommandError(f"{len(problems)} review stats rows do not match the reviews.")
+        self.stdout.write(self.style.SUCCESS("Review stats match the reviews."))
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.5 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0003_review_course'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='review',
+            options={'ordering': ('-created_at', '-id'), 'verbose_name_plural': 'Reviews'},
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-created_at', '-id'], name='review_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['school', '-created_at', '-id'], name='review_school_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.5 on 2026-10-18 03:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("school", "0006_course"),
+        ("review", "0004_review_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SchoolReviewStats",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("review_count", models.PositiveIntegerField(default=0)),
+                ("recommended_count", models.PositiveIntegerField(default=0)),
+                ("textbook_required_count", models.PositiveIntegerField(default=0)),
+                ("year_taken_total", models.BigIntegerField(default=0)),
+                ("grade_counts", models.JSONField(default=dict)),
+                ("delivery_method_counts", models.JSONField(default=dict)),
+                ("term_counts", models.JSONField(default=dict)),
+                ("school", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="review_stats", to="school.school")),
+            ],
+            options={
+                "verbose_name_plural": "School review stats",
+            },
+        ),
+        migrations.CreateModel(
+            name="CourseReviewStats",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("review_count", models.PositiveIntegerField(default=0)),
+                ("recommended_count", models.PositiveIntegerField(default=0)),
+                ("textbook_required_count", models.PositiveIntegerField(default=0)),
+                ("year_taken_total", models.BigIntegerField(default=0)),
+                ("grade_counts", models.JSONField(default=dict)),
+                ("delivery_method_counts", models.JSONField(default=dict)),
+                ("term_counts", models.JSONField(default=dict)),
+                ("course", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="review_stats", to="school.course")),
+            ],
+            options={
+                "verbose_name_plural": "Course review stats",
+            },
+        ),
+    ]
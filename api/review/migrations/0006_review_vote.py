@@ -0,0 +1,34 @@
+# Generated by Django 4.2.5 on 2026-10-18 03:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('review', '0005_review_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewVote',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='review.review')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_votes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Review votes',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reviewvote',
+            constraint=models.UniqueConstraint(fields=('review', 'user'), name='review_vote_unique'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from review.search import install_search_index
+    install_search_index(schema_editor.connection)
+
+
+def remove(apps, schema_editor):
+    from review.search import remove_search_index
+    remove_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text index over review_text: a GIN expression index on PostgreSQL,
+    an FTS5 table kept in sync by triggers on SQLite (see review.search).
+    """
+
+    dependencies = [
+        ('review', '0006_review_vote'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, remove, elidable=False),
+    ]
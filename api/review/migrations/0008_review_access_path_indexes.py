@@ -0,0 +1,80 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+# single-column foreign key indexes made redundant by composite indexes
+# leading with the same column
+REDUNDANT_INDEXES = (
+    ("review_review", "school_id"),
+    ("review_review", "course_id"),
+    ("review_reviewvote", "review_id"),
+)
+
+
+def column_indexes(schema_editor, table, column):
+    """Names of the plain single-column indexes on table.column."""
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        name for name, info in constraints.items()
+        if info["index"] and not info["unique"] and not info["primary_key"] and info["columns"] == [column]
+    ]
+
+
+def drop_redundant_indexes(apps, schema_editor):
+    # AlterField would remake review_review on SQLite, dropping the search
+    # triggers and renumbering the rowids the search index refers to
+    for table, column in REDUNDANT_INDEXES:
+        for name in column_indexes(schema_editor, table, column):
+            schema_editor.execute(f"DROP INDEX {schema_editor.quote_name(name)}")
+
+
+def create_redundant_indexes(apps, schema_editor):
+    quote = schema_editor.quote_name
+    for table, column in REDUNDANT_INDEXES:
+        schema_editor.execute(f"CREATE INDEX {quote(f'{table}_{column}_idx')} ON {quote(table)} ({quote(column)})")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0009_course_school_created_idx'),
+        ('review', '0007_review_search'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='review',
+                    name='course',
+                    field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='school.course'),
+                ),
+                migrations.AlterField(
+                    model_name='review',
+                    name='school',
+                    field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='school.school'),
+                ),
+                migrations.AlterField(
+                    model_name='reviewvote',
+                    name='review',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='review.review'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(drop_redundant_indexes, create_redundant_indexes),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['course', '-created_at', '-id'], name='review_course_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('recommended', True)), fields=['course', '-created_at', '-id'], name='review_course_recommended_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['updated_at', 'id'], name='review_updated_id_idx'),
+        ),
+    ]
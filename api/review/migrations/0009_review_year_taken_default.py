@@ -0,0 +1,19 @@
+# Generated by Django 4.2.5 on 2026-10-18 05:40
+
+from django.db import migrations, models
+import review.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0008_review_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='review',
+            name='year_taken',
+            field=models.IntegerField(default=review.models.current_year),
+        ),
+    ]
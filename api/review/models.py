@@ -1,9 +1,14 @@
 from utils.models import TrackingModel
+from django.conf import settings
 from django.db import models
 from school.models import School, Course
 import datetime
 
 
+def current_year():
+    return datetime.date.today().year
+
+
 class Review(TrackingModel):
     TERM_CHOICES = [
         ('Spring', 'Spring'),
@@ -36,19 +41,23 @@ class Review(TrackingModel):
 
     # If a school is deleted, all related reviews will also be deleted. Reviews can be nullable and optional
     # each review is associated with one school, and each school can have many reviews
+    # not indexed on its own: the (school, created_at, id) index leads with it
     school = models.ForeignKey(
         School,
         on_delete=models.CASCADE,
         related_name='reviews',
         null=True,
-        blank=True)
+        blank=True,
+        db_index=False)
     # TODO: Course Model Foreign Key
+    # likewise covered by the (course, created_at, id) index
     course = models.ForeignKey(
         Course,
         on_delete=models.CASCADE,
         related_name='reviews',
         null=True,
-        blank=True
+        blank=True,
+        db_index=False
     )
     # TODO: Professor Model Foreign Key
     # limiting reviews to 500 characters
@@ -62,8 +71,8 @@ class Review(TrackingModel):
     # count of how many people found the review helpful
     helpful_count = models.IntegerField(default=0)
 
-    # year field with default value of current year
-    year_taken = models.IntegerField(default=datetime.datetime.now().year)
+    # year field with default value of current year, as of the save
+    year_taken = models.IntegerField(default=current_year)
 
     textbook_required = models.BooleanField(default=False)
 
@@ -71,12 +80,101 @@ class Review(TrackingModel):
 
     class Meta:
         verbose_name_plural = "Reviews"
+        ordering = ('-created_at', '-id')
+        # keyset pagination walks these in (created_at, id) order; the export
+        # walks (updated_at, id). `manage.py check_query_plans` checks that
+        # the views' queries use them.
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='review_created_id_idx'),
+            models.Index(fields=['school', '-created_at', '-id'], name='review_school_created_id_idx'),
+            models.Index(fields=['course', '-created_at', '-id'], name='review_course_created_id_idx'),
+            models.Index(
+                fields=['course', '-created_at', '-id'], condition=models.Q(recommended=True),
+                name='review_course_recommended_idx'),
+            models.Index(fields=['updated_at', 'id'], name='review_updated_id_idx'),
+        ]
 
     def __str__(self):
         course_info = f'{self.course.subject} {self.course.catalog_number}' if self.course else 'No Course'
         return f'Review for {course_info} at {self.school.short_name}'
 
 
+class ReviewVote(TrackingModel):
+    """
+    A user marking a review as helpful. The unique constraint lets each
+    user count once, however many times the vote is sent.
+    """
+    # looked up through the unique constraint, which leads with it
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='votes', db_index=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='review_votes')
+
+    class Meta:
+        verbose_name_plural = "Review votes"
+        constraints = [
+            models.UniqueConstraint(fields=['review', 'user'], name='review_vote_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} found {self.review_id} helpful'
+
+
+class ReviewStats(TrackingModel):
+    """
+    Running totals over a set of reviews, kept up to date as reviews are
+    written so pages can show distributions without reading every review.
+    """
+    review_count = models.PositiveIntegerField(default=0)
+    recommended_count = models.PositiveIntegerField(default=0)
+    textbook_required_count = models.PositiveIntegerField(default=0)
+    # sum of year_taken, the average is derived from it
+    year_taken_total = models.BigIntegerField(default=0)
+    # {"A": 3, "B+": 1, ...} keyed by the review choice values
+    grade_counts = models.JSONField(default=dict)
+    delivery_method_counts = models.JSONField(default=dict)
+    term_counts = models.JSONField(default=dict)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def recommended_ratio(self):
+        if not self.review_count:
+            return None
+        return self.recommended_count / self.review_count
+
+    @property
+    def textbook_required_ratio(self):
+        if not self.review_count:
+            return None
+        return self.textbook_required_count / self.review_count
+
+    @property
+    def average_year_taken(self):
+        if not self.review_count:
+            return None
+        return self.year_taken_total / self.review_count
+
+
+class CourseReviewStats(ReviewStats):
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, related_name='review_stats')
+
+    class Meta:
+        verbose_name_plural = "Course review stats"
+
+    def __str__(self):
+        return f'Review stats for {self.course}'
+
+
+class SchoolReviewStats(ReviewStats):
+    school = models.OneToOneField(School, on_delete=models.CASCADE, related_name='review_stats')
+
+    class Meta:
+        verbose_name_plural = "School review stats"
+
+    def __str__(self):
+        return f'Review stats for {self.school}'
+
+
 # TODO Rating Criteria Model
 
 # TODO Review Rating Model
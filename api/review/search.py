@@ -0,0 +1,189 @@
+"""
+Full-text search over Review.review_text.
+
+On PostgreSQL the documents are to_tsvector('english', review_text), served
+by a GIN expression index. Elsewhere (SQLite) an external-content FTS5
+table, review_review_fts, mirrors review_text and is kept in sync by
+triggers, so every write path (views, admin, bulk ORM calls, raw SQL)
+updates it in the same transaction.
+
+Results come best match first, ordered by (rank, id) so they can be paged
+with a keyset cursor, and carry an HTML highlight of the matched terms.
+
+Ranking costs about a microsecond or two per matching review, which adds
+up for words that appear in most reviews ("professor"). Only the newest
+REVIEW_SEARCH_MAX_CANDIDATES matches are ranked, which bounds that cost;
+queries with fewer matches are ranked exactly.
+"""
+import html
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.functions import Cast
+
+from review.models import Review
+
+SearchResult = namedtuple("SearchResult", "pk rank highlight")
+
+# placeholders put around matches by the database, replaced after escaping
+START, STOP = "\x02", "\x03"
+
+POSTGRES_INDEX = "review_text_search_idx"
+SQLITE_TABLE = "review_review_fts"
+SQLITE_TRIGGERS = {
+    "review_review_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS review_review_fts_insert AFTER INSERT ON review_review BEGIN
+            INSERT INTO review_review_fts(rowid, review_text) VALUES (new.rowid, new.review_text);
+        END""",
+    "review_review_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS review_review_fts_delete AFTER DELETE ON review_review BEGIN
+            INSERT INTO review_review_fts(review_review_fts, rowid, review_text)
+            VALUES ('delete', old.rowid, old.review_text);
+        END""",
+    "review_review_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS review_review_fts_update AFTER UPDATE OF review_text ON review_review BEGIN
+            INSERT INTO review_review_fts(review_review_fts, rowid, review_text)
+            VALUES ('delete', old.rowid, old.review_text);
+            INSERT INTO review_review_fts(rowid, review_text) VALUES (new.rowid, new.review_text);
+        END""",
+}
+
+
+def install_search_index(connection):
+    """
+    Create the search index for connection's database if it is missing.
+
+    Returns True when something was (re)created. On SQLite this also runs
+    after every migrate: rebuilding review_review for an ALTER drops its
+    triggers and renumbers its rowids, so the FTS table is then rebuilt.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {POSTGRES_INDEX} ON review_review "
+                "USING gin (to_tsvector('english'::regconfig, COALESCE(review_text, '')))")
+            return True
+        if connection.vendor != "sqlite":
+            return False
+
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND tbl_name = 'review_review')",
+            [SQLITE_TABLE])
+        existing = {name for name, in cursor.fetchall()}
+        if existing >= {SQLITE_TABLE, *SQLITE_TRIGGERS}:
+            return False
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+            "review_text, content='review_review', content_rowid='rowid', tokenize='porter unicode61')")
+        for sql in SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}) VALUES ('rebuild')")
+        return True
+
+
+def remove_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"DROP INDEX IF EXISTS {POSTGRES_INDEX}")
+        elif connection.vendor == "sqlite":
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+
+
+def highlight(text):
+    return html.escape(text or "").replace(START, "<mark>").replace(STOP, "</mark>")
+
+
+def search_reviews(query, school_id=None, course_id=None, after=None, limit=50):
+    """
+    Reviews matching query, best first, as SearchResults.
+
+    after is the (rank, pk) of the last result of the previous page.
+    Higher ranks are better on every backend.
+    """
+    if connection.vendor == "postgresql":
+        return _search_postgres(query, school_id, course_id, after, limit)
+    return _search_sqlite(query, school_id, course_id, after, limit)
+
+
+def _search_postgres(query, school_id, course_id, after, limit):
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+
+    # must match the indexed expression for the GIN index to be used
+    document = SearchVector("review_text", config="english")
+    search_query = SearchQuery(query, config="english", search_type="websearch")
+    reviews = Review.objects.annotate(document=document).filter(document=search_query)
+    if school_id is not None:
+        reviews = reviews.filter(school_id=school_id)
+    if course_id is not None:
+        reviews = reviews.filter(course_id=course_id)
+    if settings.REVIEW_SEARCH_MAX_CANDIDATES:
+        candidates = reviews.order_by("-created_at").values("id")[:settings.REVIEW_SEARCH_MAX_CANDIDATES]
+        reviews = Review.objects.filter(id__in=candidates).annotate(document=document)
+    # ts_rank is a real; compared as a double the cursor value round-trips exactly
+    reviews = reviews.annotate(rank=Cast(SearchRank(document, search_query), FloatField()))
+    if after is not None:
+        rank, pk = after
+        reviews = reviews.filter(Q(rank__lt=rank) | Q(rank=rank, id__gt=pk))
+    reviews = reviews.annotate(headline=SearchHeadline(
+        "review_text", search_query, config="english",
+        start_sel=START, stop_sel=STOP, highlight_all=True))
+    rows = reviews.order_by("-rank", "id").values_list("id", "rank", "headline")[:limit]
+    return [SearchResult(pk, rank, highlight(headline)) for pk, rank, headline in rows]
+
+
+def fts5_query(query):
+    """Quote every word, so user input is never parsed as FTS5 syntax."""
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", query.lower()))
+
+
+def _search_sqlite(query, school_id, course_id, after, limit):
+    match = fts5_query(query)
+    if not match:
+        return []
+    conditions, params = [f"{SQLITE_TABLE} MATCH %s"], [match]
+    if school_id is not None:
+        conditions.append("review.school_id = %s")
+        params.append(school_id.hex)
+    if course_id is not None:
+        conditions.append("review.course_id = %s")
+        params.append(course_id.hex)
+    candidates = ""
+    if settings.REVIEW_SEARCH_MAX_CANDIDATES:
+        # FTS5 walks matches in rowid (insertion) order, so this stops early
+        candidates = f"ORDER BY {SQLITE_TABLE}.rowid DESC LIMIT %s"
+        params.append(settings.REVIEW_SEARCH_MAX_CANDIDATES)
+    page_condition = ""
+    if after is not None:
+        rank, pk = after
+        page_condition = "WHERE score < %s OR (score = %s AND id > %s)"
+        params += [rank, rank, pk.hex]
+
+    # bm25() is lower for better matches, so it is negated ("rank" is a
+    # hidden FTS5 column, hence "score"); highlights are only computed for
+    # the rows of the page
+    sql = f"""
+        SELECT page.id, page.score, highlight({SQLITE_TABLE}, 0, %s, %s)
+        FROM {SQLITE_TABLE}
+        JOIN (
+            SELECT * FROM (
+                SELECT {SQLITE_TABLE}.rowid AS fts_rowid, review.id AS id, -bm25({SQLITE_TABLE}) AS score
+                FROM {SQLITE_TABLE} JOIN review_review review ON review.rowid = {SQLITE_TABLE}.rowid
+                WHERE {" AND ".join(conditions)}
+                {candidates}
+            )
+            {page_condition}
+            ORDER BY score DESC, id
+            LIMIT %s
+        ) page ON page.fts_rowid = {SQLITE_TABLE}.rowid
+        WHERE {SQLITE_TABLE} MATCH %s
+        ORDER BY page.score DESC, page.id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [START, STOP, *params, limit, match])
+        rows = cursor.fetchall()
+    return [SearchResult(Review._meta.pk.to_python(pk), rank, highlight(text)) for pk, rank, text in rows]
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from rest_framework.fields import CharField, ChoiceField, IntegerField
-from review.models import Review
+from review.models import CourseReviewStats, Review
 from school.models import Course, School
 
 
@@ -9,11 +9,12 @@ class ReviewSerializer(serializers.ModelSerializer):
     school = serializers.PrimaryKeyRelatedField(queryset=School.objects.all())
     course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
 
-    review_text = CharField(required=True)
+    review_text = CharField(required=True, max_length=500)
     term = ChoiceField(required=True, choices=Review.TERM_CHOICES)
     grade_received = ChoiceField(required=True, choices=Review.GRADE_CHOICES)
     delivery_method = ChoiceField(required=True, choices=Review.DELIVERY_CHOICES)
-    helpful_count = IntegerField(required=False)
+    # only changed by votes, see review.helpful
+    helpful_count = IntegerField(read_only=True)
 
     class Meta:
         model = Review
@@ -37,9 +38,67 @@ class ReviewSerializer(serializers.ModelSerializer):
         course = data["course"]
         school = data["school"]
 
-        if course.school != school:
+        if course.school_id != school.pk:
             raise serializers.ValidationError(
                 {"course": "The course must be from the selected school."}
             )
 
         return data
+
+    def update(self, instance, validated_data):
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        # saving every field would write back a helpful_count that concurrent votes have moved on from
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        return instance
+
+
+class ReviewBulkSerializer(ReviewSerializer):
+    """
+    The review fields of one bulk item. School, course and the id of a
+    review to update are resolved for the whole batch in review.bulk, so
+    they are left out here, along with the cross-field check on them.
+    """
+    school = None
+    course = None
+
+    class Meta(ReviewSerializer.Meta):
+        fields = tuple(
+            field for field in ReviewSerializer.Meta.fields if field not in ("id", "school", "course"))
+
+    def validate(self, data):
+        return data
+
+
+class ReviewReadSerializer(serializers.ModelSerializer):
+    # displaying the school's short name and the course code ("SUBJ NUM")
+    # instead of primary keys. Querysets should use select_related so these
+    # do not trigger a lookup per review.
+    school = serializers.StringRelatedField()
+    course = serializers.StringRelatedField()
+
+    class Meta:
+        model = Review
+        fields = ReviewSerializer.Meta.fields
+        read_only_fields = fields
+
+
+class ReviewStatsSerializer(serializers.ModelSerializer):
+    recommended_ratio = serializers.FloatField(read_only=True)
+    textbook_required_ratio = serializers.FloatField(read_only=True)
+    average_year_taken = serializers.FloatField(read_only=True)
+
+    class Meta:
+        # the fields are shared by CourseReviewStats and SchoolReviewStats
+        model = CourseReviewStats
+        fields = (
+            "review_count",
+            "recommended_ratio",
+            "textbook_required_ratio",
+            "average_year_taken",
+            "grade_counts",
+            "delivery_method_counts",
+            "term_counts",
+            "updated_at",
+        )
+        read_only_fields = fields
@@ -0,0 +1,32 @@
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_migrate, pre_delete
+from django.dispatch import receiver
+
+from review.models import Review
+from review.search import install_search_index
+from review.stats import stored_snapshots, update_review_stats
+from school.models import Course, School
+
+
+@receiver(post_migrate)
+def repair_search_index(sender, using, **kwargs):
+    # SQLite migrations that alter review_review rebuild the table, which
+    # drops the FTS triggers; put them back and reindex when that happened
+    connection = connections[using]
+    if sender.name != "review" or connection.vendor != "sqlite":
+        return
+    if ("review", "0007_review_search") in MigrationRecorder(connection).applied_migrations():
+        install_search_index(connection)
+
+
+@receiver(pre_delete, sender=Course)
+def remove_course_reviews_from_stats(sender, instance, origin=None, **kwargs):
+    # deleting a course deletes its reviews and its stats row, but its
+    # school's stats still count the reviews; when the school is deleted
+    # too, so are its stats. Runs in the deletion's transaction.
+    if isinstance(origin, School) or getattr(origin, "model", None) is School:
+        return
+    removed = stored_snapshots(Review.objects.filter(course=instance))
+    # only the school's row: the course's is deleted with it
+    update_review_stats(removed=[review._replace(course_id=None) for review in removed])
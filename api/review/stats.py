@@ -0,0 +1,211 @@
+from collections import Counter, defaultdict, namedtuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from review.models import CourseReviewStats, Review, SchoolReviewStats
+
+
+# The parts of a review that feed the aggregates. Snapshots are taken before
+# a review is changed so the old values can be subtracted afterwards.
+ReviewSnapshot = namedtuple("ReviewSnapshot", (
+    "school_id",
+    "course_id",
+    "grade_received",
+    "delivery_method",
+    "term",
+    "recommended",
+    "textbook_required",
+    "year_taken",
+))
+
+COUNTER_FIELDS = (
+    ("grade_counts", "grade_received"),
+    ("delivery_method_counts", "delivery_method"),
+    ("term_counts", "term"),
+)
+
+# written back by update_review_stats
+STATS_FIELDS = (
+    "review_count",
+    "recommended_count",
+    "textbook_required_count",
+    "year_taken_total",
+    *(name for name, _ in COUNTER_FIELDS),
+    "updated_at",
+)
+
+
+def snapshot(review):
+    return ReviewSnapshot(*(getattr(review, field) for field in ReviewSnapshot._fields))
+
+
+def stored_snapshots(reviews):
+    """Snapshots of the reviews of a queryset as they are in the database."""
+    return [ReviewSnapshot(*row) for row in reviews.order_by().values_list(*ReviewSnapshot._fields)]
+
+
+class StatsDelta:
+    """Signed change to apply to one stats row."""
+
+    def __init__(self):
+        self.review_count = 0
+        self.recommended_count = 0
+        self.textbook_required_count = 0
+        self.year_taken_total = 0
+        self.counters = {name: Counter() for name, _ in COUNTER_FIELDS}
+
+    def add(self, review, sign=1):
+        self.review_count += sign
+        self.recommended_count += sign * bool(review.recommended)
+        self.textbook_required_count += sign * bool(review.textbook_required)
+        self.year_taken_total += sign * (review.year_taken or 0)
+        for name, field in COUNTER_FIELDS:
+            self.counters[name][getattr(review, field)] += sign
+
+    def apply_to(self, stats):
+        stats.review_count += self.review_count
+        stats.recommended_count += self.recommended_count
+        stats.textbook_required_count += self.textbook_required_count
+        stats.year_taken_total += self.year_taken_total
+        for name, _ in COUNTER_FIELDS:
+            counts = Counter(getattr(stats, name))
+            counts.update(self.counters[name])
+            setattr(stats, name, {key: value for key, value in sorted(counts.items()) if value})
+
+    def values(self):
+        """Field values of a stats row built from this delta alone."""
+        return {
+            "review_count": self.review_count,
+            "recommended_count": self.recommended_count,
+            "textbook_required_count": self.textbook_required_count,
+            "year_taken_total": self.year_taken_total,
+            **{
+                name: {key: value for key, value in sorted(self.counters[name].items()) if value}
+                for name, _ in COUNTER_FIELDS
+            },
+        }
+
+
+def collect_deltas(added=(), removed=()):
+    deltas = defaultdict(StatsDelta)
+    for reviews, sign in ((added, 1), (removed, -1)):
+        for review in reviews:
+            if review.school_id:
+                deltas[(SchoolReviewStats, review.school_id)].add(review, sign)
+            if review.course_id:
+                deltas[(CourseReviewStats, review.course_id)].add(review, sign)
+    return deltas
+
+
+def save_stats_rows(model, rows):
+    """
+    Write STATS_FIELDS of rows back with one executemany'd UPDATE. For a
+    few hundred rows bulk_update() spends longer building its CASE
+    expressions than the database spends running them.
+    """
+    fields = [model._meta.get_field(name) for name in STATS_FIELDS]
+    quote = connection.ops.quote_name
+    assignments = ", ".join(f"{quote(field.column)} = %s" for field in fields)
+    sql = f"UPDATE {quote(model._meta.db_table)} SET {assignments} WHERE {quote(model._meta.pk.column)} = %s"
+    params = [
+        [field.get_db_prep_save(getattr(row, field.attname), connection) for field in fields]
+        + [model._meta.pk.get_db_prep_save(row.pk, connection)]
+        for row in rows
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def update_review_stats(added=(), removed=()):
+    """
+    Apply reviews (or snapshots) that were created and/or removed.
+
+    An update is a removal of the old snapshot plus an addition of the new
+    review. Rows are locked while they are changed so concurrent writers do
+    not lose each other's increments. Each stats table is read and written
+    with a fixed number of queries, however many reviews are applied.
+    """
+    deltas = collect_deltas(added, removed)
+    if not deltas:
+        return
+    now = timezone.now()
+    with transaction.atomic():
+        # a stable order (table, then owner) keeps concurrent updates from deadlocking
+        for model, owner_field in ((CourseReviewStats, "course_id"), (SchoolReviewStats, "school_id")):
+            model_deltas = {pk: delta for (delta_model, pk), delta in deltas.items() if delta_model is model}
+            if not model_deltas:
+                continue
+            rows = list(
+                model.objects.select_for_update()
+                .filter(**{f"{owner_field}__in": model_deltas}).order_by(owner_field))
+            missing = model_deltas.keys() - {getattr(row, owner_field) for row in rows}
+            if missing:
+                # a concurrent writer may create the same rows; theirs are kept and locked below
+                model.objects.bulk_create(
+                    [model(**{owner_field: pk}) for pk in missing], ignore_conflicts=True)
+                rows = list(
+                    model.objects.select_for_update()
+                    .filter(**{f"{owner_field}__in": model_deltas}).order_by(owner_field))
+            for row in rows:
+                model_deltas[getattr(row, owner_field)].apply_to(row)
+                row.updated_at = now
+            save_stats_rows(model, rows)
+
+
+def compute_review_stats():
+    """Aggregate every review from scratch, keyed like collect_deltas()."""
+    reviews = Review.objects.order_by().values_list(*ReviewSnapshot._fields)
+    deltas = defaultdict(StatsDelta)
+    for row in reviews.iterator(chunk_size=2000):
+        review = ReviewSnapshot(*row)
+        if review.school_id:
+            deltas[(SchoolReviewStats, review.school_id)].add(review)
+        if review.course_id:
+            deltas[(CourseReviewStats, review.course_id)].add(review)
+    return deltas
+
+
+def rebuild_review_stats():
+    """
+    Replace the stats tables with aggregates of every review. The stats rows
+    are locked (in update_review_stats()'s order) before the reviews are
+    read, so a review written concurrently is either counted here or applied
+    by its writer once this commits, never lost in between.
+    """
+    with transaction.atomic():
+        for model, owner_field in ((CourseReviewStats, "course_id"), (SchoolReviewStats, "school_id")):
+            list(model.objects.select_for_update().order_by(owner_field).values_list("pk", flat=True))
+        deltas = compute_review_stats()
+        SchoolReviewStats.objects.all().delete()
+        CourseReviewStats.objects.all().delete()
+        for model, owner_field in ((SchoolReviewStats, "school_id"), (CourseReviewStats, "course_id")):
+            model.objects.bulk_create(
+                [
+                    model(**{owner_field: pk}, **delta.values())
+                    for (delta_model, pk), delta in deltas.items()
+                    if delta_model is model
+                ],
+                batch_size=500,
+            )
+    return deltas
+
+
+def verify_review_stats():
+    """Return a list of human readable differences between stored and recomputed stats."""
+    expected = {key: delta.values() for key, delta in compute_review_stats().items()}
+    problems = []
+    for model, owner_field in ((SchoolReviewStats, "school_id"), (CourseReviewStats, "course_id")):
+        stored = {}
+        for stats in model.objects.iterator():
+            pk = getattr(stats, owner_field)
+            stored[(model, pk)] = {field: getattr(stats, field) for field in StatsDelta().values()}
+        wanted = {key: values for key, values in expected.items() if key[0] is model}
+        empty = StatsDelta().values()
+        for key in sorted(set(stored) | set(wanted), key=lambda item: str(item[1])):
+            if stored.get(key, empty) != wanted.get(key, empty):
+                problems.append(
+                    f"{model.__name__} {owner_field}={key[1]}: "
+                    f"stored {stored.get(key)} != expected {wanted.get(key)}"
+                )
+    return problems
@@ -1,10 +1,23 @@
-import uuid
-
-from rest_framework import status, views
+from django.db import transaction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework import permissions, status, views
 from rest_framework.response import Response
-from review.models import Review
-from review.serializers import ReviewSerializer
-from school.models import Course, School
+from review import export, stats
+from review.bulk import bulk_write_reviews
+from review.helpful import record_vote
+from review.search import search_reviews
+from review.models import CourseReviewStats, Review, SchoolReviewStats
+from review.serializers import ReviewReadSerializer, ReviewSerializer, ReviewStatsSerializer
+from school.models import School
+from school.resolver import identifiers
+from utils.async_views import AsyncAPIView
+from utils.cache import acached_response, cached_response, response_cache
+from utils.conditional import aget_validators, get_validators
+from utils.pagination import KeysetPagination, RankedPagination
+from utils.throttling import UserRateThrottle
 
 
 class ReviewAPIView(views.APIView):
@@ -13,69 +26,82 @@ class ReviewAPIView(views.APIView):
     """
 
     serializer_class = ReviewSerializer
+    read_serializer_class = ReviewReadSerializer
+    pagination_class = KeysetPagination
+    # whatever the number of reviews; writes include savepoints and stats upkeep
+    query_budget = {"GET": 4, "POST": 20, "PUT": 20, "DELETE": 15}
+    # GETs may read from a replica (see backend.replicas)
+    read_replica = True
+    # rate limits for writing reviews (see utils.throttling)
+    throttle_classes = (UserRateThrottle,)
+    throttle_scope = {"POST": "reviews"}
 
-    def post(self, request):
-        data = request.data.copy()
+    def get_queryset(self):
+        # school and course are rendered by name, so fetch them in the same query
+        return Review.objects.select_related("school", "course")
 
+    def invalidate_cache(self, review_id, *schools):
+        # every cached review response also depends on "schools", which
+        # school writes bump, so only the review namespaces are touched here
+        response_cache.invalidate(
+            "reviews",
+            f"review:{review_id}",
+            *(f"reviews:{school.short_name}" for school in schools if school),
+        )
+
+    def resolve_identifiers(self, data, school_id=None):
+        """
+        Swap the school and course identifiers in data for primary keys.
+        Schools are named by id or short_name, courses by id or "SUBJ NUM",
+        which is looked up in the given school (or school_id if data names
+        none). Returns an error response, or None.
+        """
         school_identifier = data.get("school", None)
         if school_identifier:
-            try:
-                # Checking if valid UUID is provided
-                if uuid.UUID(school_identifier):
-                    school = School.objects.get(pk=school_identifier)
-                    data["school"] = school.pk
-            except (ValueError, School.DoesNotExist):
-                # Getting school from short_name if UUID is not valid.
-                school = School.objects.filter(short_name=school_identifier).first()
-                if school:
-                    data["school"] = school.pk
-                else:
-                    return Response(
-                        {"error": "School not found with the provided identifier."},
-                        status=status.HTTP_404_NOT_FOUND,
-                    )
+            school_id = identifiers.school_id(school_identifier)
+            if school_id is None:
+                return Response(
+                    {"error": "School not found with the provided identifier."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            data["school"] = school_id
 
         course_identifier = data.get("course", None)
         if course_identifier:
             if isinstance(course_identifier, list):
                 course_identifier = course_identifier[0]
+            course_id = identifiers.course_id(school_id, course_identifier)
+            if course_id is None:
+                # Handle cases where the format is incorrect or course does not exist
+                return Response(
+                    {"error": "Invalid course identifier format or course not found."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            data["course"] = course_id
+        return None
 
-            try:
-                # Check if it's a valid UUID
-                uuid.UUID(course_identifier)
-                course = Course.objects.get(pk=course_identifier)
-                data["course"] = course.pk
-            except ValueError:
-                # If not a UUID, try parsing as "subject & catalog_number"
-                try:
-                    subject, catalog_number = course_identifier.split()
-                    course = Course.objects.get(subject=subject, catalog_number=catalog_number)
-                    data["course"] = course.pk
-                except (ValueError, Course.DoesNotExist):
-                    # Handle cases where the format is incorrect or course does not exist
-                    return Response(
-                        {"error": "Invalid course identifier format or course not found."},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-        else:
+    def post(self, request):
+        data = request.data.copy()
+
+        if not data.get("course", None):
             # Handle case where course identifier is not provided
             return Response(
                 {"error": "Course identifier is required."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        error = self.resolve_identifiers(data)
+        if error:
+            return error
 
         # Proceed with serialization
         serializer = self.serializer_class(data=data)
         if serializer.is_valid():
-            serializer.save()
-            # Fetch the school and course objects to get their short name and code
-            school = School.objects.get(pk=serializer.data["school"])
-            course = Course.objects.get(pk=serializer.data["course"])
-
-            # Update the response data with school's short name and course code
-            response_data = serializer.data
-            response_data["school"] = school.short_name
-            response_data["course"] = f'{course.subject} {course.catalog_number}'
+            with transaction.atomic():
+                review = serializer.save()
+                stats.update_review_stats(added=[review])
+            self.invalidate_cache(review.pk, review.school)
+            # school and course were already loaded during validation
+            response_data = self.read_serializer_class(review).data
 
             return Response(
                 {"message": "Review created successfully", "data": response_data},
@@ -84,114 +110,130 @@ class ReviewAPIView(views.APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST) # line not covered in test
 
+    # reviews render their school and course by name, so renaming either changes them
+    review_timestamps = ("updated_at", "school__updated_at", "course__updated_at")
+
+    def validator_query(self, review_id=None, short_name=None):
+        """(queryset, timestamps, count) that the validators of a GET are aggregated from."""
+        if short_name:
+            # aggregated from the school so that a missing school and a
+            # school without reviews get different validators
+            return (School.objects.filter(short_name=short_name),
+                    ("updated_at", "reviews__updated_at", "reviews__course__updated_at"), "reviews")
+        reviews = Review.objects.all()
+        if review_id:
+            reviews = reviews.filter(id=review_id)
+        return reviews, self.review_timestamps, "pk"
+
+    def get_validators(self, request, review_id=None, short_name=None):
+        queryset, timestamps, count = self.validator_query(review_id, short_name)
+        return get_validators(request, queryset, timestamps, count=count)
+
     def get(self, request, review_id=None, short_name=None):
+        def validators():
+            return self.get_validators(request, review_id, short_name)
+
         if review_id:
-            # retrieving a single review by ID
-            try:
-                review = Review.objects.get(id=review_id)
-                serializer = self.serializer_class(review)
-                response_data = serializer.data
-
-                # Update school's short name and course code
-                school = School.objects.get(pk=response_data["school"])
-                course = Course.objects.get(pk=response_data["course"])
-                response_data["school"] = school.short_name
-                response_data["course"] = f'{course.subject} {course.catalog_number}'
-
-                response = {
-                    "message": "Review retrieved successfully",
-                    "data": response_data,
-                }
-                return Response(data=response, status=status.HTTP_200_OK)
-            except Review.DoesNotExist:
-                return Response(
-                    {"message": "Review not found!", "data": []},
-                    status=status.HTTP_404_NOT_FOUND,
-                )
+            return cached_response(request, "review_detail", ["schools", f"review:{review_id}"],
+                                   lambda: self.get_review(review_id), validators)
+        if short_name:
+            return cached_response(request, "school_reviews", ["schools", f"reviews:{short_name}"],
+                                   lambda: self.list_reviews(request, short_name), validators)
+        return cached_response(request, "review_list", ["schools", "reviews"],
+                               lambda: self.list_reviews(request), validators)
+
+    def get_review(self, review_id):
+        # retrieving a single review by ID
+        try:
+            review = self.get_queryset().get(id=review_id)
+            response_data = self.read_serializer_class(review).data
 
+            response = {
+                "message": "Review retrieved successfully",
+                "data": response_data,
+            }
+            return Response(data=response, status=status.HTTP_200_OK)
+        except Review.DoesNotExist:
+            return Response(
+                {"message": "Review not found!", "data": []},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+    def list_reviews(self, request, short_name=None):
+        school_id = identifiers.school_id(short_name) if short_name else None
+        course_code = request.query_params.get("course")
+        course_id = identifiers.course_id(school_id, course_code) if course_code else None
+        reviews = self.filter_reviews(request, short_name, school_id, course_code, course_id)
+        if isinstance(reviews, Response):
+            return reviews
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(reviews, request)
+        return self.list_response(paginator, page)
+
+    def filter_reviews(self, request, short_name, school_id, course_code, course_id):
+        """The reviews to list, given the resolved identifiers, or an error response."""
         if short_name:
             # retrieving reviews for school when short_name is provided.
-            try:
-                school = School.objects.get(short_name=short_name)
-                reviews = Review.objects.filter(school=school)
-            except School.DoesNotExist:
+            if school_id is None:
                 return Response(
                     {"message": "School not found!", "data": []},
                     status=status.HTTP_404_NOT_FOUND,
                 )
+            reviews = self.get_queryset().filter(school_id=school_id)
         else:
             # list all reviews when id or shortname is not provided.
-            reviews = Review.objects.all()
+            reviews = self.get_queryset()
 
-        serializer = self.serializer_class(reviews, many=True)
-        response_data = serializer.data
+        # ?course= and ?recommended= narrow the list, each served by an index
+        # leading with course (see Review.Meta.indexes)
+        if course_code:
+            # a course code only names a course within a school
+            if course_id is None:
+                return Response(
+                    {"message": "Course not found!", "data": []},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            reviews = reviews.filter(course_id=course_id)
+        recommended = request.query_params.get("recommended")
+        if recommended is not None:
+            if recommended.lower() not in ("true", "false"):
+                return Response(
+                    {"message": "recommended must be true or false.", "data": []},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            reviews = reviews.filter(recommended=recommended.lower() == "true")
+        return reviews
 
-        # Update each review in the response data
-        for review in response_data:
-            school = School.objects.get(pk=review["school"])
-            course = Course.objects.get(pk=review["course"])
-            review["school"] = school.short_name
-            review["course"] = f'{course.subject} {course.catalog_number}'
+    def list_response(self, paginator, page):
+        serializer = self.read_serializer_class(page, many=True)
+        response_data = serializer.data
 
-        response = {"message": "Reviews listed successfully", "data": response_data}
+        response = {
+            "message": "Reviews listed successfully",
+            "data": response_data,
+            **paginator.get_links(),
+        }
         return Response(data=response, status=status.HTTP_200_OK)
 
     def put(self, request, review_id=None):
         try:
-            review_object = Review.objects.get(id=review_id)
+            review_object = self.get_queryset().get(id=review_id)
             data = request.data.copy()
 
-            # Handle school identifier
-            school_identifier = data.get("school", None)
-            if school_identifier:
-                try:
-                    if uuid.UUID(school_identifier):
-                        school = School.objects.get(pk=school_identifier)
-                        data["school"] = school.pk
-                except (ValueError, School.DoesNotExist):
-                    school = School.objects.filter(short_name=school_identifier).first()
-                    if school:
-                        data["school"] = school.pk
-                    else:
-                        return Response(
-                            {"error": "School not found with the provided identifier."},
-                            status=status.HTTP_404_NOT_FOUND,
-                        )
-
-            # Handle course identifier
-            course_identifier = data.pop("course", None)
-            if course_identifier:
-                if isinstance(course_identifier, list):
-                    course_identifier = course_identifier[0]
-
-                try:
-                    uuid.UUID(course_identifier)
-                    course_pk = course_identifier
-                except ValueError:
-                    try:
-                        subject, catalog_number = course_identifier.split()
-                        course = Course.objects.get(subject=subject, catalog_number=catalog_number)
-                        course_pk = course.pk
-                    except (ValueError, Course.DoesNotExist):
-                        return Response(
-                            {"error": "Invalid course identifier format or course not found."},
-                            status=status.HTTP_400_BAD_REQUEST,
-                        )
-
-                data["course"] = course_pk
+            error = self.resolve_identifiers(data, review_object.school_id)
+            if error:
+                return error
 
             serializer = self.serializer_class(review_object, data=data)
             if serializer.is_valid():
-                serializer.save()
-
-                # Fetch the school and course objects to get their short name and code
-                school = School.objects.get(pk=serializer.data["school"])
-                course = Course.objects.get(pk=serializer.data["course"])
-
-                # Update the response data with school's short name and course code
-                response_data = serializer.data
-                response_data["school"] = school.short_name
-                response_data["course"] = f'{course.subject} {course.catalog_number}'
+                previous = stats.snapshot(review_object)
+                previous_school = review_object.school
+                with transaction.atomic():
+                    review = serializer.save()
+                    stats.update_review_stats(added=[review], removed=[previous])
+                self.invalidate_cache(review.pk, previous_school, review.school)
+                response_data = self.read_serializer_class(review).data
 
                 return Response(
                     {"message": "Review updated successfully", "data": response_data},
@@ -208,8 +250,11 @@ class ReviewAPIView(views.APIView):
     def delete(self, request, *args, **kwargs):
         review_id = kwargs.get("review_id")
         try:
-            review_object = Review.objects.get(id=review_id)
-            review_object.delete()
+            review_object = self.get_queryset().get(id=review_id)
+            with transaction.atomic():
+                review_object.delete()
+                stats.update_review_stats(removed=[review_object])
+            self.invalidate_cache(review_id, review_object.school)
             return Response(
                 {"message": "Review deleted successfully", "data": []},
                 status=status.HTTP_204_NO_CONTENT,
@@ -220,3 +265,269 @@ class ReviewAPIView(views.APIView):
                 {"message": "Review not found!", "data": []},
                 status=status.HTTP_404_NOT_FOUND,
             )
+
+
+class ReviewReadAPIView(AsyncAPIView, ReviewAPIView):
+    """
+    ReviewAPIView's GETs as coroutines, for the ASGI server.
+    """
+
+    async def get(self, request, review_id=None, short_name=None):
+        async def validators():
+            queryset, timestamps, count = self.validator_query(review_id, short_name)
+            return await aget_validators(request, queryset, timestamps, count=count)
+
+        if review_id:
+            return await acached_response(request, "review_detail", ["schools", f"review:{review_id}"],
+                                          lambda: self.aget_review(review_id), validators)
+        if short_name:
+            return await acached_response(request, "school_reviews", ["schools", f"reviews:{short_name}"],
+                                          lambda: self.alist_reviews(request, short_name), validators)
+        return await acached_response(request, "review_list", ["schools", "reviews"],
+                                      lambda: self.alist_reviews(request), validators)
+
+    async def aget_review(self, review_id):
+        try:
+            review = await self.get_queryset().aget(id=review_id)
+        except Review.DoesNotExist:
+            return Response(
+                {"message": "Review not found!", "data": []},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        response = {
+            "message": "Review retrieved successfully",
+            "data": self.read_serializer_class(review).data,
+        }
+        return Response(data=response, status=status.HTTP_200_OK)
+
+    async def alist_reviews(self, request, short_name=None):
+        school_id = await identifiers.aschool_id(short_name) if short_name else None
+        course_code = request.query_params.get("course")
+        course_id = await identifiers.acourse_id(school_id, course_code) if course_code else None
+        reviews = self.filter_reviews(request, short_name, school_id, course_code, course_id)
+        if isinstance(reviews, Response):
+            return reviews
+
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(reviews, request)
+        return self.list_response(paginator, page)
+
+
+class ReviewBulkAPIView(views.APIView):
+    """
+    Endpoint for importing reviews in batches. Items with an "id" update
+    that review, the others are created; invalid items are reported by
+    index without failing the rest of the batch.
+    """
+
+    permission_classes = (permissions.IsAdminUser,)
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {"error": "Expected a list of reviews."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.REVIEW_BULK_MAX_ITEMS:
+            return Response(
+                {"error": f"At most {settings.REVIEW_BULK_MAX_ITEMS} reviews can be sent at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results, errors, schools = bulk_write_reviews(items)
+        updated = [result["id"] for result in results if result["status"] == "updated"]
+        if results:
+            response_cache.invalidate(
+                "reviews",
+                *(f"review:{review_id}" for review_id in updated),
+                *(f"reviews:{school.short_name}" for school in schools),
+            )
+
+        response = {
+            "message": f"{len(results) - len(updated)} reviews created, {len(updated)} updated, "
+                       f"{len(errors)} rejected",
+            "data": {"results": results, "errors": errors},
+        }
+        return Response(data=response, status=status.HTTP_200_OK)
+
+
+class ReviewExportAPIView(views.APIView):
+    """
+    Endpoint streaming every review as NDJSON or CSV (?output=csv) for
+    analytics, optionally only a school's (?school=), one of its courses'
+    (?course=), a term's (?term=) or the ones updated since a date or
+    datetime (?since=). Gzipped on the fly for clients that accept it.
+    """
+
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        params = request.query_params
+        output_format = params.get("output", "ndjson")
+        if output_format not in export.FORMATS:
+            return Response(
+                {"message": f"output must be one of {', '.join(export.FORMATS)}.", "data": []},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        school_id = course_id = None
+        if params.get("school"):
+            school_id = identifiers.school_id(params["school"])
+            if school_id is None:
+                return Response(
+                    {"message": "School not found!", "data": []},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+        if params.get("course"):
+            course_id = identifiers.course_id(school_id, params["course"])
+            if course_id is None:
+                return Response(
+                    {"message": "Course not found!", "data": []},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+        term = params.get("term")
+        if term and term not in dict(Review.TERM_CHOICES):
+            return Response(
+                {"message": f"term must be one of {', '.join(dict(Review.TERM_CHOICES))}.", "data": []},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        since = None
+        if params.get("since"):
+            try:
+                since = export.parse_since(params["since"])
+            except ValueError as error:
+                return Response({"message": str(error), "data": []}, status=status.HTTP_400_BAD_REQUEST)
+
+        compress = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+        reviews = export.export_queryset(school_id, course_id, term, since)
+        content = export.export_reviews(reviews, output_format, compress)
+        if isinstance(request._request, ASGIRequest):
+            # streamed as read, rather than read whole before the first byte is sent
+            content = export.aexport(content)
+        response = StreamingHttpResponse(content, content_type=export.FORMATS[output_format])
+        response["Content-Disposition"] = f'attachment; filename="reviews.{output_format}"'
+        if compress:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
+class ReviewSearchAPIView(views.APIView):
+    """
+    Endpoint for full-text search over review text, optionally within a
+    school (?school=<short_name>) and one of its courses (?course=<subject catalog_number>).
+    """
+
+    read_serializer_class = ReviewReadSerializer
+    pagination_class = RankedPagination
+    query_budget = 6
+
+    def get(self, request):
+        return cached_response(request, "review_search", ["schools", "reviews"],
+                               lambda: self.search(request))
+
+    def search(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response(
+                {"message": "A search query (q) is required.", "data": []},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        school_id = course_id = None
+        short_name = request.query_params.get("school")
+        if short_name:
+            school_id = identifiers.school_id(short_name)
+            if school_id is None:
+                return Response(
+                    {"message": "School not found!", "data": []},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+        course_code = request.query_params.get("course")
+        if course_code:
+            # a course code only names a course within a school
+            course_id = identifiers.course_id(school_id, course_code)
+            if course_id is None:
+                return Response(
+                    {"message": "Course not found!", "data": []},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+        paginator = self.pagination_class()
+        results = paginator.paginate_search(
+            lambda after, limit: search_reviews(query, school_id, course_id, after=after, limit=limit), request)
+        reviews = Review.objects.select_related("school", "course").in_bulk([result.pk for result in results])
+
+        data = []
+        for result in results:
+            # a review deleted between the two queries is left out
+            if result.pk in reviews:
+                item = self.read_serializer_class(reviews[result.pk]).data
+                item.update(rank=result.rank, highlight=result.highlight)
+                data.append(item)
+        response = {
+            "message": "Reviews searched successfully",
+            "data": data,
+            **paginator.get_links(),
+        }
+        return Response(data=response, status=status.HTTP_200_OK)
+
+
+class ReviewHelpfulAPIView(views.APIView):
+    """
+    Endpoint for marking a review as helpful, once per user.
+    """
+
+    permission_classes = (permissions.IsAuthenticated,)
+    query_budget = 16
+
+    def post(self, request, review_id=None):
+        review = Review.objects.filter(id=review_id).only("id").first()
+        if review is None:
+            return Response(
+                {"message": "Review not found!", "data": []},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        created, helpful_count = record_vote(review, request.user)
+        response = {
+            "message": "Review marked as helpful" if created else "Review was already marked as helpful",
+            "data": {"id": review.pk, "helpful_count": helpful_count},
+        }
+        return Response(data=response, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class ReviewStatsAPIView(views.APIView):
+    """
+    Endpoint for the precomputed review aggregates of a school or one of its courses.
+    """
+
+    serializer_class = ReviewStatsSerializer
+    query_budget = 4
+
+    def get(self, request, short_name=None, subject=None, catalog_number=None):
+        school_id = identifiers.school_id(short_name)
+        if school_id is None:
+            return Response(
+                {"message": "School not found!", "data": []},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if subject:
+            course_id = identifiers.course_id(school_id, f"{subject} {catalog_number}")
+            if course_id is None:
+                return Response(
+                    {"message": "Course not found!", "data": []},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            review_stats = CourseReviewStats.objects.filter(course_id=course_id).first()
+            review_stats = review_stats or CourseReviewStats(course_id=course_id)
+        else:
+            review_stats = SchoolReviewStats.objects.filter(school_id=school_id).first()
+            review_stats = review_stats or SchoolReviewStats(school_id=school_id)
+
+        response = {
+            "message": "Review stats retrieved successfully",
+            "data": self.serializer_class(review_stats).data,
+        }
+        return Response(data=response, status=status.HTTP_200_OK)
@@ -1,7 +1,20 @@
 from django.contrib import admin
-from .models import School
+from .models import Course, School
 
 
 @admin.register(School)
 class SchoolAdmin(admin.ModelAdmin):
     list_display = ('id', 'long_name', 'short_name', 'website', 'city', 'state', 'country', 'created_at','updated_at')
+    # also what the review admin's school autocomplete searches
+    search_fields = ('short_name', 'long_name')
+
+
+@admin.register(Course)
+class CourseAdmin(admin.ModelAdmin):
+    list_display = ('id', 'school', 'subject', 'catalog_number', 'title', 'created_at', 'updated_at')
+    list_select_related = ('school',)
+    # also what the review admin's course autocomplete searches
+    search_fields = ('subject', 'catalog_number', 'title', 'school__short_name')
+    autocomplete_fields = ('school',)
+    # the order of the course code constraint's index
+    ordering = ('school_id', 'subject', 'catalog_number')
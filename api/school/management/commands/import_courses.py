@@ -0,0 +1,151 @@
+import csv
+import time
+from contextlib import nullcontext
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from school.models import Course, School
+from school.search import course_indexes
+
+# header names accepted for each column, compared case-insensitively
+COLUMNS = {
+    "subject": ("subject",),
+    "catalog_number": ("catalog number", "catalog_number"),
+    "title": ("title",),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a course catalog CSV (Subject, Catalog Number, Title) into a school. "
+        "Rows are upserted on (school, subject, catalog_number) in batches, one "
+        "transaction per batch, while the file is streamed. A dry run imports every "
+        "batch in one transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("short_name", help="short_name of the school the courses belong to")
+        parser.add_argument("csv_path", help="path to the catalog CSV file")
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="rows read, compared and written per batch (default 1000)")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="report the inserts, updates and unchanged rows without keeping them")
+        parser.add_argument("--encoding", default="utf-8-sig")
+
+    def handle(self, *args, **options):
+        try:
+            school = School.objects.get(short_name=options["short_name"])
+        except School.DoesNotExist:
+            raise CommandError(f"School {options['short_name']!r} does not exist.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        totals = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+        started = time.perf_counter()
+        try:
+            with open(options["csv_path"], newline="", encoding=options["encoding"]) as catalog, \
+                    (transaction.atomic() if options["dry_run"] else nullcontext()):
+                rows = self.read_rows(catalog)
+                while True:
+                    chunk = list(islice(rows, options["chunk_size"]))
+                    if not chunk:
+                        break
+                    counts = self.import_chunk(school, chunk)
+                    for key, value in counts.items():
+                        totals[key] += value
+                    if options["verbosity"] > 1:
+                        self.stdout.write(f"  chunk: {counts}")
+                if options["dry_run"]:
+                    # the batches are written so later ones see earlier ones, as
+                    # in a real run (a course repeated across batches is
+                    # inserted once, then unchanged or updated), then undone
+                    transaction.set_rollback(True)
+        except OSError as error:
+            raise CommandError(f"Could not read {options['csv_path']}: {error}")
+        finally:
+            if not options["dry_run"]:
+                # bulk writes do not send the signals that normally drop the index
+                course_indexes.invalidate(school.pk)
+
+        elapsed = time.perf_counter() - started
+        processed = sum(totals.values())
+        rate = processed / elapsed if elapsed else 0
+        prefix = "Dry run: would have " if options["dry_run"] else ""
+        self.stdout.write(
+            f"{prefix}inserted {totals['inserted']}, updated {totals['updated']}, "
+            f"left {totals['unchanged']} unchanged, skipped {totals['skipped']} invalid rows "
+            f"({processed} rows in {elapsed:.2f}s, {rate:.0f} rows/sec)"
+        )
+
+    def read_rows(self, catalog):
+        """Yield (subject, catalog_number, title), or None for rows that do not fit the Course model."""
+        reader = csv.reader(catalog)
+        header = [name.strip().lower() for name in next(reader, [])]
+        try:
+            positions = [
+                next(header.index(name) for name in names if name in header)
+                for names in COLUMNS.values()
+            ]
+        except StopIteration:
+            raise CommandError(f"Expected the columns Subject, Catalog Number and Title, got {header}.")
+
+        limits = [Course._meta.get_field(field).max_length for field in COLUMNS]
+        for row in reader:
+            if not any(row):
+                continue
+            try:
+                values = tuple(row[position].strip() for position in positions)
+            except IndexError:
+                yield None
+                continue
+            if all(values) and all(len(value) <= limit for value, limit in zip(values, limits)):
+                yield values
+            else:
+                yield None
+
+    def import_chunk(self, school, chunk):
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+        titles = {}
+        for row in chunk:
+            if row is None:
+                counts["skipped"] += 1
+                continue
+            subject, catalog_number, title = row
+            if (subject, catalog_number) in titles:
+                # repeated within the batch, the last title wins
+                counts["unchanged"] += 1
+            titles[(subject, catalog_number)] = title
+
+        with transaction.atomic():
+            existing = {
+                (course.subject, course.catalog_number): course
+                for course in Course.objects.filter(
+                    school=school,
+                    subject__in={subject for subject, _ in titles},
+                    catalog_number__in={catalog_number for _, catalog_number in titles},
+                ).only("id", "subject", "catalog_number", "title")
+            }
+
+            now = timezone.now()
+            to_insert, to_update = [], []
+            for (subject, catalog_number), title in titles.items():
+                course = existing.get((subject, catalog_number))
+                if course is None:
+                    to_insert.append(Course(
+                        school=school, subject=subject, catalog_number=catalog_number, title=title))
+                elif course.title != title:
+                    course.title = title
+                    course.updated_at = now
+                    to_update.append(course)
+                else:
+                    counts["unchanged"] += 1
+
+            Course.objects.bulk_create(to_insert)
+            Course.objects.bulk_update(to_update, ["title", "updated_at"])
+
+        counts["inserted"] = len(to_insert)
+        counts["updated"] = len(to_update)
+        return counts
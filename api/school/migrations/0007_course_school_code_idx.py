@@ -0,0 +1,16 @@
+# Generated by Django 4.2.5 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("school", "0006_course"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(fields=["school", "subject", "catalog_number"], name="course_school_code_idx"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.5 on 2026-10-18 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("school", "0007_course_school_code_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="course",
+            name="course_school_code_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="course",
+            constraint=models.UniqueConstraint(fields=("school", "subject", "catalog_number"), name="course_school_code_unique"),
+        ),
+    ]
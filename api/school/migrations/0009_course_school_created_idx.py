@@ -0,0 +1,51 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def column_indexes(schema_editor, table, column):
+    """Names of the plain single-column indexes on table.column."""
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        name for name, info in constraints.items()
+        if info["index"] and not info["unique"] and not info["primary_key"] and info["columns"] == [column]
+    ]
+
+
+def drop_school_index(apps, schema_editor):
+    # AlterField would remake the whole table on SQLite to drop one index
+    for name in column_indexes(schema_editor, "school_course", "school_id"):
+        schema_editor.execute(f"DROP INDEX {schema_editor.quote_name(name)}")
+
+
+def create_school_index(apps, schema_editor):
+    quote = schema_editor.quote_name
+    schema_editor.execute(
+        f"CREATE INDEX {quote('school_course_school_id_idx')} ON {quote('school_course')} ({quote('school_id')})")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("school", "0008_course_school_code_unique"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="course",
+                    name="school",
+                    field=models.ForeignKey(
+                        db_index=False, on_delete=django.db.models.deletion.CASCADE, to="school.school"),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(drop_school_index, create_school_index),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(fields=["school", "-created_at", "-id"], name="course_school_created_id_idx"),
+        ),
+    ]
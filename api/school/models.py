@@ -22,10 +22,20 @@ class School(TrackingModel):
 class Course(TrackingModel):
     class Meta:
         verbose_name_plural = "Courses"
+        constraints = [
+            # a course code is unique within its school; also the lookup index
+            # for "SUBJ NUM" identifiers and the catalog importer's upserts
+            models.UniqueConstraint(fields=['school', 'subject', 'catalog_number'], name='course_school_code_unique'),
+        ]
+        indexes = [
+            # a school's courses, paginated newest first
+            models.Index(fields=['school', '-created_at', '-id'], name='course_school_created_id_idx'),
+        ]
     
     # Each course is linked to a certain school, 
     # courses cant exist without a school for our purposes
-    school = models.ForeignKey(School, on_delete=models.CASCADE)
+    # not indexed on its own, both indexes above lead with it
+    school = models.ForeignKey(School, on_delete=models.CASCADE, db_index=False)
     # i.e. "CS"
     subject = models.CharField(max_length=4, verbose_name="SubjectAbbreviation")
     # "101"
@@ -0,0 +1,117 @@
+import uuid
+
+from school.models import Course, School
+from utils.cache import TTLCache
+
+
+def parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+class IdentifierResolver:
+    """
+    Per-process cache from the identifiers clients send for schools and
+    courses to primary keys.
+
+    Schools are named by id or short_name, courses by id or "SUBJ NUM"
+    within a school. Resolved keys are kept in a bounded LRU
+    (IDENTIFIER_CACHE_SIZE entries) for at most IDENTIFIER_CACHE_TTL
+    seconds. Entries are dropped by the School and Course
+    post_save/post_delete signals; the TTL bounds how long renames and
+    deletes made by other processes go unnoticed. Misses are not cached,
+    so new schools and courses resolve right away.
+    """
+
+    def __init__(self):
+        self._entries = TTLCache("IDENTIFIER_CACHE_SIZE", "IDENTIFIER_CACHE_TTL")
+
+    def school_id(self, identifier):
+        """The pk of the school with this id or short_name, or None."""
+        key, pk, schools = self._school_lookup(identifier)
+        if pk is None and schools is not None:
+            pk = schools.first()
+            if pk is not None:
+                self._entries.set(key, pk)
+        return pk
+
+    async def aschool_id(self, identifier):
+        key, pk, schools = self._school_lookup(identifier)
+        if pk is None and schools is not None:
+            pk = await schools.afirst()
+            if pk is not None:
+                self._entries.set(key, pk)
+        return pk
+
+    def _school_lookup(self, identifier):
+        """(cache key, cached pk, query for the pk on a miss)"""
+        if not identifier:
+            return None, None, None
+        school_id = parse_uuid(identifier)
+        key = ("school", str(school_id) if school_id else str(identifier))
+        pk = self._entries.get(key)
+        if pk is not None:
+            return key, pk, None
+        schools = School.objects.filter(pk=school_id) if school_id else School.objects.filter(
+            short_name=identifier)
+        return key, None, schools.values_list("pk", flat=True)
+
+    def course_id(self, school_id, identifier):
+        """
+        The pk of the course with this id or "SUBJ NUM" code, or None.
+        Codes are only unique within a school, so they are looked up in
+        school_id's courses; ids are returned as they are, for the caller
+        to check against the school.
+        """
+        key, pk, courses = self._course_lookup(school_id, identifier)
+        if pk is None and courses is not None:
+            pk = courses.first()
+            if pk is not None:
+                self._entries.set(key, pk)
+        return pk
+
+    async def acourse_id(self, school_id, identifier):
+        key, pk, courses = self._course_lookup(school_id, identifier)
+        if pk is None and courses is not None:
+            pk = await courses.afirst()
+            if pk is not None:
+                self._entries.set(key, pk)
+        return pk
+
+    def _course_lookup(self, school_id, identifier):
+        if not identifier:
+            return None, None, None
+        course_id = parse_uuid(identifier)
+        if course_id:
+            return None, course_id, None
+        parts = str(identifier).split()
+        if school_id is None or len(parts) != 2:
+            return None, None, None
+        key = ("course", school_id, *parts)
+        pk = self._entries.get(key)
+        if pk is not None:
+            return key, pk, None
+        subject, catalog_number = parts
+        courses = Course.objects.filter(school_id=school_id, subject=subject, catalog_number=catalog_number)
+        return key, None, courses.values_list("pk", flat=True)
+
+    def invalidate(self, instance=None):
+        """
+        Drop the entries for a School or Course: the ones that resolve to
+        it or are scoped to it, and the one for its current name, which a
+        rolled back or out-of-band write may have left pointing elsewhere.
+        Everything is dropped if instance is None.
+        """
+        if instance is None:
+            self._entries.discard()
+            return
+        if isinstance(instance, School):
+            names = {("school", instance.short_name)}
+        else:
+            names = {("course", instance.school_id, instance.subject, instance.catalog_number)}
+        self._entries.discard(lambda key, value: value == instance.pk or instance.pk in key[1:2] or key in names)
+
+
+identifiers = IdentifierResolver()
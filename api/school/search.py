@@ -0,0 +1,153 @@
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from school.models import Course
+
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+
+class CourseSearchIndex:
+    """
+    In-memory prefix index over one school's courses.
+
+    Terms are kept in sorted lists so a prefix lookup is a binary search
+    followed by a walk over the matching range. Lists are searched in rank
+    order (course codes, then full titles, then single title words) and the
+    walk stops as soon as ``limit`` courses are found, so a lookup costs
+    O(log n + limit) no matter how many courses share a short prefix.
+    """
+
+    fields = ("id", "subject", "catalog_number", "title")
+
+    def __init__(self, rows):
+        """rows are (id, subject, catalog_number, title) tuples."""
+        self.courses = []
+        self.words = []
+        codes, titles, words = [], [], []
+        for position, row in enumerate(rows):
+            course = dict(zip(self.fields, row))
+            self.courses.append(course)
+            subject = course["subject"].lower()
+            catalog_number = course["catalog_number"].lower()
+            # "cs 135" and "cs135" both find CS 135
+            codes.append((f"{subject} {catalog_number}", position))
+            codes.append((f"{subject}{catalog_number}", position))
+            title = normalize(course["title"])
+            titles.append((title, position))
+            title_words = set(title.split())
+            self.words.append(title_words)
+            words.extend((word, position) for word in title_words)
+        self.tiers = [sorted(codes), sorted(titles), sorted(words)]
+        self.word_tier = self.tiers[2]
+
+    def __len__(self):
+        return len(self.courses)
+
+    @staticmethod
+    def prefix_range(terms, prefix):
+        start = bisect_left(terms, (prefix,))
+        # "\uffff" sorts after any character that can follow the prefix
+        end = bisect_left(terms, (prefix + "\uffff",), lo=start)
+        return start, end
+
+    def search(self, query, limit=10):
+        query = normalize(query)
+        if not query or limit < 1:
+            return []
+
+        found = []
+        seen = set()
+
+        def collect(positions):
+            for position in positions:
+                if position not in seen:
+                    seen.add(position)
+                    found.append(self.courses[position])
+                    if len(found) >= limit:
+                        return True
+            return False
+
+        for terms in self.tiers:
+            start, end = self.prefix_range(terms, query)
+            if collect(terms[i][1] for i in range(start, end)):
+                return found
+
+        tokens = query.split()
+        if len(tokens) > 1:
+            # "comp sci": every token must prefix a word of the title. Walk the
+            # narrowest token range and check the rest against each title.
+            ranges = [self.prefix_range(self.word_tier, token) for token in tokens]
+            start, end = min(ranges, key=lambda bounds: bounds[1] - bounds[0])
+            positions = (
+                self.word_tier[i][1] for i in range(start, end)
+                if all(
+                    any(word.startswith(token) for word in self.words[self.word_tier[i][1]])
+                    for token in tokens
+                )
+            )
+            collect(positions)
+        return found
+
+
+class CourseIndexRegistry:
+    """
+    Per-process cache of one CourseSearchIndex per school.
+
+    Indexes are dropped by the Course post_save/post_delete signals, and are
+    rebuilt at least every COURSE_SEARCH_INDEX_TTL seconds so writes made by
+    other processes are picked up too.
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def cached(self, school_id):
+        """The school's index if it is built and fresh, else None."""
+        entry = self._indexes.get(school_id)
+        if entry is not None and time.monotonic() - entry[1] < settings.COURSE_SEARCH_INDEX_TTL:
+            return entry[0]
+        return None
+
+    def get(self, school_id):
+        index = self.cached(school_id)
+        if index is not None:
+            return index
+
+        ttl = settings.COURSE_SEARCH_INDEX_TTL
+        with self._lock:
+            entry = self._indexes.get(school_id)
+            if entry is not None and time.monotonic() - entry[1] < ttl:
+                return entry[0]
+            built_at = time.monotonic()
+            # in code order, so ties between matches come out the same way
+            # on every backend; the school's unique code index returns it sorted
+            rows = Course.objects.filter(school_id=school_id).order_by(
+                "subject", "catalog_number").values_list(*CourseSearchIndex.fields)
+            index = CourseSearchIndex(rows.iterator(chunk_size=2000))
+            self._indexes[school_id] = (index, built_at)
+            return index
+
+    async def aget(self, school_id):
+        # building reads every course of the school and holds the lock, so
+        # it is left to a thread
+        index = self.cached(school_id)
+        if index is None:
+            index = await sync_to_async(self.get)(school_id)
+        return index
+
+    def invalidate(self, school_id=None):
+        with self._lock:
+            if school_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(school_id, None)
+
+
+course_indexes = CourseIndexRegistry()
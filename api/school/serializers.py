@@ -1,4 +1,4 @@
-from school.models import School
+from school.models import Course, School
 from rest_framework import serializers
 from rest_framework.fields import CharField
 
@@ -23,4 +23,16 @@ class SchoolSerializer(serializers.ModelSerializer):
 			'country',
 			'created_at',
 			'updated_at'
-		)
\ No newline at end of file
+		)
+
+
+class CourseSerializer(serializers.ModelSerializer):
+
+	class Meta:
+		model = Course
+		fields = (
+			'id',
+			'subject',
+			'catalog_number',
+			'title'
+		)
@@ -0,0 +1,27 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from school.models import Course, School
+from school.resolver import identifiers
+from school.search import course_indexes
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_index(sender, instance, **kwargs):
+    # drop the index now for this thread, and again once the write is
+    # committed so a concurrent rebuild cannot keep pre-commit data
+    course_indexes.invalidate(instance.school_id)
+    transaction.on_commit(lambda: course_indexes.invalidate(instance.school_id))
+
+
+@receiver(post_save, sender=School)
+@receiver(post_delete, sender=School)
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_identifiers(sender, instance, **kwargs):
+    # the old short_name or course code is gone from the instance by now,
+    # so entries are also dropped by the key they resolve to
+    identifiers.invalidate(instance)
+    transaction.on_commit(lambda: identifiers.invalidate(instance))
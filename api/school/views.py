@@ -1,15 +1,25 @@
 from json import JSONDecodeError
+from django.conf import settings
 from django.http import JsonResponse
-from .serializers import SchoolSerializer
+from .serializers import CourseSerializer, SchoolSerializer
 from rest_framework.parsers import JSONParser
 from rest_framework import views, status
 from rest_framework.response import Response
-from .models import School
+from .models import Course, School
+from .resolver import identifiers
+from .search import course_indexes
+from utils.async_views import AsyncAPIView
+from utils.cache import acached_response, cached_response, response_cache
+from utils.conditional import aget_validators, get_validators
+from utils.pagination import KeysetPagination
 
 
 class SchoolAPIView(views.APIView):
     
     serializer_class = SchoolSerializer
+    query_budget = {"GET": 4, "POST": 4, "PUT": 4}
+    # GETs may read from a replica (see backend.replicas)
+    read_replica = True
 
     def post(self, request):
         """
@@ -18,7 +28,8 @@ class SchoolAPIView(views.APIView):
         data = request.data
         serializer = self.serializer_class(data=data)
         if serializer.is_valid():
-            serializer.save()
+            school = serializer.save()
+            response_cache.invalidate("schools", f"school:{school.short_name}")
             response={
                 "message": "School created successfully",
                 "data": serializer.data
@@ -31,6 +42,16 @@ class SchoolAPIView(views.APIView):
         """
         Endpoint for retrieving schools
         """
+        schools = School.objects.all()
+        if short_name:
+            schools = schools.filter(short_name=short_name)
+            return cached_response(request, "school", [f"school:{short_name}"],
+                                   lambda: self.get_schools(short_name),
+                                   lambda: get_validators(request, schools))
+        return cached_response(request, "schools", ["schools"], self.get_schools,
+                               lambda: get_validators(request, schools))
+
+    def get_schools(self, short_name=None):
         try:
             if short_name:
                 school_object = School.objects.get(short_name=short_name)
@@ -56,7 +77,9 @@ class SchoolAPIView(views.APIView):
             data = request.data
             serializer = self.serializer_class(data=data, instance=school_object)
             if serializer.is_valid():
-                serializer.save()
+                school = serializer.save()
+                # reviews render the short name, and depend on "schools" too
+                response_cache.invalidate("schools", f"school:{short_name}", f"school:{school.short_name}")
                 response={
                     "message": "School info updated successfully",
                     "data": serializer.data
@@ -74,8 +97,103 @@ class SchoolAPIView(views.APIView):
         try:
             school_object = School.objects.get(short_name=short_name)
             school_object.delete()
+            # cascades to the school's reviews, which depend on "schools" too
+            response_cache.invalidate("schools", f"school:{short_name}")
             return Response({"message": "school deleted successfully", "data":[]}, status=status.HTTP_204_NO_CONTENT)
         except School.DoesNotExist:
              return Response({"message": "school not found!", "data":[]}, status=status.HTTP_404_NOT_FOUND)
-    
-    
\ No newline at end of file
+
+
+class SchoolReadAPIView(AsyncAPIView, SchoolAPIView):
+    """
+    SchoolAPIView's GETs as coroutines, for the ASGI server.
+    """
+
+    async def get(self, request, short_name=None):
+        schools = School.objects.all()
+        if short_name:
+            schools = schools.filter(short_name=short_name)
+            return await acached_response(request, "school", [f"school:{short_name}"],
+                                          lambda: self.aget_schools(short_name),
+                                          lambda: aget_validators(request, schools))
+        return await acached_response(request, "schools", ["schools"], self.aget_schools,
+                                      lambda: aget_validators(request, schools))
+
+    async def aget_schools(self, short_name=None):
+        if short_name:
+            try:
+                serializer = SchoolSerializer(await School.objects.aget(short_name=short_name))
+            except School.DoesNotExist:
+                return Response({"message": "school not found!", "data": []}, status=status.HTTP_404_NOT_FOUND)
+        else:
+            serializer = SchoolSerializer([school async for school in School.objects.all()], many=True)
+        response = {
+            "message": "Schools listed successfully",
+            "data": serializer.data
+        }
+        return Response(data=response, status=status.HTTP_200_OK)
+
+
+class CourseAPIView(views.APIView):
+
+    serializer_class = CourseSerializer
+    pagination_class = KeysetPagination
+    query_budget = 4
+
+    def get(self, request, short_name=None):
+        """
+        Endpoint for listing a school's courses, or searching them with ?q=
+        """
+        school_id = identifiers.school_id(short_name)
+        if school_id is None:
+            return self.school_not_found()
+
+        query = request.query_params.get("q", "").strip()
+        if query:
+            return self.search_response(request, course_indexes.get(school_id), query)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(Course.objects.filter(school_id=school_id), request)
+        return self.list_response(paginator, page)
+
+    def school_not_found(self):
+        return Response({"message": "school not found!", "data": []}, status=status.HTTP_404_NOT_FOUND)
+
+    def search_response(self, request, index, query):
+        try:
+            limit = int(request.query_params.get("limit", settings.COURSE_SEARCH_DEFAULT_LIMIT))
+        except ValueError:
+            limit = settings.COURSE_SEARCH_DEFAULT_LIMIT
+        limit = max(1, min(limit, settings.COURSE_SEARCH_MAX_LIMIT))
+        response = {
+            "message": "Courses listed successfully",
+            "data": self.serializer_class(index.search(query, limit), many=True).data
+        }
+        return Response(data=response, status=status.HTTP_200_OK)
+
+    def list_response(self, paginator, page):
+        response = {
+            "message": "Courses listed successfully",
+            "data": self.serializer_class(page, many=True).data,
+            **paginator.get_links()
+        }
+        return Response(data=response, status=status.HTTP_200_OK)
+
+
+class CourseReadAPIView(AsyncAPIView, CourseAPIView):
+    """
+    CourseAPIView as a coroutine, for the ASGI server.
+    """
+
+    async def get(self, request, short_name=None):
+        school_id = await identifiers.aschool_id(short_name)
+        if school_id is None:
+            return self.school_not_found()
+
+        query = request.query_params.get("q", "").strip()
+        if query:
+            return self.search_response(request, await course_indexes.aget(school_id), query)
+
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(Course.objects.filter(school_id=school_id), request)
+        return self.list_response(paginator, page)
@@ -0,0 +1,152 @@
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from review.models import Review
+from school.models import Course, School
+
+
+class TestImportCoursesCommand(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(short_name="UNLV", long_name="University of Nevada, Las Vegas")
+        Course.objects.create(school=self.school, subject="CS", catalog_number="135", title="Old Title")
+        Course.objects.create(school=self.school, subject="CS", catalog_number="202", title="Computer Science II")
+
+    def write_csv(self, text):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as catalog:
+            catalog.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def run_import(self, path, *args):
+        out = StringIO()
+        call_command("import_courses", "UNLV", path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_should_upsert_courses_in_chunks(self):
+        path = self.write_csv(
+            "Subject,Catalog Number,Title\n"
+            "CS,135,Computer Science I\n"
+            "CS,202,Computer Science II\n"
+            "MATH,181,Calculus I\n"
+            "ENG,101,Composition I\n"
+            "TOOLONG,1,Invalid Subject\n"
+        )
+        output = self.run_import(path, "--chunk-size", "2")
+        self.assertIn("inserted 2, updated 1, left 1 unchanged, skipped 1 invalid rows", output)
+        self.assertIn("rows/sec", output)
+        self.assertEqual(Course.objects.filter(school=self.school).count(), 4)
+        self.assertEqual(Course.objects.get(subject="CS", catalog_number="135").title, "Computer Science I")
+
+        # importing the same file again changes nothing
+        output = self.run_import(path)
+        self.assertIn("inserted 0, updated 0, left 4 unchanged", output)
+        self.assertEqual(Course.objects.filter(school=self.school).count(), 4)
+
+    def test_dry_run_reports_without_writing(self):
+        path = self.write_csv("Subject,Catalog Number,Title\nCS,135,Computer Science I\nMATH,181,Calculus I\n")
+        output = self.run_import(path, "--dry-run")
+        self.assertIn("Dry run: would have inserted 1, updated 1, left 0 unchanged", output)
+        self.assertEqual(Course.objects.get(subject="CS", catalog_number="135").title, "Old Title")
+        self.assertFalse(Course.objects.filter(subject="MATH").exists())
+
+    def test_dry_run_counts_across_chunks_like_a_real_run(self):
+        path = self.write_csv(
+            "Subject,Catalog Number,Title\n"
+            "MATH,181,Calculus I\n"
+            "CS,135,Computer Science I\n"
+            "MATH,181,Calculus I\n"
+            "ENG,101,Composition I\n"
+            "MATH,181,Calculus One\n"
+            "CS,135,Computer Science I\n"
+        )
+        output = self.run_import(path, "--dry-run", "--chunk-size", "2")
+        self.assertIn("Dry run: would have inserted 2, updated 2, left 2 unchanged", output)
+        self.assertEqual(Course.objects.get(subject="CS", catalog_number="135").title, "Old Title")
+        self.assertFalse(Course.objects.filter(subject__in=["MATH", "ENG"]).exists())
+
+        output = self.run_import(path, "--chunk-size", "2")
+        self.assertIn("inserted 2, updated 2, left 2 unchanged", output)
+
+    def test_should_reject_unknown_school_and_bad_header(self):
+        path = self.write_csv("Code,Name\nCS 135,Computer Science I\n")
+        with self.assertRaises(CommandError):
+            call_command("import_courses", "NOPE", path, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            self.run_import(path)
+
+    def test_should_import_unlv_catalog(self):
+        path = os.path.join(os.path.dirname(__file__), "..", "..", "data", "UNLV Courses", "courses.csv")
+        if not os.path.exists(path):
+            self.skipTest("UNLV catalog is not available")
+        self.run_import(path)
+        # courses.csv lists CS 437 twice
+        self.assertEqual(Course.objects.filter(school=self.school).count(), 1059)
+
+
+class TestExportReviewsCommand(TestCase):
+    def setUp(self):
+        school = School.objects.create(short_name="UNLV", long_name="University of Nevada, Las Vegas")
+        course = Course.objects.create(school=school, subject="CS", catalog_number="135", title="Computer Science I")
+        for term in ("Fall", "Spring", "Fall"):
+            Review.objects.create(
+                school=school, course=course, review_text=f"{term} review",
+                term=term, grade_received="A", delivery_method="Online")
+
+    def test_should_write_ndjson_to_stdout(self):
+        out = StringIO()
+        call_command("export_reviews", "--school", "UNLV", "--course", "CS 135", "--term", "Fall", stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row["review_text"] for row in rows], ["Fall review", "Fall review"])
+        self.assertEqual(rows[0]["course"], "CS 135")
+
+    def test_should_write_gzipped_csv_to_a_file(self):
+        handle, path = tempfile.mkstemp(suffix=".csv.gz")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command("export_reviews", "--format", "csv", "--gzip", "--output", path,
+                     stdout=StringIO(), stderr=StringIO())
+        with gzip.open(path, "rt") as export:
+            lines = export.read().splitlines()
+        self.assertTrue(lines[0].startswith("id,school,course,review_text"))
+        self.assertEqual(len(lines), 4)
+
+    def test_should_reject_bad_filters(self):
+        for args in (["--school", "NOPE"], ["--since", "yesterday"], ["--gzip"], ["--course", "CS 135"]):
+            with self.assertRaises(CommandError):
+                call_command("export_reviews", *args, stdout=StringIO())
+
+
+class TestCheckQueryPlansCommand(TestCase):
+    def setUp(self):
+        school = School.objects.create(short_name="UNLV", long_name="University of Nevada, Las Vegas")
+        course = Course.objects.create(school=school, subject="CS", catalog_number="135", title="Computer Science I")
+        Review.objects.create(
+            school=school, course=course, review_text="A review",
+            term="Fall", grade_received="A", delivery_method="Online")
+
+    def test_should_pass_when_queries_use_their_indexes(self):
+        out = StringIO()
+        call_command("check_query_plans", stdout=out)
+        self.assertIn("school_reviews: ok", out.getvalue())
+        self.assertIn("Every query uses its index.", out.getvalue())
+
+    def test_should_fail_when_an_index_is_gone(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP INDEX review_school_created_id_idx")
+        err = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("check_query_plans", stdout=StringIO(), stderr=err)
+        self.assertIn("school_reviews: does not use review_school_created_id_idx", err.getvalue())
+
+    def test_should_fail_without_reviews(self):
+        Review.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command("check_query_plans", stdout=StringIO())
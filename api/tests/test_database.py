@@ -0,0 +1,127 @@
+from unittest.mock import patch
+
+import psycopg2
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresWrapper
+from django.test import SimpleTestCase
+
+from backend.postgresql_pool import base as pool_base
+from backend.postgresql_pool.base import DatabaseWrapper
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, sql):
+        self.connection.pings += 1
+        if self.connection.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+
+class FakeConnection:
+    """Stands in for a psycopg2 connection to a server that is not there."""
+
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = True
+        self.broken = False
+        self.pings = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+class TestPostgresqlPool(SimpleTestCase):
+    def setUp(self):
+        self.opened = []
+
+        def connect(wrapper, conn_params):
+            wrapper.isolation_level = "read committed"
+            self.opened.append(FakeConnection())
+            return self.opened[-1]
+
+        patcher = patch.object(PostgresWrapper, "get_new_connection", connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(pool_base._pools.clear)
+        self.conn_params = {"dbname": "pooltest", "host": "db"}
+
+    def wrapper(self, size=2, health_checks=True):
+        return DatabaseWrapper({
+            "ENGINE": "backend.postgresql_pool", "NAME": "pooltest", "OPTIONS": {}, "TIME_ZONE": None,
+            "CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": health_checks, "AUTOCOMMIT": True,
+            "POOL": {"SIZE": size},
+        }, alias="pooltest")
+
+    def connect(self, wrapper):
+        wrapper.connection = wrapper.get_new_connection(self.conn_params)
+        return wrapper.connection
+
+    def close(self, wrapper):
+        wrapper._close()
+        wrapper.connection = None
+
+    def test_connections_are_reused_across_requests(self):
+        first, second = self.wrapper(), self.wrapper()
+        connection = self.connect(first)
+        self.close(first)
+        # another request, e.g. in another thread under ASGI
+        self.assertIs(self.connect(second), connection)
+        self.assertEqual(second.isolation_level, "read committed")
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(connection.pings, 1)
+        self.assertFalse(connection.closed)
+
+    def test_dropped_connections_are_replaced(self):
+        wrapper = self.wrapper()
+        connection = self.connect(wrapper)
+        self.close(wrapper)
+        connection.broken = True
+        self.assertIsNot(self.connect(wrapper), connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(len(self.opened), 2)
+
+    def test_health_checks_can_be_turned_off(self):
+        wrapper = self.wrapper(health_checks=False)
+        connection = self.connect(wrapper)
+        self.close(wrapper)
+        self.assertIs(self.connect(wrapper), connection)
+        self.assertEqual(connection.pings, 0)
+
+    def test_keeps_at_most_size_idle_connections(self):
+        wrappers = [self.wrapper(size=2) for _ in range(3)]
+        connections = [self.connect(wrapper) for wrapper in wrappers]
+        for wrapper in wrappers:
+            self.close(wrapper)
+        self.assertEqual([connection.closed for connection in connections], [0, 0, 1])
+
+    def test_open_transactions_are_rolled_back_when_returned(self):
+        wrapper = self.wrapper()
+        connection = self.connect(wrapper)
+        connection.autocommit = False
+        self.close(wrapper)
+        self.assertEqual(connection.rollbacks, 1)
+        self.assertFalse(connection.closed)
+
+    def test_forked_processes_start_with_empty_pools(self):
+        wrapper = self.wrapper()
+        connection = self.connect(wrapper)
+        self.close(wrapper)
+        self.addCleanup(pool_base._inherited.clear)
+        pool_base.forget_pools()
+        self.assertIsNot(self.connect(wrapper), connection)
+        # the parent's connection is left open for the parent
+        self.assertFalse(connection.closed)
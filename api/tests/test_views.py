@@ -1,12 +1,47 @@
 from rest_framework.test import APITestCase
-from django.urls import reverse
+from authentication.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
 from rest_framework import status
 from school.models import School, Course
-from review.models import Review
+from review.helpful import helpful_votes
+from review.models import Review, ReviewVote, SchoolReviewStats
+from review.search import install_search_index, remove_search_index
+from review.stats import rebuild_review_stats, verify_review_stats
+from requestschool.models import RequestSchool
+from utils.cache import response_cache
+from backend.middleware import QueryBudgetExceeded, request_metrics
+from review import export
+from review.views import ReviewAPIView
+from unittest.mock import patch
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from io import StringIO
+from django.utils.translation import gettext_lazy
+from rest_framework import renderers
+from rest_framework.exceptions import ErrorDetail
+from utils.renderers import JSONRenderer
+from utils.throttling import LocalStore, get_store
+from rest_framework.test import APIClient
+import base64
+import csv
+import datetime
+import decimal
+import gzip
+import io
+import json
+import threading
+import time
 import uuid
 
 
 class TestSchoolAIPView(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+
     def test_should_create_school(self):
         test_data = {
             "short_name": "TEST",
@@ -122,6 +157,7 @@ class TestSchoolAIPView(APITestCase):
 # Review API TESTS
 class TestReviewAPIView(APITestCase):
     def setUp(self):
+        response_cache.cache.clear()
         # Creating a school and course object for the tests
         self.school = School.objects.create(
             long_name="Test School", short_name="TS", city="Test City",
@@ -333,7 +369,8 @@ class TestReviewAPIView(APITestCase):
 
         self.assertEqual(len(response.data['data']), 5)
 
-        for i, review_data in enumerate(response.data['data']):
+        # reviews are listed newest first
+        for i, review_data in zip(reversed(range(5)), response.data['data']):
             self.assertIn(
                 f"This is review number {i}", review_data['review_text'])
 
@@ -343,6 +380,133 @@ class TestReviewAPIView(APITestCase):
                                 'short_name': invalid_short_name}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    # reviews are created through the ORM here, which the response cache does not see
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_review_listing_query_count_does_not_grow_with_reviews(self):
+        def create_reviews(count):
+            for i in range(count):
+                Review.objects.create(
+                    school=self.school,
+                    course=self.course,
+                    review_text=f"Query count review {i}",
+                    term="Fall",
+                    grade_received="A",
+                    delivery_method="Online",
+                )
+
+        def count_queries(url):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(context.captured_queries), response
+
+        list_url = reverse('review_list')
+        school_url = reverse('school_reviews', kwargs={'short_name': self.school.short_name})
+
+        create_reviews(2)
+        # the first request resolves the short name, later ones hit the resolver cache
+        count_queries(school_url)
+        list_queries, _ = count_queries(list_url)
+        school_queries, _ = count_queries(school_url)
+
+        create_reviews(20)
+        self.assertEqual(count_queries(list_url)[0], list_queries)
+        self.assertEqual(count_queries(school_url)[0], school_queries)
+
+        # the school short name and course code are still rendered
+        _, response = count_queries(list_url)
+        self.assertEqual(response.data['data'][0]['school'], self.school.short_name)
+        self.assertEqual(response.data['data'][0]['course'], "TEST 101")
+
+        review = Review.objects.first()
+        # the ETag/Last-Modified aggregate, then the review with its school and course
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('review_detail', kwargs={'review_id': review.id}))
+        self.assertEqual(response.data['data']['course'], "TEST 101")
+
+    def test_should_paginate_reviews_with_cursor(self):
+        for i in range(7):
+            Review.objects.create(
+                school=self.school,
+                course=self.course,
+                review_text=f"Paginated review {i}",
+                term="Spring",
+                grade_received="B",
+                delivery_method="Hybrid",
+            )
+
+        response = self.client.get(reverse('review_list'), {'page_size': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [review['review_text'] for review in response.data['data']],
+            ["Paginated review 6", "Paginated review 5", "Paginated review 4"])
+        self.assertIsNone(response.data['previous'])
+        next_url = response.data['next']
+
+        # a review added while paging shows up at the head, not in later pages
+        Review.objects.create(
+            school=self.school, course=self.course, review_text="Late review",
+            term="Fall", grade_received="A", delivery_method="Online")
+
+        seen = [review['review_text'] for review in response.data['data']]
+        while next_url:
+            response = self.client.get(next_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(review['review_text'] for review in response.data['data'])
+            last_page, next_url = response, response.data['next']
+        self.assertEqual(seen, [f"Paginated review {i}" for i in reversed(range(7))])
+
+        # walking back from the last page returns the page before it
+        response = self.client.get(last_page.data['previous'])
+        self.assertEqual(
+            [review['review_text'] for review in response.data['data']],
+            ["Paginated review 3", "Paginated review 2", "Paginated review 1"])
+
+        response = self.client.get(
+            reverse('school_reviews', kwargs={'short_name': self.school.short_name}), {'page_size': 2})
+        self.assertEqual(len(response.data['data']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_review_page_size_is_capped(self):
+        with self.settings(API_MAX_PAGE_SIZE=2):
+            for i in range(3):
+                Review.objects.create(
+                    school=self.school, course=self.course, review_text=f"Review {i}",
+                    term="Fall", grade_received="A", delivery_method="Online")
+            response = self.client.get(reverse('review_list'), {'page_size': 100})
+        self.assertEqual(len(response.data['data']), 2)
+
+    def test_should_filter_reviews_by_course_and_recommendation(self):
+        other_course = Course.objects.create(
+            school=self.school, subject="TEST", catalog_number="102", title="More Tests")
+        for course, recommended in ((self.course, True), (self.course, False), (other_course, True)):
+            Review.objects.create(
+                school=self.school, course=course, review_text=f"{course} {recommended}",
+                term="Fall", grade_received="A", delivery_method="Online", recommended=recommended)
+        url = reverse('school_reviews', kwargs={'short_name': self.school.short_name})
+
+        response = self.client.get(url, {'course': 'TEST 101'})
+        self.assertEqual(sorted(review['review_text'] for review in response.data['data']),
+                         ["TEST 101 False", "TEST 101 True"])
+        response = self.client.get(url, {'course': 'TEST 101', 'recommended': 'true'})
+        self.assertEqual([review['review_text'] for review in response.data['data']], ["TEST 101 True"])
+        response = self.client.get(reverse('review_list'), {'recommended': 'false'})
+        self.assertEqual([review['review_text'] for review in response.data['data']], ["TEST 101 False"])
+
+        self.assertEqual(self.client.get(url, {'course': 'TEST 999'}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url, {'recommended': 'maybe'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_review_cursor_returns_404(self):
+        response = self.client.get(reverse('review_list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_review_cursor_returns_404(self):
+        for position in ({"c": "2024-01-01T00:00:00+00:00", "i": "not-a-uuid", "r": 0},
+                         {"c": "2024-01-01T00:00:00+00:00", "i": 1, "r": 0}):
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+            response = self.client.get(reverse('review_list'), {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, position)
+
     def test_should_return_one_review(self):
         test_data = {
             "school": self.school.id,
@@ -636,6 +800,1315 @@ class TestReviewAPIView(APITestCase):
                          status.HTTP_404_NOT_FOUND)
 
 
+# PROFILING MIDDLEWARE TESTS
+class TestProfilingMiddleware(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        request_metrics.reset()
+        self.school = School.objects.create(long_name="Profiled School", short_name="PROF")
+        self.course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="135", title="Computer Science I")
+        for i in range(3):
+            Review.objects.create(
+                school=self.school, course=self.course, review_text=f"Profiled review {i}",
+                term="Fall", grade_received="A", delivery_method="Online")
+
+    def test_should_send_server_timing(self):
+        response = self.client.get(reverse('review_list'))
+        timings = {part.split(";")[0]: part for part in response['Server-Timing'].split(", ")}
+        self.assertEqual(set(timings), {"db", "serialize", "render", "total"})
+        self.assertIn('desc="2 queries"', timings["db"])
+
+    def test_should_aggregate_metrics_per_url_name(self):
+        for _ in range(3):
+            self.client.get(reverse('review_list'))
+        self.client.get(reverse('school_reviews', kwargs={'short_name': "PROF"}))
+
+        self.client.force_authenticate(User.objects.create_superuser("metrics", "metrics@example.com", "password"))
+        response = self.client.get(reverse('request_metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = response.data['data']
+        self.assertEqual(metrics['review_list']['requests'], 3)
+        # the first response is built, the others come from the response cache
+        self.assertEqual(metrics['review_list']['queries'], 2)
+        self.assertEqual(metrics['school_reviews']['requests'], 1)
+        self.assertGreater(metrics['review_list']['response_bytes'], 0)
+        self.assertEqual(sum(metrics['review_list']['histogram'].values()), 3)
+        self.assertIsNotNone(metrics['review_list']['p50_ms'])
+
+        self.client.delete(reverse('request_metrics'))
+        self.assertNotIn('review_list', self.client.get(reverse('request_metrics')).data['data'])
+
+    def test_metrics_require_admin(self):
+        self.assertEqual(self.client.get(reverse('request_metrics')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_should_enforce_query_budgets(self):
+        with patch.object(ReviewAPIView, "query_budget", {"GET": 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('review_list'))
+            # other methods have no budget
+            response = self.client.delete(reverse('review_detail', kwargs={'review_id': uuid.uuid4()}))
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+            with override_settings(QUERY_BUDGET_RAISE=False), self.assertLogs("backend.middleware", "WARNING"):
+                response = self.client.get(reverse('review_list'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+# RESPONSE CACHE TESTS
+class TestResponseCache(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        response_cache.reset_stats()
+        self.school = School.objects.create(
+            long_name="Cache School", short_name="CACHE", city="Test City",
+            state="Test State", country="Test Country")
+        self.course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.other_school = School.objects.create(long_name="Other School", short_name="OTHER")
+        self.other_course = Course.objects.create(
+            school=self.other_school, subject="CS", catalog_number="135", title="Computer Science I")
+
+    def review_data(self, school, course, text):
+        return {
+            "school": school.short_name,
+            "course": str(course.id),
+            "review_text": text,
+            "term": "Fall",
+            "grade_received": "A",
+            "delivery_method": "Online",
+        }
+
+    def review_texts(self, url):
+        return [review['review_text'] for review in self.client.get(url).data['data']]
+
+    def test_cached_reads_are_served_without_queries(self):
+        url = reverse('schools')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']), 2)
+        self.assertEqual(response_cache.stats()['views']['schools'], {"hits": 1, "misses": 1})
+
+    def test_no_stale_review_reads_after_writes(self):
+        list_url = reverse('review_list')
+        school_url = reverse('school_reviews', kwargs={'short_name': self.school.short_name})
+        other_url = reverse('school_reviews', kwargs={'short_name': self.other_school.short_name})
+        self.assertEqual(self.review_texts(list_url), [])
+        self.assertEqual(self.review_texts(school_url), [])
+        self.assertEqual(self.review_texts(other_url), [])
+
+        response = self.client.post(
+            reverse('review_list'), self.review_data(self.school, self.course, "First"), format='json')
+        review_id = response.data['data']['id']
+        detail_url = reverse('review_detail', kwargs={'review_id': review_id})
+        self.assertEqual(self.review_texts(list_url), ["First"])
+        self.assertEqual(self.review_texts(school_url), ["First"])
+        self.assertEqual(self.client.get(detail_url).data['data']['review_text'], "First")
+
+        # moving the review to another school updates both school listings
+        self.client.put(detail_url, self.review_data(self.other_school, self.other_course, "Moved"), format='json')
+        self.assertEqual(self.client.get(detail_url).data['data']['review_text'], "Moved")
+        self.assertEqual(self.review_texts(school_url), [])
+        self.assertEqual(self.review_texts(other_url), ["Moved"])
+        self.assertEqual(self.review_texts(list_url), ["Moved"])
+
+        # renaming a school changes how cached reviews render it
+        self.client.put(reverse('school', kwargs={'short_name': "OTHER"}),
+                        {"short_name": "RENAM", "long_name": "Other School"})
+        self.assertEqual(self.client.get(detail_url).data['data']['school'], "RENAM")
+
+        self.client.delete(detail_url)
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.review_texts(list_url), [])
+
+    def test_no_stale_school_reads_after_writes(self):
+        detail_url = reverse('school', kwargs={'short_name': "CACHE"})
+        self.assertEqual(self.client.get(detail_url).data['data']['city'], "Test City")
+        self.assertEqual(len(self.client.get(reverse('schools')).data['data']), 2)
+
+        self.client.put(detail_url, {"short_name": "CACHE", "long_name": "Cache School", "city": "Updated"})
+        self.assertEqual(self.client.get(detail_url).data['data']['city'], "Updated")
+
+        self.client.post(reverse('schools'), {"short_name": "NEW", "long_name": "New School"})
+        self.assertEqual(len(self.client.get(reverse('schools')).data['data']), 3)
+
+        self.client.delete(detail_url)
+        self.assertEqual(self.client.get(detail_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(len(self.client.get(reverse('schools')).data['data']), 2)
+
+    def test_cache_stats_endpoint_requires_admin(self):
+        self.client.get(reverse('schools'))
+        response = self.client.get(reverse('cache_stats'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        admin = User.objects.create_superuser("admin", "admin@example.com", "password123")
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('cache_stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['misses'], 1)
+
+
+# BULK REVIEW TESTS
+class TestReviewBulkAPIView(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.school = School.objects.create(long_name="Bulk School", short_name="BULK")
+        self.other_school = School.objects.create(long_name="Other School", short_name="OTHER")
+        self.course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="135", title="Computer Science I")
+        # same code at another school; codes are resolved within the item's school
+        self.other_course = Course.objects.create(
+            school=self.other_school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.admin = User.objects.create_superuser("bulkadmin", "bulk@example.com", "password123")
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('review_bulk')
+
+    def item(self, **overrides):
+        item = {
+            "school": "BULK",
+            "course": "CS 135",
+            "review_text": "Imported review",
+            "term": "Fall",
+            "grade_received": "A",
+            "delivery_method": "Online",
+        }
+        item.update(overrides)
+        return item
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(self.url, [], format='json').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(User.objects.create_user("student", "student@example.com", "pw"))
+        self.assertEqual(self.client.post(self.url, [], format='json').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_creates_valid_items_and_reports_invalid_ones(self):
+        items = [
+            self.item(),
+            self.item(school=str(self.other_school.id), course=str(self.other_course.id), grade_received="B"),
+            self.item(term="Winter"),
+            self.item(school="NOPE"),
+            self.item(course=str(self.other_course.id)),
+            "not a review",
+            self.item(course="CS135"),
+            self.item(school="OTHER", course=["CS 135"], review_text="x" * 501),
+            self.item(school="OTHER", course=["CS 135"]),
+        ]
+        response = self.client.post(self.url, items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = response.data['data']['results']
+        errors = {error['index']: error['errors'] for error in response.data['data']['errors']}
+        self.assertEqual([result['index'] for result in results], [0, 1, 8])
+        self.assertEqual({result['status'] for result in results}, {"created"})
+        self.assertEqual(sorted(errors), [2, 3, 4, 5, 6, 7])
+        self.assertIn('term', errors[2])
+        self.assertIn('school', errors[3])
+        self.assertEqual(errors[4]['course'], ["The course must be from the selected school."])
+        self.assertIn('course', errors[6])
+        self.assertIn('review_text', errors[7])
+
+        self.assertEqual(Review.objects.count(), 3)
+        self.assertEqual(Review.objects.get(pk=results[2]['id']).course, self.other_course)
+        self.assertEqual(SchoolReviewStats.objects.get(school=self.school).review_count, 1)
+        self.assertEqual(SchoolReviewStats.objects.get(school=self.other_school).review_count, 2)
+
+    def test_updates_items_with_an_id(self):
+        created = self.client.post(self.url, [self.item(), self.item()], format='json').data['data']['results']
+        first, second = created[0]['id'], created[1]['id']
+        school_reviews = reverse('school_reviews', kwargs={'short_name': "OTHER"})
+        self.assertEqual(self.client.get(school_reviews).data['data'], [])
+
+        response = self.client.post(self.url, [
+            self.item(id=str(first), school="OTHER", review_text="Moved"),
+            self.item(id=str(uuid.uuid4())),
+            self.item(id=str(second), review_text="Edited"),
+            self.item(id=str(second), review_text="Edited twice"),
+        ], format='json')
+        results = response.data['data']['results']
+        self.assertEqual([(result['index'], result['status']) for result in results],
+                         [(0, "updated"), (2, "updated")])
+        self.assertEqual([error['index'] for error in response.data['data']['errors']], [1, 3])
+
+        moved = Review.objects.get(pk=first)
+        self.assertEqual((moved.school, moved.course, moved.review_text), (self.other_school, self.other_course, "Moved"))
+        self.assertEqual(Review.objects.get(pk=second).review_text, "Edited")
+        self.assertEqual(SchoolReviewStats.objects.get(school=self.school).review_count, 1)
+        self.assertEqual(SchoolReviewStats.objects.get(school=self.other_school).review_count, 1)
+        # cached listings of the school the review moved to are invalidated
+        self.assertEqual([review['review_text'] for review in self.client.get(school_reviews).data['data']],
+                         ["Moved"])
+
+    def test_lookup_queries_do_not_grow_with_batch(self):
+        def queries(count):
+            items = [self.item(course=["CS 135", str(self.course.id)][i % 2]) for i in range(count)]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url, items, format='json')
+            self.assertEqual(len(response.data['data']['results']), count)
+            # inserts are split by the backend's parameter limit, everything else is per batch
+            return len([query for query in context.captured_queries
+                        if not query['sql'].startswith('INSERT INTO "review_review"')])
+
+        # the first batch also creates the stats rows
+        queries(1)
+        self.assertEqual(queries(10), queries(400))
+
+    def test_rejects_malformed_batches(self):
+        response = self.client.post(self.url, self.item(), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(REVIEW_BULK_MAX_ITEMS=2):
+            response = self.client.post(self.url, [self.item()] * 3, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Review.objects.count(), 0)
+
+
+# REVIEW SEARCH TESTS
+# REVIEW EXPORT TESTS
+class TestReviewExportAPIView(APITestCase):
+    def setUp(self):
+        self.school = School.objects.create(long_name="Export School", short_name="EXP")
+        self.other_school = School.objects.create(long_name="Other Export School", short_name="OEXP")
+        self.course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.other_course = Course.objects.create(
+            school=self.other_school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.first = self.review(self.course, "Fall", "First, with a comma")
+        self.second = self.review(self.course, "Spring", "Second \"quoted\"")
+        self.third = self.review(self.other_course, "Fall", "Third")
+        self.client.force_authenticate(User.objects.create_superuser("exporter", "export@example.com", "password"))
+        self.url = reverse('review_export')
+
+    def review(self, course, term, text):
+        return Review.objects.create(
+            school=course.school, course=course, review_text=text,
+            term=term, grade_received="A", delivery_method="Online")
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(User.objects.create_user("reader", "reader@example.com", "password"))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_streams_ndjson_in_updated_order(self):
+        rows = [json.loads(line) for line in self.export().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [str(self.first.id), str(self.second.id), str(self.third.id)])
+        self.assertEqual(rows[0]['school'], "EXP")
+        self.assertEqual(rows[0]['course'], "CS 135")
+        self.assertEqual(rows[1]['review_text'], 'Second "quoted"')
+
+        self.first.review_text = "First, edited"
+        self.first.save()
+        rows = [json.loads(line) for line in self.export(since=rows[-1]['updated_at']).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [str(self.third.id), str(self.first.id)])
+
+    def test_streams_csv(self):
+        rows = list(csv.reader(io.StringIO(self.export(output="csv"))))
+        self.assertEqual(rows[0][:3], ["id", "school", "course"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][3], "First, with a comma")
+        self.assertEqual(rows[2][3], 'Second "quoted"')
+
+    def test_filters(self):
+        def ids(**params):
+            return [json.loads(line)['id'] for line in self.export(**params).splitlines()]
+
+        self.assertEqual(ids(school="OEXP"), [str(self.third.id)])
+        self.assertEqual(ids(school="EXP", course="CS 135"), [str(self.first.id), str(self.second.id)])
+        self.assertEqual(ids(term="Spring"), [str(self.second.id)])
+        self.assertEqual(ids(since="2999-01-01"), [])
+
+        for params, code in (
+            ({"output": "xml"}, status.HTTP_400_BAD_REQUEST),
+            ({"term": "Winter"}, status.HTTP_400_BAD_REQUEST),
+            ({"since": "yesterday"}, status.HTTP_400_BAD_REQUEST),
+            ({"school": "NOPE"}, status.HTTP_404_NOT_FOUND),
+            # a course code is only looked up within a school
+            ({"course": "CS 135"}, status.HTTP_404_NOT_FOUND),
+        ):
+            self.assertEqual(self.client.get(self.url, params).status_code, code, params)
+
+    def test_gzips_for_clients_that_accept_it(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response['Content-Encoding'], "gzip")
+        self.assertIn("Accept-Encoding", response['Vary'])
+        text = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertEqual(text, self.export())
+
+    @override_settings(REVIEW_EXPORT_CHUNK_SIZE=2)
+    def test_reads_in_chunks(self):
+        response = self.client.get(self.url)
+        # the rows are only read while the response is consumed
+        with CaptureQueriesContext(connection) as context:
+            lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 3)
+        # one query read in chunks, not one per review
+        self.assertEqual(len(context.captured_queries), 1)
+
+    async def test_streams_chunks_as_read_under_asgi(self):
+        user = await sync_to_async(User.objects.get)(username="exporter")
+        access = (await sync_to_async(user.tokens)())["access"]
+        export_rows, buffered = export.export_rows, export.buffered
+        read = []
+
+        def rows(reviews):
+            for row in export_rows(reviews):
+                read.append(row)
+                yield row
+
+        # a chunk per line
+        with patch.object(export, "export_rows", rows), \
+                patch.object(export, "buffered", lambda lines: buffered(lines, size=1)):
+            response = await self.async_client.get(self.url, headers={"Authorization": f"Bearer {access}"})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.is_async)
+            chunks = []
+            async for chunk in response.streaming_content:
+                # each chunk is sent once its row is read, not after all of them
+                chunks.append(chunk)
+                self.assertEqual(len(read), len(chunks))
+        self.assertEqual([json.loads(chunk)["id"] for chunk in chunks],
+                         [str(self.first.id), str(self.second.id), str(self.third.id)])
+
+
+class TestReviewSearchAPIView(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.school = School.objects.create(long_name="Search School", short_name="FIND")
+        self.other_school = School.objects.create(long_name="Other School", short_name="ELSE")
+        self.course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.other_course = Course.objects.create(
+            school=self.school, subject="MATH", catalog_number="181", title="Calculus I")
+        self.elsewhere = Course.objects.create(
+            school=self.other_school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.url = reverse('review_search')
+
+    def review(self, text, course=None):
+        course = course or self.course
+        return Review.objects.create(
+            school=course.school, course=course, review_text=text,
+            term="Fall", grade_received="A", delivery_method="Online")
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def texts(self, **params):
+        return [item['review_text'] for item in self.search(**params).data['data']]
+
+    def test_results_are_ranked_and_highlighted(self):
+        self.review("Lectures were long.")
+        best = self.review("The lecture notes and every lecture recording were great lectures.")
+        self.review("Nothing to see here.")
+
+        response = self.search(q="lecture")
+        data = response.data['data']
+        # stemming matches "lectures" too
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0]['id'], str(best.id))
+        self.assertGreater(data[0]['rank'], data[1]['rank'])
+        self.assertIn("<mark>lecture</mark>", data[0]['highlight'])
+        self.assertEqual(data[0]['school'], "FIND")
+        self.assertEqual(data[0]['course'], "CS 135")
+
+    def test_highlight_escapes_review_html(self):
+        self.review("<script>alert(1)</script> exam")
+        highlight = self.search(q="exam").data['data'][0]['highlight']
+        self.assertTrue(highlight.startswith("&lt;script&gt;"))
+        self.assertTrue(highlight.endswith("<mark>exam</mark>"))
+
+    def test_filters_by_school_and_course(self):
+        self.review("homework every week")
+        self.review("homework every day", course=self.other_course)
+        self.review("homework sometimes", course=self.elsewhere)
+
+        self.assertEqual(len(self.texts(q="homework")), 3)
+        self.assertEqual(len(self.texts(q="homework", school="FIND")), 2)
+        self.assertEqual(self.texts(q="homework", school="FIND", course="MATH 181"), ["homework every day"])
+        self.assertEqual(self.texts(q="homework", school="ELSE", course="CS 135"), ["homework sometimes"])
+        self.assertEqual(self.texts(q="homework every week"), ["homework every week"])
+
+        response = self.client.get(self.url, {"q": "homework", "school": "NOPE"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(self.url, {"q": "homework", "course": "CS135"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_query_is_required_and_never_parsed_as_syntax(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.review("fair grading")
+        self.assertEqual(self.texts(q='grading" AND (NEAR'), [])
+        self.assertEqual(self.texts(q='"grading'), ["fair grading"])
+        self.assertEqual(self.texts(q="***"), [])
+
+    def test_should_paginate_with_cursor(self):
+        for i in range(7):
+            self.review("quiz " * (i + 1))
+        seen = []
+        url = self.url + "?q=quiz&page_size=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.data['previous'], None)
+            seen.extend(response.data['data'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len({item['id'] for item in seen}), 7)
+        ranks = [item['rank'] for item in seen]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+
+        response = self.client.get(self.url, {"q": "quiz", "cursor": "garbage"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        for position in ({"k": 1.0, "i": "not-a-uuid"}, {"k": 1.0, "i": 1}):
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+            response = self.client.get(self.url, {"q": "quiz", "cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, position)
+
+    def test_index_follows_review_writes(self):
+        response = self.client.post(reverse('review_list'), {
+            "school": "FIND", "course": str(self.course.id), "review_text": "midterm was hard",
+            "term": "Fall", "grade_received": "A", "delivery_method": "Online",
+        }, format='json')
+        review = Review.objects.get(pk=response.data['data']['id'])
+        self.assertEqual(self.texts(q="midterm"), ["midterm was hard"])
+
+        self.client.put(reverse('review_detail', kwargs={'review_id': review.id}), {
+            "school": "FIND", "course": str(self.course.id), "review_text": "final was hard",
+            "term": "Fall", "grade_received": "A", "delivery_method": "Online",
+        }, format='json')
+        self.assertEqual(self.texts(q="midterm"), [])
+        self.assertEqual(self.texts(q="final"), ["final was hard"])
+
+        # writes that bypass the views are indexed too
+        Review.objects.filter(pk=review.pk).update(review_text="project was hard")
+        response_cache.cache.clear()
+        self.assertEqual(self.texts(q="project"), ["project was hard"])
+
+        self.client.delete(reverse('review_detail', kwargs={'review_id': review.id}))
+        self.assertEqual(self.texts(q="hard"), [])
+
+    @override_settings(REVIEW_SEARCH_MAX_CANDIDATES=3)
+    def test_only_newest_candidates_are_ranked(self):
+        # the oldest review is the best match, but falls outside the newest three
+        self.review("lab lab lab lab")
+        newest = [self.review(f"lab report {i}") for i in range(3)]
+        results = self.search(q="lab").data['data']
+        self.assertEqual({item['id'] for item in results}, {str(review.id) for review in newest})
+        self.assertEqual(len(self.texts(q="lab", school="FIND")), 3)
+
+    def test_missing_index_is_rebuilt(self):
+        self.review("textbook optional")
+        if connection.vendor != "sqlite":
+            self.skipTest("the FTS table only exists on SQLite")
+        remove_search_index(connection)
+        self.assertTrue(install_search_index(connection))
+        self.assertFalse(install_search_index(connection))
+        self.assertEqual(self.texts(q="textbook"), ["textbook optional"])
+
+
+# HELPFUL VOTE TESTS
+class TestReviewHelpfulAPIView(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.school = School.objects.create(long_name="Vote School", short_name="VOTE")
+        self.course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.review = Review.objects.create(
+            school=self.school, course=self.course, review_text="Helpful?",
+            term="Fall", grade_received="A", delivery_method="Online", helpful_count=3)
+        self.user = User.objects.create_user("voter", "voter@example.com", "password123")
+        self.url = reverse('review_helpful', kwargs={'review_id': self.review.id})
+
+    def test_vote_requires_authentication(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_votes_count_once_per_user(self):
+        detail_url = reverse('review_detail', kwargs={'review_id': self.review.id})
+        self.assertEqual(self.client.get(detail_url).data['data']['helpful_count'], 3)
+
+        self.client.force_authenticate(self.user)
+        # cached responses are invalidated once the vote commits
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['helpful_count'], 4)
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['helpful_count'], 4)
+        self.assertEqual(ReviewVote.objects.filter(review=self.review).count(), 1)
+
+        self.assertEqual(self.client.get(detail_url).data['data']['helpful_count'], 4)
+
+    def test_vote_for_missing_review(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('review_helpful', kwargs={'review_id': uuid.uuid4()}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_put_does_not_change_helpful_count(self):
+        self.client.put(reverse('review_detail', kwargs={'review_id': self.review.id}), {
+            "school": self.school.short_name,
+            "course": str(self.course.id),
+            "review_text": "Edited",
+            "term": "Fall",
+            "grade_received": "A",
+            "delivery_method": "Online",
+            "helpful_count": 1000,
+        }, format='json')
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.review_text, "Edited")
+        self.assertEqual(self.review.helpful_count, 3)
+
+    @override_settings(REVIEW_HELPFUL_BUFFERED=True, REVIEW_HELPFUL_FLUSH_SIZE=3,
+                       REVIEW_HELPFUL_FLUSH_INTERVAL=3600)
+    def test_buffered_votes_are_flushed_in_batches(self):
+        helpful_votes.flush()
+        for i in range(2):
+            self.client.force_authenticate(User.objects.create_user(f"buffered{i}", f"b{i}@example.com", "pw"))
+            response = self.client.post(self.url)
+            self.assertEqual(response.data['data']['helpful_count'], 4 + i)
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.helpful_count, 3)
+
+        # the third vote fills the batch
+        self.client.force_authenticate(self.user)
+        self.client.post(self.url)
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.helpful_count, 6)
+        self.assertEqual(helpful_votes.pending(self.review.pk), 0)
+
+
+class TestConcurrentHelpfulVotes(TransactionTestCase):
+    def test_concurrent_votes_are_not_lost(self):
+        school = School.objects.create(long_name="Race School", short_name="RACE")
+        course = Course.objects.create(school=school, subject="CS", catalog_number="135", title="CS I")
+        review = Review.objects.create(
+            school=school, course=course, review_text="Popular",
+            term="Fall", grade_received="A", delivery_method="Online")
+        users = User.objects.bulk_create(
+            User(username=f"racer{i}", email=f"racer{i}@example.com") for i in range(16))
+        url = reverse('review_helpful', kwargs={'review_id': review.id})
+
+        barrier = threading.Barrier(len(users))
+        statuses = []
+
+        def post(client):
+            # the in-memory SQLite test database fails concurrent writers with
+            # "table is locked" instead of making them wait, so retry those
+            for _ in range(200):
+                try:
+                    return client.post(url).status_code
+                except OperationalError as error:
+                    if "locked" not in str(error):
+                        raise
+                    time.sleep(0.005)
+            raise AssertionError("vote kept failing with a locked database")
+
+        def vote(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                barrier.wait()
+                # every user votes twice, only the first counts
+                for _ in range(2):
+                    statuses.append(post(client))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=vote, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(statuses), 2 * len(users))
+        self.assertTrue(set(statuses) <= {200, 201})
+        review.refresh_from_db()
+        self.assertEqual(review.helpful_count, len(users))
+        self.assertEqual(ReviewVote.objects.filter(review=review).count(), len(users))
+
+    @override_settings(REVIEW_HELPFUL_BUFFERED=True, REVIEW_HELPFUL_FLUSH_SIZE=100,
+                       REVIEW_HELPFUL_FLUSH_INTERVAL=0.5)
+    def test_buffered_votes_are_flushed_without_more_votes(self):
+        school = School.objects.create(long_name="Quiet School", short_name="QUIET")
+        course = Course.objects.create(school=school, subject="CS", catalog_number="135", title="CS I")
+        review = Review.objects.create(
+            school=school, course=course, review_text="Unpopular",
+            term="Fall", grade_received="A", delivery_method="Online")
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("quiet", "quiet@example.com", "password"))
+        helpful_votes.flush()
+        response = client.post(reverse('review_helpful', kwargs={'review_id': review.id}))
+        self.assertEqual(response.data['data']['helpful_count'], 1)
+        self.assertEqual(Review.objects.get(pk=review.pk).helpful_count, 0)
+
+        # written by the timer, though no later vote comes
+        timer = helpful_votes._timer
+        self.assertIsNotNone(timer)
+        timer.join(5)
+        self.assertFalse(timer.is_alive())
+        self.assertEqual(helpful_votes.pending(review.pk), 0)
+        self.assertEqual(Review.objects.get(pk=review.pk).helpful_count, 1)
+
+
+# CONDITIONAL GET TESTS
+class TestConditionalGet(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.school = School.objects.create(long_name="Etag School", short_name="ETAG")
+        self.course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.review = Review.objects.create(
+            school=self.school, course=self.course, review_text="Validated",
+            term="Fall", grade_received="A", delivery_method="Online")
+        RequestSchool.objects.create(school_name="Requested School", website="https://example.com")
+
+    def assertNotModified(self, url, queries, **headers):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        return response
+
+    def test_responses_carry_validators(self):
+        response = self.client.get(reverse('schools'))
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_not_modified_from_cache_runs_no_queries(self):
+        for url in (reverse('schools'),
+                    reverse('school', kwargs={'short_name': "ETAG"}),
+                    reverse('review_list'),
+                    reverse('school_reviews', kwargs={'short_name': "ETAG"}),
+                    reverse('review_detail', kwargs={'review_id': self.review.id})):
+            etag = self.client.get(url)['ETag']
+            response = self.assertNotModified(url, 0, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response['ETag'], etag)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_not_modified_runs_only_the_validator_query(self):
+        for url in (reverse('schools'),
+                    reverse('review_list'),
+                    reverse('school_reviews', kwargs={'short_name': "ETAG"}),
+                    reverse('review_detail', kwargs={'review_id': self.review.id}),
+                    reverse('school_requests')):
+            response = self.client.get(url)
+            self.assertNotModified(url, 1, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertNotModified(url, 1, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_validators_change_with_rows(self):
+        list_url = reverse('review_list')
+        etag = self.client.get(list_url)['ETag']
+
+        # renaming the course changes how the review is rendered
+        self.course.catalog_number = "136"
+        self.course.save()
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'][0]['course'], "CS 136")
+
+        # deletions do not move max(updated_at), but the count changes
+        etag = response['ETag']
+        Review.objects.create(
+            school=self.school, course=self.course, review_text="Second",
+            term="Fall", grade_received="B", delivery_method="Online").delete()
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.review.delete()
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'], [])
+
+    def test_write_through_api_invalidates_cached_validators(self):
+        url = reverse('school', kwargs={'short_name': "ETAG"})
+        etag = self.client.get(url)['ETag']
+        self.client.put(url, {"short_name": "ETAG", "long_name": "Etag School", "city": "Moved"})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_missing_school_is_not_answered_with_304(self):
+        School.objects.create(long_name="Empty School", short_name="EMPTY")
+        etag = self.client.get(reverse('school_reviews', kwargs={'short_name': "EMPTY"}))['ETag']
+        response = self.client.get(reverse('school_reviews', kwargs={'short_name': "NOPE"}),
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', response)
+
+
+class TestIdentifierResolution(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.school = School.objects.create(
+            long_name="First School", short_name="FIRST", city="Test City",
+            state="Test State", country="Test Country")
+        self.other_school = School.objects.create(
+            long_name="Second School", short_name="SECND", city="Test City",
+            state="Test State", country="Test Country")
+        # the same course code at both schools
+        self.course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.other_course = Course.objects.create(
+            school=self.other_school, subject="CS", catalog_number="135", title="Intro to Programming")
+
+    def post_review(self, school, course):
+        return self.client.post(reverse('review_list'), {
+            "school": school,
+            "course": course,
+            "review_text": "Resolved by code.",
+            "term": "Fall",
+            "grade_received": "A",
+            "delivery_method": "Online",
+        }, format='json')
+
+    def test_course_codes_are_looked_up_within_the_school(self):
+        response = self.post_review("SECND", "CS 135")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(Review.objects.get(id=response.data['data']['id']).course, self.other_course)
+
+        response = self.post_review("FIRST", "CS 135")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(Review.objects.get(id=response.data['data']['id']).course, self.course)
+
+        response = self.post_review("FIRST", "CS 202")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.post_review("FIRST", str(self.other_course.id))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_resolved_identifiers_are_cached(self):
+        self.post_review("FIRST", "CS 135")
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_review("FIRST", "CS 135")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        for table in ('"school_school"', '"school_course"'):
+            lookups = [query for query in context.captured_queries
+                       if query['sql'].startswith("SELECT") and f"FROM {table}" in query['sql']]
+            # only the serializer's check of the primary key is left
+            self.assertEqual(len(lookups), 1, lookups)
+
+    def test_renames_and_deletes_invalidate_the_cache(self):
+        self.assertEqual(self.post_review("FIRST", "CS 135").status_code, status.HTTP_201_CREATED)
+
+        self.school.short_name = "RENAM"
+        self.school.save()
+        self.assertEqual(self.post_review("FIRST", "CS 135").status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.post_review("RENAM", "CS 135").status_code, status.HTTP_201_CREATED)
+
+        self.course.catalog_number = "136"
+        self.course.save()
+        self.assertEqual(self.post_review("RENAM", "CS 135").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.post_review("RENAM", "CS 136").status_code, status.HTTP_201_CREATED)
+
+        self.other_course.delete()
+        self.assertEqual(self.post_review("SECND", "CS 135").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stats_and_course_endpoints_resolve_short_names(self):
+        self.post_review("SECND", "CS 135")
+        response = self.client.get(reverse('course_stats', kwargs={
+            'short_name': "SECND", 'subject': "CS", 'catalog_number': "135"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['review_count'], 1)
+        response = self.client.get(reverse('school_courses', kwargs={'short_name': "SECND"}))
+        self.assertEqual([course['title'] for course in response.data['data']], ["Intro to Programming"])
+        response = self.client.get(reverse('school_courses', kwargs={'short_name': "NONE"}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# COURSE API TESTS
+class TestCourseAPIView(APITestCase):
+    def setUp(self):
+        self.school = School.objects.create(
+            long_name="Course School", short_name="CSU", city="Test City",
+            state="Test State", country="Test Country")
+        for subject, catalog_number, title in (
+            ("CS", "135", "Computer Science I"),
+            ("CS", "202", "Computer Science II"),
+            ("CPE", "100", "Computer Logic Design I"),
+            ("MATH", "181", "Calculus I"),
+            ("ENG", "101", "Composition I"),
+        ):
+            Course.objects.create(
+                school=self.school, subject=subject, catalog_number=catalog_number, title=title)
+        self.url = reverse('school_courses', kwargs={'short_name': self.school.short_name})
+
+    def search(self, query, **params):
+        response = self.client.get(self.url, {'q': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [f"{course['subject']} {course['catalog_number']}" for course in response.data['data']]
+
+    def test_should_search_courses_by_code_and_title(self):
+        self.assertEqual(self.search("CS 1"), ["CS 135"])
+        self.assertEqual(self.search("cs2"), ["CS 202"])
+        self.assertEqual(self.search("Compu"), ["CPE 100", "CS 135", "CS 202"])
+        self.assertEqual(self.search("comp sci"), ["CS 135", "CS 202"])
+        self.assertEqual(self.search("calc"), ["MATH 181"])
+        self.assertEqual(self.search("logic"), ["CPE 100"])
+        self.assertEqual(self.search("Compu", limit=1), ["CPE 100"])
+        self.assertEqual(self.search("zzz"), [])
+
+    def test_search_index_is_invalidated_on_course_writes(self):
+        self.assertEqual(self.search("Data"), [])
+        course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="302", title="Data Structures")
+        self.assertEqual(self.search("Data"), ["CS 302"])
+
+        course.title = "Algorithms"
+        course.save()
+        self.assertEqual(self.search("Data"), [])
+        course.delete()
+        self.assertEqual(self.search("Algo"), [])
+
+    def test_search_is_scoped_to_school(self):
+        other = School.objects.create(long_name="Other School", short_name="OS")
+        Course.objects.create(school=other, subject="CS", catalog_number="999", title="Other CS")
+        self.assertEqual(self.search("CS 9"), [])
+
+    def test_should_list_courses_and_handle_unknown_school(self):
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(reverse('school_courses', kwargs={'short_name': "NOPE"}), {'q': "CS"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# REVIEW STATS TESTS
+class TestReviewStatsAPIView(APITestCase):
+    def setUp(self):
+        self.school = School.objects.create(
+            long_name="Stats School", short_name="SS", city="Test City",
+            state="Test State", country="Test Country")
+        self.course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.other_course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="202", title="Computer Science II")
+
+    def post_review(self, course, **overrides):
+        data = {
+            "school": self.school.short_name,
+            "course": f"{course.subject} {course.catalog_number}",
+            "review_text": "Stats review",
+            "term": "Fall",
+            "grade_received": "A",
+            "delivery_method": "Online",
+            "year_taken": 2022,
+            "textbook_required": False,
+            "recommended": True,
+        }
+        data.update(overrides)
+        response = self.client.post(reverse('review_list'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response.data['data']['id']
+
+    def get_course_stats(self, course):
+        response = self.client.get(reverse('course_stats', kwargs={
+            'short_name': self.school.short_name, 'subject': course.subject,
+            'catalog_number': course.catalog_number}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['data']
+
+    def test_stats_follow_review_writes(self):
+        first = self.post_review(self.course)
+        self.post_review(self.course, grade_received="B", term="Spring", recommended=False,
+                         textbook_required=True, year_taken=2024)
+        self.post_review(self.other_course, delivery_method="Hybrid")
+
+        data = self.get_course_stats(self.course)
+        self.assertEqual(data['review_count'], 2)
+        self.assertEqual(data['grade_counts'], {"A": 1, "B": 1})
+        self.assertEqual(data['term_counts'], {"Fall": 1, "Spring": 1})
+        self.assertEqual(data['recommended_ratio'], 0.5)
+        self.assertEqual(data['textbook_required_ratio'], 0.5)
+        self.assertEqual(data['average_year_taken'], 2023)
+
+        # moving a review to another course moves its contribution
+        response = self.client.put(reverse('review_detail', kwargs={'review_id': first}), {
+            "school": self.school.short_name,
+            "course": f"{self.other_course.subject} {self.other_course.catalog_number}",
+            "review_text": "Moved review",
+            "term": "Summer",
+            "grade_received": "C",
+            "delivery_method": "In Person",
+            "year_taken": 2022,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_course_stats(self.course)['grade_counts'], {"B": 1})
+        self.assertEqual(self.get_course_stats(self.other_course)['grade_counts'], {"A": 1, "C": 1})
+
+        response = self.client.delete(reverse('review_detail', kwargs={'review_id': first}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get(reverse('school_stats', kwargs={'short_name': self.school.short_name}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['review_count'], 2)
+        self.assertEqual(response.data['data']['delivery_method_counts'], {"Hybrid": 1, "Online": 1})
+
+        # the incrementally maintained rows match a rebuild from scratch
+        call_command('rebuild_review_stats', '--verify-only', stdout=StringIO())
+
+    def test_stats_for_course_without_reviews(self):
+        data = self.get_course_stats(self.course)
+        self.assertEqual(data['review_count'], 0)
+        self.assertIsNone(data['recommended_ratio'])
+
+        response = self.client.get(reverse('course_stats', kwargs={
+            'short_name': self.school.short_name, 'subject': "CS", 'catalog_number': "999"}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('school_stats', kwargs={'short_name': "NOPE"}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_rebuild_command_repairs_drifted_stats(self):
+        for grade in ("A", "B", "B"):
+            Review.objects.create(
+                school=self.school, course=self.course, review_text="Imported review",
+                term="Fall", grade_received=grade, delivery_method="Online")
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_review_stats', '--verify-only',
+                         stdout=StringIO(), stderr=StringIO())
+
+        call_command('rebuild_review_stats', stdout=StringIO())
+        self.assertEqual(self.get_course_stats(self.course)['grade_counts'], {"A": 1, "B": 2})
+
+
+@override_settings(ROOT_URLCONF="backend.asgi_urls")
+class TestAsyncReadViews(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.school = School.objects.create(
+            long_name="Async School", short_name="ASY", city="Test City",
+            state="Test State", country="Test Country")
+        self.course = Course.objects.create(
+            school=self.school, subject="CS", catalog_number="135", title="Computer Science I")
+        self.reviews = [
+            Review.objects.create(
+                school=self.school, course=self.course, review_text=f"Async review {i}",
+                term="Fall", grade_received="A", delivery_method="Online", recommended=bool(i % 2))
+            for i in range(3)
+        ]
+
+    def test_read_views_are_coroutines(self):
+        for url in (reverse('schools'), reverse('review_list'),
+                    reverse('school_courses', kwargs={'short_name': self.school.short_name})):
+            self.assertTrue(iscoroutinefunction(resolve(url).func), url)
+
+    async def test_should_serve_the_same_data_as_the_sync_views(self):
+        urls = [
+            reverse('schools'),
+            reverse('school', kwargs={'short_name': self.school.short_name}),
+            reverse('review_list'),
+            reverse('review_detail', kwargs={'review_id': self.reviews[0].pk}),
+            reverse('school_reviews', kwargs={'short_name': self.school.short_name}) + "?recommended=true",
+            reverse('school_courses', kwargs={'short_name': self.school.short_name}),
+            reverse('school_courses', kwargs={'short_name': self.school.short_name}) + "?q=comp",
+        ]
+        for url in urls:
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            with override_settings(ROOT_URLCONF="backend.urls"):
+                expected = await sync_to_async(self.client.get)(url)
+            self.assertEqual(json.loads(response.content), json.loads(expected.content), url)
+
+        response = await self.async_client.get(reverse('school_reviews', kwargs={'short_name': 'NOPE'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.get(reverse('review_list'), {'recommended': 'maybe'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_should_answer_conditional_gets_and_profile_queries(self):
+        url = reverse('school_reviews', kwargs={'short_name': self.school.short_name})
+        response = await self.async_client.get(url)
+        self.assertRegex(response["Server-Timing"], r'desc="[1-9]\d* queries"')
+        response = await self.async_client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_should_send_writes_to_the_sync_views(self):
+        response = self.client.post(reverse('review_list'), {
+            "school": self.school.short_name, "course": "CS 135", "review_text": "Written under ASGI",
+            "term": "Spring", "grade_received": "B", "delivery_method": "Hybrid",
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        response = self.client.delete(reverse('review_detail', kwargs={'review_id': self.reviews[0].pk}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_test"], RESPONSE_CACHE_ENABLED=False)
+class TestReadReplicas(APITestCase):
+    databases = {"default", "replica_test"}
+
+    def setUp(self):
+        # the stand-in replica is a separate database, so a school only it
+        # holds shows which one a request read
+        School.objects.using("replica_test").create(
+            long_name="Replica University", short_name="REPL", city="Test City",
+            state="Test State", country="Test Country")
+
+    def short_names(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [school["short_name"] for school in response.data["data"]]
+
+    def test_should_read_from_the_replica(self):
+        self.assertEqual(self.short_names(self.client.get(reverse('schools'))), ["REPL"])
+        response = self.client.get(reverse('school_reviews', kwargs={'short_name': "REPL"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_should_read_your_writes_after_writing(self):
+        response = self.client.post(reverse('schools'), {
+            "short_name": "PRIM", "long_name": "Primary University", "website": "https://primary.edu",
+            "city": "Test City", "state": "Test State", "country": "Test Country"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn("read_primary", response.cookies)
+        self.assertFalse(School.objects.using("replica_test").filter(short_name="PRIM").exists())
+
+        # the client that wrote reads from the default database, others do not
+        self.assertEqual(self.short_names(self.client.get(reverse('schools'))), ["PRIM"])
+        self.assertEqual(self.short_names(APIClient().get(reverse('schools'))), ["REPL"])
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_should_not_serve_cached_replica_reads_to_writers(self):
+        response_cache.cache.clear()
+        response = self.client.post(reverse('schools'), {
+            "short_name": "PRIM", "long_name": "Primary University", "website": "https://primary.edu",
+            "city": "Test City", "state": "Test State", "country": "Test Country"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # another client's replica read is cached under the versions the write bumped
+        self.assertEqual(self.short_names(APIClient().get(reverse('schools'))), ["REPL"])
+        self.assertEqual(self.short_names(self.client.get(reverse('schools'))), ["PRIM"])
+        self.assertEqual(self.short_names(APIClient().get(reverse('schools'))), ["REPL"])
+
+    def test_should_only_route_views_that_read_replicas(self):
+        RequestSchool.objects.using("replica_test").create(school_name="Replica Request")
+        response = self.client.get(reverse('school_requests'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"], [])
+
+    @override_settings(ROOT_URLCONF="backend.asgi_urls")
+    async def test_should_read_from_the_replica_in_async_views(self):
+        response = await self.async_client.get(reverse('schools'))
+        self.assertEqual(self.short_names(response), ["REPL"])
+
+
+class TestJSONRenderer(APITestCase):
+    data = {
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "created_at": datetime.datetime(2023, 9, 1, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc),
+        "naive": datetime.datetime(2023, 9, 1, 12, 30),
+        "day": datetime.date(2023, 9, 1),
+        "ratio": decimal.Decimal("0.75"),
+        "message": gettext_lazy("Reviews listed successfully"),
+        "text": "caf\u00e9 \u2028 \u2029 \"quoted\"",
+        "counts": {1: 2, "A": 3},
+        "errors": [ErrorDetail("This field is required.", code="required")],
+        "nested": [{"none": None, "flag": True, "float": 0.1}],
+    }
+
+    def test_should_render_what_drfs_renderer_renders(self):
+        expected = renderers.JSONRenderer().render(self.data)
+        self.assertEqual(JSONRenderer().render(self.data), expected)
+        with patch("utils.renderers.orjson", None):
+            self.assertEqual(JSONRenderer().render(self.data), expected)
+
+    def test_should_indent_when_asked(self):
+        media_type = "application/json; indent=4"
+        self.assertEqual(JSONRenderer().render(self.data, media_type),
+                         renderers.JSONRenderer().render(self.data, media_type))
+        self.assertEqual(JSONRenderer().render(None), b"")
+
+    def test_should_be_the_default_renderer(self):
+        response = self.client.get(reverse('review_list'))
+        self.assertIsInstance(response.accepted_renderer, JSONRenderer)
+
+
+# REVIEW ADMIN TESTS
+# the admin's pages link static files, which are not collected for tests
+@override_settings(STORAGES={"staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}})
+class TestReviewAdmin(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("reviewadmin", "reviewadmin@example.com", "password123")
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:review_review_changelist')
+        self.schools = [
+            School.objects.create(long_name=f"School {name}", short_name=name, city="City", state="State",
+                                  country="Country")
+            for name in ("AAA", "BBB")]
+        self.courses = [
+            Course.objects.create(school=school, subject="CS", catalog_number=number, title="Course")
+            for school in self.schools for number in ("135", "202")]
+
+    def add_reviews(self, count):
+        Review.objects.bulk_create(
+            Review(school=course.school, course=course, review_text="Review", term="Spring",
+                   grade_received="A", delivery_method="Online", year_taken=2023)
+            for i in range(count) for course in [self.courses[i % len(self.courses)]])
+
+    def changelist(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, [query['sql'] for query in queries]
+
+    def test_should_list_any_number_of_reviews_in_the_same_queries(self):
+        self.add_reviews(4)
+        response, few = self.changelist()
+        self.assertEqual(response.context['cl'].result_count, 4)
+        self.add_reviews(40)
+        response, many = self.changelist()
+        self.assertEqual(response.context['cl'].result_count, 44)
+        # session, user, size estimate, count (the table is small), and the
+        # page of reviews with their schools and courses
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(len(many), 5)
+        self.assertContains(response, 'placeholder="SUBJ NUM or id"')
+
+    def test_should_estimate_the_count_of_large_tables(self):
+        self.add_reviews(8)
+        Review.objects.filter(course=self.courses[0]).delete()
+        with self.settings(ADMIN_ESTIMATED_COUNT_MIN=5):
+            response, queries = self.changelist()
+            # the estimate counts the deleted rows too
+            self.assertEqual(response.context['cl'].result_count, 8)
+            self.assertFalse(any('COUNT(' in query for query in queries))
+            self.assertEqual(len(queries), 4)
+
+            response, queries = self.changelist(school="AAA")
+            self.assertEqual(response.context['cl'].result_count, 2)
+            self.assertTrue(any('COUNT(' in query for query in queries))
+
+    def test_should_filter_by_school_and_course(self):
+        self.add_reviews(8)
+
+        def count(**params):
+            return self.changelist(**params)[0].context['cl'].result_count
+
+        self.assertEqual(count(school="AAA"), 4)
+        self.assertEqual(count(school=str(self.schools[1].pk)), 4)
+        self.assertEqual(count(school="AAA", course="CS 202"), 2)
+        self.assertEqual(count(course="CS 202"), 4)
+        self.assertEqual(count(course=str(self.courses[0].pk)), 2)
+        self.assertEqual(count(school="ZZZ"), 0)
+        self.assertEqual(count(school="AAA", course="CS 999"), 0)
+        self.assertEqual(count(course="CS"), 0)
+        self.assertEqual(count(year_taken="2023", recommended="1"), 8)
+
+    def test_should_keep_stats_in_step_with_admin_writes(self):
+        self.add_reviews(8)
+        rebuild_review_stats()
+        reviews = list(Review.objects.filter(course=self.courses[0]))
+
+        response = self.client.post(reverse('admin:review_review_change', args=[reviews[0].pk]), {
+            "id": reviews[0].pk, "school": self.schools[0].pk, "course": self.courses[1].pk, "review_text": "Edited",
+            "term": "Fall", "grade_received": "B", "delivery_method": "Online", "helpful_count": 0,
+            "year_taken": 2024, "recommended": "on"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(verify_review_stats(), [])
+
+        response = self.client.post(reverse('admin:review_review_delete', args=[reviews[1].pk]), {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(verify_review_stats(), [])
+
+        response = self.client.post(self.url, {
+            "action": "delete_selected", "post": "yes",
+            "_selected_action": [str(pk) for pk in Review.objects.filter(
+                course=self.courses[2]).values_list("pk", flat=True)]})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(SchoolReviewStats.objects.get(school=self.schools[1]).review_count, 2)
+        self.assertEqual(verify_review_stats(), [])
+
+        # deleting a course deletes its reviews, which its school no longer counts
+        response = self.client.post(reverse('admin:school_course_delete', args=[self.courses[1].pk]),
+                                    {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(SchoolReviewStats.objects.get(school=self.schools[0]).review_count, 0)
+        self.assertEqual(verify_review_stats(), [])
+
+        # and a deleted school takes its stats with it
+        self.schools[1].delete()
+        self.assertEqual(verify_review_stats(), [])
+
+    def test_should_search_schools_and_courses_in_the_form(self):
+        response = self.client.get(reverse('admin:autocomplete'), {
+            "app_label": "review", "model_name": "review", "field_name": "course", "term": "202"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['results']), 2)
+
+
+# THROTTLING TESTS
+@override_settings(THROTTLE_ENABLED=True, THROTTLE_RATES={'reviews.user': '2/min', 'school_requests.ip': '2/min'})
+class TestThrottling(APITestCase):
+    def setUp(self):
+        get_store().clear()
+        self.addCleanup(get_store().clear)
+
+    def post_school_request(self, name, address='10.0.0.1'):
+        return self.client.post(reverse('school_requests'), {
+            "school_name": name, "website": "https://www.test-university.com"}, REMOTE_ADDR=address)
+
+    def test_should_limit_writes(self):
+        for remaining in (1, 0):
+            response = self.client.post(reverse('review_list'), {}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response['RateLimit-Limit'], '2')
+            self.assertEqual(response['RateLimit-Remaining'], str(remaining))
+        response = self.client.post(reverse('review_list'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['RateLimit-Remaining'], '0')
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(response['RateLimit-Reset'], '60')
+
+        # reads are not limited
+        response = self.client.get(reverse('review_list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('RateLimit-Limit', response)
+
+    def test_should_limit_each_address_on_its_own(self):
+        self.assertEqual(self.post_school_request("A").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.post_school_request("B").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.post_school_request("C").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.post_school_request("C", '10.0.0.2').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(RequestSchool.objects.filter(school_name="C").count(), 1)
+
+    def test_should_admit_requests_at_the_steady_rate(self):
+        now = time.time()
+        with patch('utils.throttling.time.time', return_value=now):
+            self.post_school_request("A")
+            self.post_school_request("B")
+            self.assertEqual(self.post_school_request("C").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # one request every 30 seconds
+        with patch('utils.throttling.time.time', return_value=now + 30):
+            response = self.post_school_request("C")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(response['RateLimit-Remaining'], '0')
+            self.assertEqual(self.post_school_request("D").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        with patch('utils.throttling.time.time', return_value=now + 90):
+            response = self.post_school_request("D")
+            self.assertEqual(response['RateLimit-Remaining'], '1')
+
+    @override_settings(THROTTLE_STORE='utils.throttling.CacheStore')
+    def test_should_share_limits_through_the_cache(self):
+        self.assertNotIsInstance(get_store(), LocalStore)
+        self.post_school_request("A")
+        self.post_school_request("B")
+        self.assertEqual(self.post_school_request("C").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_should_forget_the_oldest_keys(self):
+        store = LocalStore()
+        now = time.time()
+        with self.settings(THROTTLE_LOCAL_MAX_KEYS=4):
+            for i in range(5):
+                store.acquire(f"key-{i}", now, 1, 0)
+            self.assertEqual(len(store._tats), 2)
+            self.assertEqual(store.acquire("key-4", now, 1, 0)[0], False)
+            self.assertEqual(store.acquire("key-0", now, 1, 0)[0], True)
+
+
 # SCHOOL REQUEST TESTS
 class TestSchoolRequestAIPView(APITestCase):
     # should delete a school request
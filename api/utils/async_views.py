@@ -0,0 +1,86 @@
+"""
+Async read views for the ASGI server.
+
+Django REST framework 3.14 dispatches synchronously, so AsyncAPIView runs
+the same request cycle (authentication, permissions, throttles, content
+negotiation, exception handling) around ``async def`` handlers. Under
+ASGI a request waiting on the database then holds a coroutine rather than
+a worker thread, so one process keeps thousands of connections open.
+
+Each URL keeps a single view, so ``read_async()`` joins an async view
+for reads with the existing sync view, which handles the other methods in
+a thread. backend.asgi_urls routes the read-heavy endpoints this way; the
+WSGI URLconf keeps the sync views alone.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from rest_framework import views
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class AsyncAPIView(views.APIView):
+    http_method_names = ["get", "head", "options"]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # csrf_exempt wraps the view in a plain function, hiding that it is async
+        if cls.view_is_async and not iscoroutinefunction(view):
+            markcoroutinefunction(view)
+        return view
+
+    def initial_blocks(self, request):
+        """Whether initial() may do I/O, so must not run on the event loop."""
+        if request.META.get("HTTP_AUTHORIZATION"):
+            # authenticating a token loads its user from the database
+            return True
+        # throttles keeping their counts outside the process, e.g. in a
+        # database cache; DRF's own ones use the cache
+        return any(getattr(throttle, "blocks", lambda request, view: True)(request, self)
+                   for throttle in self.get_throttles())
+
+    async def dispatch(self, request, *args, **kwargs):
+        # APIView.dispatch, awaiting the handler
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            if self.initial_blocks(request):
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+            else:
+                self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if iscoroutinefunction(handler):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def read_async(read_view, view):
+    """
+    One view function serving reads with the async read_view and every other
+    method with the sync view, in a thread. The sync view's class stands in
+    for both, e.g. for its query_budget.
+    """
+    write = sync_to_async(view)
+
+    async def dispatch(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await read_view(request, *args, **kwargs)
+        return await write(request, *args, **kwargs)
+
+    dispatch.view_class = view.view_class
+    dispatch.cls = view.cls
+    dispatch.csrf_exempt = True
+    return dispatch
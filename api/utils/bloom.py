@@ -0,0 +1,32 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    A set of strings that answers membership in a few microseconds and a
+    few bits per item. It has no false negatives. Its false positive rate is
+    about error_rate while it holds at most capacity items, and it rises
+    past that point.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(1, capacity)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(-(-self.size // 8))
+
+    def _positions(self, item):
+        # double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
@@ -0,0 +1,212 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+from backend.replicas import reads_primary
+from utils.conditional import (
+    Validators, aconditional_response, conditional_response, not_modified, set_validators)
+
+
+class TTLCache:
+    """
+    A bounded per-process LRU whose entries expire. The size and the TTL in
+    seconds are read from the named settings whenever an entry is set.
+    """
+
+    def __init__(self, size_setting, ttl_setting):
+        self.size_setting = size_setting
+        self.ttl_setting = ttl_setting
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """The value for key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[1]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + getattr(settings, self.ttl_setting))
+            self._entries.move_to_end(key)
+            while len(self._entries) > getattr(settings, self.size_setting):
+                self._entries.popitem(last=False)
+
+    def discard(self, predicate=None):
+        """Drop the entries for which predicate(key, value) is true, or all of them."""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [key for key, (value, _) in self._entries.items() if predicate(key, value)]:
+                del self._entries[key]
+
+
+class ResponseCache:
+    """
+    Cache for GET response bodies with versioned keys.
+
+    Every entry is stored under the current versions of the namespaces it
+    depends on (e.g. "schools", "reviews:UNLV"). Writes bump the versions of
+    the namespaces they touch, so stale entries are never read again and
+    simply expire. Versions live in the cache backend itself, so with a
+    shared backend (CACHE_BACKEND) every worker sees the same invalidations.
+    """
+
+    prefix = "response"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    @property
+    def enabled(self):
+        return settings.RESPONSE_CACHE_ENABLED
+
+    @property
+    def cache(self):
+        return caches[settings.RESPONSE_CACHE_ALIAS]
+
+    def _version_key(self, namespace):
+        return f"{self.prefix}:version:{namespace}"
+
+    def versions(self, namespaces):
+        keys = [self._version_key(namespace) for namespace in namespaces]
+        found = self.cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                # start from a fresh value so an evicted version can never
+                # line up with entries written under an earlier one
+                self.cache.add(key, time.time_ns(), None)
+                found[key] = self.cache.get(key)
+        return [found[key] for key in keys]
+
+    def invalidate(self, *namespaces):
+        for namespace in set(namespaces):
+            key = self._version_key(namespace)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, time.time_ns(), None)
+
+    def key(self, name, namespaces, request):
+        versions = self.versions(namespaces)
+        # links in paginated responses are absolute, so the host is part of the key
+        material = f"{request.get_host()}{request.get_full_path()}|{versions}"
+        return f"{self.prefix}:{name}:{hashlib.sha1(material.encode()).hexdigest()}"
+
+    def get(self, name, key):
+        value = self.cache.get(key)
+        with self._lock:
+            self._counters[name]["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key, value):
+        self.cache.set(key, value, settings.RESPONSE_CACHE_TIMEOUT)
+
+    def stats(self):
+        with self._lock:
+            counters = {name: dict(counts) for name, counts in self._counters.items()}
+        hits = sum(counts["hits"] for counts in counters.values())
+        misses = sum(counts["misses"] for counts in counters.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else None,
+            "views": counters,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._counters.clear()
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(request, name, namespaces, build, validators=None):
+    """
+    Serve a GET from the response cache, or call build() and cache its
+    result when it is a 200. Only the response data is stored, along with
+    the ETag/Last-Modified from validators(), so a conditional request that
+    hits the cache is answered without touching the database.
+
+    Clients that just wrote bypass the cache: another client's read from a
+    lagging replica may have been cached under the versions their write
+    bumped, and they must see their writes (see backend.replicas).
+    """
+    if not response_cache.enabled or reads_primary(request):
+        if validators is None:
+            return build()
+        return conditional_response(request, build, validators)
+
+    key = response_cache.key(name, namespaces, request)
+    entry = response_cache.get(name, key)
+    if entry is not None:
+        current = Validators(*entry["validators"]) if entry["validators"] else None
+    else:
+        current = validators() if validators else None
+
+    if current is not None:
+        response = not_modified(request, current)
+        if response is not None:
+            return response
+
+    if entry is not None:
+        response = Response(data=entry["data"], status=status.HTTP_200_OK)
+    else:
+        response = build()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        response_cache.set(key, {"data": response.data, "validators": current})
+    if current is not None:
+        set_validators(response, current)
+    return response
+
+
+async def acached_response(request, name, namespaces, build, validators=None):
+    """
+    cached_response() for async views: build and validators are coroutine
+    functions. The cache backend is called directly, as the in-process
+    default answers without blocking; a network backend briefly blocks the
+    event loop, which is still cheaper than handing each call to a thread.
+    """
+    if not response_cache.enabled or reads_primary(request):
+        if validators is None:
+            return await build()
+        return await aconditional_response(request, build, validators)
+
+    key = response_cache.key(name, namespaces, request)
+    entry = response_cache.get(name, key)
+    if entry is not None:
+        current = Validators(*entry["validators"]) if entry["validators"] else None
+    else:
+        current = await validators() if validators else None
+
+    if current is not None:
+        response = not_modified(request, current)
+        if response is not None:
+            return response
+
+    if entry is not None:
+        response = Response(data=entry["data"], status=status.HTTP_200_OK)
+    else:
+        response = await build()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        response_cache.set(key, {"data": response.data, "validators": current})
+    if current is not None:
+        set_validators(response, current)
+    return response
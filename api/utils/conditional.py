@@ -0,0 +1,96 @@
+import hashlib
+from collections import namedtuple
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import status
+
+
+class Validators(namedtuple("Validators", "etag last_modified")):
+    """
+    ETag and Last-Modified (a unix timestamp, or None) of a GET response.
+    """
+
+
+def get_validators(request, queryset, timestamps=("updated_at",), count="pk"):
+    """
+    Validators for the rows a response is rendered from, in one aggregate query.
+
+    The ETag covers max() of every timestamp field (related ones too, when
+    their string form is rendered), the row count, so deletions change it,
+    and the URL and media type, which select the representation.
+    Last-Modified is the newest timestamp; it cannot see deletions, but
+    clients that were given an ETag send If-None-Match, which takes
+    precedence over If-Modified-Since.
+    """
+    values = queryset.order_by().aggregate(**validator_aggregates(timestamps, count))
+    return validators_from(request, values, len(timestamps))
+
+
+async def aget_validators(request, queryset, timestamps=("updated_at",), count="pk"):
+    values = await queryset.order_by().aaggregate(**validator_aggregates(timestamps, count))
+    return validators_from(request, values, len(timestamps))
+
+
+def validator_aggregates(timestamps, count):
+    return {"count": Count(count), **{f"latest_{index}": Max(field) for index, field in enumerate(timestamps)}}
+
+
+def validators_from(request, values, timestamp_count):
+    latest = [values[f"latest_{index}"] for index in range(timestamp_count)]
+    material = "|".join([
+        request.get_host() + request.get_full_path(),
+        str(getattr(request, "accepted_media_type", "")),
+        str(values["count"]),
+        *(value.isoformat() if value else "" for value in latest),
+    ])
+    etag = '"%s"' % hashlib.sha1(material.encode()).hexdigest()
+    present = [value for value in latest if value is not None]
+    last_modified = int(max(present).timestamp()) if present else None
+    return Validators(etag, last_modified)
+
+
+def not_modified(request, validators):
+    """A 304 (or 412) response when the request's preconditions say so, else None."""
+    response = get_conditional_response(
+        request, etag=validators.etag, last_modified=validators.last_modified)
+    if response is not None:
+        set_validators(response, validators)
+    return response
+
+
+def set_validators(response, validators):
+    response["ETag"] = validators.etag
+    if validators.last_modified is not None:
+        response["Last-Modified"] = http_date(validators.last_modified)
+    # always revalidate instead of guessing a freshness lifetime from Last-Modified
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_response(request, build, validators):
+    """
+    Answer a GET from validators() alone when the client's copy is current,
+    otherwise build() the response and attach the validators to it.
+    """
+    current = validators()
+    response = not_modified(request, current)
+    if response is not None:
+        return response
+    response = build()
+    if response.status_code == status.HTTP_200_OK:
+        set_validators(response, current)
+    return response
+
+
+async def aconditional_response(request, build, validators):
+    """conditional_response() with coroutine functions for build and validators."""
+    current = await validators()
+    response = not_modified(request, current)
+    if response is not None:
+        return response
+    response = await build()
+    if response.status_code == status.HTTP_200_OK:
+        set_validators(response, current)
+    return response
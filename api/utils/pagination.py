@@ -0,0 +1,214 @@
+import base64
+import binascii
+import json
+import uuid
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination:
+    """
+    Cursor pagination over (created_at, id), newest first.
+
+    Each page is fetched with a range condition on the last row seen instead
+    of an OFFSET, so deep pages cost the same as the first one and rows
+    inserted while a client is paging never shift or repeat results.
+    Cursors are opaque base64 tokens; clients should follow the ``next`` and
+    ``previous`` links as returned.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size < 1:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, row, reverse):
+        position = {"c": row.created_at.isoformat(), "i": str(row.pk), "r": int(reverse)}
+        token = base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode())
+        return token.decode("ascii")
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            created_at = parse_datetime(position["c"])
+            if created_at is None:
+                raise ValueError(position["c"])
+            return created_at, uuid.UUID(position["i"]), bool(position["r"])
+        except (AttributeError, binascii.Error, KeyError, TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def page_queryset(queryset, cursor, page_size):
+        """
+        The query for the page after (or, for a reverse cursor, before) the
+        (created_at, id, reverse) cursor, with one extra row.
+        """
+        reverse = bool(cursor and cursor[2])
+        if cursor:
+            created_at, pk = cursor[0], cursor[1]
+            # the redundant range on created_at alone is what lets the
+            # database seek into the (created_at, id) index rather than scan
+            # it from the start; it cannot do that with the OR
+            if reverse:
+                # rows that come before the cursor in newest-first order
+                queryset = queryset.filter(created_at__gte=created_at).filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+            else:
+                queryset = queryset.filter(created_at__lte=created_at).filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        if reverse:
+            queryset = queryset.order_by("created_at", "id")
+        else:
+            queryset = queryset.order_by("-created_at", "-id")
+        return queryset[:page_size + 1]
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        # one extra row tells us whether there is a further page
+        return self.set_page(list(self.page_queryset(queryset, cursor, page_size)), cursor, page_size)
+
+    async def apaginate_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        rows = [row async for row in self.page_queryset(queryset, cursor, page_size)]
+        return self.set_page(rows, cursor, page_size)
+
+    def set_page(self, rows, cursor, page_size):
+        reverse = bool(cursor and cursor[2])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1], reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        if not self.page:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[0], reverse=True))
+
+    def get_links(self):
+        return {"next": self.get_next_link(), "previous": self.get_previous_link()}
+
+
+class RankedPagination(KeysetPagination):
+    """
+    Forward-only cursor pagination for search results, best match first.
+
+    The cursor holds the (rank, id) of the last result; paginate_search()
+    calls search(after=..., limit=...), which must return rows with ``rank``
+    and ``pk`` ordered by rank descending, then id.
+    """
+
+    def encode_cursor(self, row, reverse=False):
+        position = {"k": row.rank, "i": str(row.pk)}
+        token = base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode())
+        return token.decode("ascii")
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            return float(position["k"]), uuid.UUID(position["i"])
+        except (AttributeError, binascii.Error, KeyError, TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_search(self, search, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        rows = search(after=self.decode_cursor(request), limit=page_size + 1)
+        self.has_next = len(rows) > page_size
+        self.has_previous = False
+        self.page = rows[:page_size]
+        return self.page
+
+
+def estimated_count(model, using):
+    """
+    The database's estimate of the number of rows in model's table, read
+    from its statistics without scanning the table, or None if it has none.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    if connection.vendor == "postgresql":
+        # kept up to date by VACUUM and ANALYZE; -1 until the first of them
+        sql, params = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table]
+    elif connection.vendor == "mysql":
+        sql, params = ("SELECT table_rows FROM information_schema.tables "
+                       "WHERE table_schema = DATABASE() AND table_name = %s", [model._meta.db_table])
+    elif connection.vendor == "sqlite":
+        # rowids count up from 1, so this overcounts by the rows deleted
+        sql, params = f"SELECT MAX(_rowid_) FROM {table}", []
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A Paginator for admin changelists of large tables. An unfiltered
+    changelist is counted from the database's estimate of the table size
+    instead of a COUNT(*), which reads the whole table, once the estimate
+    reaches ADMIN_ESTIMATED_COUNT_MIN rows. Filtered changelists are
+    counted exactly. The last pages of an overestimated table are empty.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_MIN:
+                return estimate
+        return super().count
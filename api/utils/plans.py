@@ -0,0 +1,115 @@
+"""
+EXPLAIN the queries the views run and check the indexes they use.
+
+Each QueryPlanCheck is one of the views' queries, built the way the view
+builds it from ids sampled out of the database, along with the index it
+should use. A check fails when the plan does not name that index, reads
+the whole table, or sorts rows that an index should have returned in
+order. ``manage.py check_query_plans`` runs them all.
+
+Plans depend on the data: run the checks against a realistically sized
+(seeded) database, particularly on PostgreSQL, whose planner prefers
+sequential scans of small tables.
+"""
+import re
+import uuid
+from dataclasses import dataclass
+
+# patterns of plan lines that give a query away, by connection.vendor
+FULL_SCAN = {
+    "sqlite": r"\bSCAN {table}\b(?! USING)",
+    "postgresql": r"\bSeq Scan on {table}\b",
+}
+SORT = {
+    "sqlite": r"\bUSE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY\b",
+    "postgresql": r"(^|->  )(Incremental )?Sort  \(",
+}
+
+
+@dataclass
+class QueryPlanCheck:
+    name: str
+    queryset: object
+    # the index the plan must name; None where the backend names it (unique
+    # constraints on SQLite are sqlite_autoindex_*) and not scanning is enough
+    index: str = None
+
+    def explain(self):
+        return self.queryset.explain()
+
+    def problems(self, plan, vendor):
+        table = self.queryset.model._meta.db_table
+        problems = []
+        if self.index and self.index not in plan:
+            problems.append(f"does not use {self.index}")
+        if vendor in FULL_SCAN and re.search(FULL_SCAN[vendor].format(table=re.escape(table)), plan):
+            problems.append(f"scans all of {table}")
+        if self.queryset.query.order_by and vendor in SORT and re.search(SORT[vendor], plan, re.MULTILINE):
+            problems.append("sorts instead of reading an index in order")
+        return problems
+
+
+def sample_ids():
+    """Ids of a review with a course, and what the checks need around it, or None without one."""
+    from authentication.models import User
+    from review.models import Review
+
+    sample = (
+        Review.objects.filter(course__isnull=False)
+        .values("id", "school_id", "course_id", "created_at", "school__short_name",
+                "course__subject", "course__catalog_number")
+        .first()
+    )
+    if sample is None:
+        return None
+    sample["user_id"] = User.objects.values_list("id", flat=True).first() or uuid.UUID(int=0)
+    sample["latest_update"] = Review.objects.order_by("-updated_at").values_list("updated_at", flat=True).first()
+    return sample
+
+
+def view_query_checks(sample):
+    from django.conf import settings
+
+    from requestschool.models import RequestSchool
+    from review.export import export_queryset
+    from review.models import CourseReviewStats, ReviewVote, SchoolReviewStats
+    from review.views import ReviewAPIView
+    from school.models import Course, School
+    from utils.pagination import KeysetPagination
+
+    page = KeysetPagination.page_queryset
+    page_size = settings.API_PAGE_SIZE
+    reviews = ReviewAPIView().get_queryset()
+    school_reviews = reviews.filter(school_id=sample["school_id"])
+    course_reviews = school_reviews.filter(course_id=sample["course_id"])
+    next_page = (sample["created_at"], sample["id"], False)
+    previous_page = (sample["created_at"], sample["id"], True)
+    return [
+        QueryPlanCheck("review_list", page(reviews, None, page_size), "review_created_id_idx"),
+        QueryPlanCheck("review_list next page", page(reviews, next_page, page_size), "review_created_id_idx"),
+        QueryPlanCheck("review_list previous page", page(reviews, previous_page, page_size),
+                       "review_created_id_idx"),
+        QueryPlanCheck("review_detail", reviews.filter(id=sample["id"])),
+        QueryPlanCheck("school_reviews", page(school_reviews, None, page_size), "review_school_created_id_idx"),
+        QueryPlanCheck("school_reviews next page", page(school_reviews, next_page, page_size),
+                       "review_school_created_id_idx"),
+        QueryPlanCheck("school_reviews ?course=", page(course_reviews, None, page_size),
+                       "review_course_created_id_idx"),
+        QueryPlanCheck("school_reviews ?course=&recommended=true",
+                       page(course_reviews.filter(recommended=True), None, page_size),
+                       "review_course_recommended_idx"),
+        QueryPlanCheck("review_export ?since=", export_queryset(since=sample["latest_update"]),
+                       "review_updated_id_idx"),
+        QueryPlanCheck("review_helpful", ReviewVote.objects.filter(review_id=sample["id"], user_id=sample["user_id"])),
+        QueryPlanCheck("school", School.objects.filter(short_name=sample["school__short_name"])),
+        QueryPlanCheck("school_courses", page(Course.objects.filter(school_id=sample["school_id"]), None, page_size),
+                       "course_school_created_id_idx"),
+        QueryPlanCheck("school_courses ?q= index build", Course.objects.filter(
+            school_id=sample["school_id"]).order_by("subject", "catalog_number")),
+        QueryPlanCheck("course by code", Course.objects.filter(
+            school_id=sample["school_id"], subject=sample["course__subject"],
+            catalog_number=sample["course__catalog_number"])),
+        QueryPlanCheck("school_stats", SchoolReviewStats.objects.filter(school_id=sample["school_id"])),
+        QueryPlanCheck("course_stats", CourseReviewStats.objects.filter(course_id=sample["course_id"])),
+        QueryPlanCheck("school_request", RequestSchool.objects.filter(school_name="Requested University")),
+    ]
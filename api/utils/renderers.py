@@ -0,0 +1,41 @@
+"""
+JSON rendering with orjson.
+
+JSONRenderer is the API's default renderer (REST_FRAMEWORK in settings). It
+produces the same JSON as DRF's renderer, several times faster on large
+lists, with orjson when it is installed; otherwise, and for indented
+output (``Accept: application/json; indent=4``, the browsable API), it
+falls back to DRF's stdlib encoder.
+"""
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# DRF's encoder writes UTC datetimes with a Z and allows non-string keys
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+drf_encoder = encoders.JSONEncoder()
+
+
+def default(obj):
+    # everything orjson does not know natively: Decimal, lazy strings,
+    # querysets, timedeltas...
+    return drf_encoder.default(obj)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        ret = orjson.dumps(data, default=default, option=ORJSON_OPTIONS)
+        # like DRF, escape the line separators that are not valid in
+        # JavaScript strings
+        if b"\xe2\x80" in ret:
+            ret = ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+        return ret
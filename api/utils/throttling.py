@@ -0,0 +1,199 @@
+"""
+Request rate limits for the auth and write endpoints.
+
+Views name a throttle_scope, either for every method or per method (e.g.
+``{"POST": "reviews"}``), and list the throttles that apply in
+throttle_classes. THROTTLE_RATES maps "<scope>.<kind>" to a DRF-style rate
+such as "5/min". The kind is "ip", "user" or "email", and a scope with no
+rate for a kind is not limited by it.
+
+Limits are enforced with GCRA (the generic cell rate algorithm), which
+keeps one timestamp per key. That timestamp is the theoretical arrival
+time (TAT): the time at which the key will have used up nothing. Each
+admitted request pushes the TAT one emission interval (period / limit)
+later. A request is refused when the TAT is more than period - interval
+ahead of now. This allows bursts of up to the limit and a steady rate of
+limit per period, like a sliding window, in O(1) time and space per key.
+
+The TATs are kept by THROTTLE_STORE:
+
+- LocalStore keeps them in the process, so each worker applies the limits
+  on its own.
+- CacheStore keeps them in the THROTTLE_CACHE_ALIAS cache, so with a
+  shared backend (Redis, memcached, or Django's database cache) all
+  workers share them. Its read-then-write is not atomic, so concurrent
+  requests for one key can occasionally both be admitted.
+
+Responses carry RateLimit-Limit, RateLimit-Remaining and RateLimit-Reset
+for the most restrictive limit checked. Refused requests get 429 with
+Retry-After.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """(requests, period in seconds) for a rate such as "5/min"."""
+    count, period = rate.split("/")
+    return int(count), DURATIONS[period[0]]
+
+
+def gcra(tat, now, interval, tolerance):
+    """(admitted, TAT after the request) for a key whose TAT is tat, or None."""
+    tat = now if tat is None or tat < now else tat
+    if tat - now > tolerance:
+        return False, tat
+    return True, tat + interval
+
+
+class LocalStore:
+    """TATs in this process, for at most THROTTLE_LOCAL_MAX_KEYS keys."""
+
+    def __init__(self):
+        self._tats = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, now, interval, tolerance):
+        with self._lock:
+            admitted, tat = gcra(self._tats.get(key), now, interval, tolerance)
+            self._tats[key] = tat
+            if len(self._tats) > settings.THROTTLE_LOCAL_MAX_KEYS:
+                self._prune(now)
+            return admitted, tat
+
+    def _prune(self, now):
+        # keys whose TAT has passed are the same as missing ones; if that is
+        # not enough, the oldest keys are forgotten, which only forgives them
+        self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+        excess = len(self._tats) - settings.THROTTLE_LOCAL_MAX_KEYS // 2
+        if excess > 0:
+            for key in list(self._tats)[:excess]:
+                del self._tats[key]
+
+    def clear(self):
+        with self._lock:
+            self._tats.clear()
+
+
+class CacheStore:
+    """TATs in the THROTTLE_CACHE_ALIAS cache, shared by every worker using it."""
+
+    prefix = "throttle"
+
+    def acquire(self, key, now, interval, tolerance):
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        key = f"{self.prefix}:{key}"
+        admitted, tat = gcra(cache.get(key), now, interval, tolerance)
+        if admitted:
+            cache.set(key, tat, math.ceil(tat - now))
+        return admitted, tat
+
+    def clear(self):
+        caches[settings.THROTTLE_CACHE_ALIAS].clear()
+
+
+_stores = {}
+
+
+def get_store():
+    path = settings.THROTTLE_STORE
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
+
+
+def get_scope(view, method):
+    scope = getattr(view, "throttle_scope", None)
+    if isinstance(scope, dict):
+        return scope.get(method)
+    return scope
+
+
+def set_rate_limit_headers(view, limit, remaining, reset):
+    # several throttles may apply: report the one closest to refusing
+    headers = view.headers
+    if "RateLimit-Remaining" in headers and int(headers["RateLimit-Remaining"]) <= remaining:
+        return
+    headers["RateLimit-Limit"] = str(limit)
+    headers["RateLimit-Remaining"] = str(remaining)
+    headers["RateLimit-Reset"] = str(reset)
+
+
+class GCRAThrottle(BaseThrottle):
+    kind = None
+
+    def get_key(self, request):
+        """The key requests are counted under, or None to not limit the request."""
+        raise NotImplementedError(".get_key() must be overridden")
+
+    def get_rate(self, request, view):
+        """(scope, rate) if the request is limited by this throttle, else (scope, None)."""
+        scope = get_scope(view, request.method)
+        if not settings.THROTTLE_ENABLED or not scope:
+            return scope, None
+        return scope, settings.THROTTLE_RATES.get(f"{scope}.{self.kind}")
+
+    def blocks(self, request, view):
+        """Whether allow_request() may wait on I/O; async views then call it from a thread."""
+        return self.get_rate(request, view)[1] is not None and not isinstance(get_store(), LocalStore)
+
+    def allow_request(self, request, view):
+        self.delay = None
+        scope, rate = self.get_rate(request, view)
+        if rate is None:
+            return True
+        key = self.get_key(request)
+        if key is None:
+            return True
+
+        limit, period = parse_rate(rate)
+        interval = period / limit
+        now = time.time()
+        admitted, tat = get_store().acquire(f"{scope}.{self.kind}:{key}", now, interval, period - interval)
+        if admitted:
+            remaining = int((period - (tat - now)) / interval + 1e-9)
+        else:
+            remaining = 0
+            self.delay = tat - now - (period - interval)
+        set_rate_limit_headers(view, limit, remaining, math.ceil(tat - now))
+        return admitted
+
+    def wait(self):
+        return self.delay
+
+
+class IPRateThrottle(GCRAThrottle):
+    kind = "ip"
+
+    def get_key(self, request):
+        # REMOTE_ADDR, or X-Forwarded-For behind NUM_PROXIES proxies
+        return self.get_ident(request)
+
+
+class UserRateThrottle(GCRAThrottle):
+    """Limits authenticated users by id and anonymous requests by address."""
+    kind = "user"
+
+    def get_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return str(request.user.pk)
+        return f"ip:{self.get_ident(request)}"
+
+
+class EmailRateThrottle(GCRAThrottle):
+    """Limits requests by the email address in their body, e.g. per account on login."""
+    kind = "email"
+
+    def get_key(self, request):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return email.strip().lower()
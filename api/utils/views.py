@@ -0,0 +1,38 @@
+from rest_framework import permissions, status, views
+from rest_framework.response import Response
+
+from backend.middleware import request_metrics
+from utils.cache import response_cache
+
+
+class CacheStatsAPIView(views.APIView):
+    """
+    Response cache hit/miss counters of the process serving the request.
+    """
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        response = {
+            "message": "Cache stats retrieved successfully",
+            "data": response_cache.stats(),
+        }
+        return Response(data=response, status=status.HTTP_200_OK)
+
+
+class RequestMetricsAPIView(views.APIView):
+    """
+    Latency, query and size totals per URL name, from the process serving
+    the request (see backend.middleware). DELETE resets them.
+    """
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        response = {
+            "message": "Request metrics retrieved successfully",
+            "data": request_metrics.snapshot(),
+        }
+        return Response(data=response, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        request_metrics.reset()
+        return Response({"message": "Request metrics reset", "data": []}, status=status.HTTP_200_OK)
@@ -0,0 +1,190 @@
+"""
+Reusable course catalog scraper.
+
+Pages are fetched by a bounded thread pool, with a minimum interval between
+requests to the same host. Every page is kept in an on-disk cache along
+with its ETag/Last-Modified validators. On later runs fresh pages are not
+requested at all and stale ones are revalidated, so only pages that changed
+are downloaded again. Rows are written out as soon as the pages before
+them are done; the whole catalog is never held in memory. They go to a
+temporary file beside the output CSV, which replaces it only once every
+page has been scraped, so a failed run leaves the previous CSV intact.
+"""
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+import requests
+from bs4 import BeautifulSoup
+
+HEADER = ["Subject", "Catalog Number", "Title"]
+
+
+class HostRateLimiter:
+    """Allow at most one request per `interval` seconds to each host."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class PageCache:
+    """HTML pages and their HTTP validators, one pair of files per URL."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url):
+        name = hashlib.sha1(url.encode()).hexdigest()
+        return self.directory / f"{name}.html", self.directory / f"{name}.json"
+
+    def get(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            return body_path.read_text(encoding="utf-8"), meta
+        except (OSError, ValueError):
+            return None, {}
+
+    def put(self, url, body, meta):
+        body_path, meta_path = self._paths(url)
+        body_path.write_text(body, encoding="utf-8")
+        meta_path.write_text(json.dumps(meta))
+
+
+class CatalogScraper:
+    def __init__(self, base_url, cache_dir, workers=4, min_interval=0.25, max_age=0, timeout=30):
+        self.base_url = base_url
+        self.cache = PageCache(cache_dir)
+        self.workers = workers
+        self.limiter = HostRateLimiter(min_interval)
+        self.max_age = max_age
+        self.timeout = timeout
+        self._local = threading.local()
+        self.stats = {"downloaded": 0, "not_modified": 0, "cached": 0}
+        self._stats_lock = threading.Lock()
+
+    def page_url(self, page):
+        parts = urlsplit(self.base_url)
+        query = parse_qs(parts.query)
+        query["page"] = [str(page)]
+        return urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+
+    def _session(self):
+        # requests.Session is not thread safe, so each worker keeps its own
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def fetch(self, url):
+        body, meta = self.cache.get(url)
+        if body is not None and time.time() - meta.get("fetched_at", 0) < self.max_age:
+            self._count("cached")
+            return body
+
+        headers = {}
+        if body is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        self.limiter.wait(url)
+        response = self._session().get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and body is not None:
+            meta["fetched_at"] = time.time()
+            self.cache.put(url, body, meta)
+            self._count("not_modified")
+            return body
+
+        response.raise_for_status()
+        self.cache.put(url, response.text, {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        })
+        self._count("downloaded")
+        return response.text
+
+    @staticmethod
+    def last_page(html):
+        """Highest ?page= number linked from the pager, 0 if there is none."""
+        soup = BeautifulSoup(html, "html.parser")
+        pages = [0]
+        for link in soup.select("a[href*='page=']"):
+            match = re.search(r"[?&]page=(\d+)", link["href"])
+            if match:
+                pages.append(int(match.group(1)))
+        return max(pages)
+
+    @staticmethod
+    def parse_rows(html):
+        soup = BeautifulSoup(html, "html.parser")
+        table = soup.find("table", class_="table table-hover")
+        if table is None:
+            return []
+        rows = []
+        for row in table.find_all("tr"):
+            # professor and type columns follow the first three
+            cells = [cell.text.strip() for cell in row.find_all("td")][:3]
+            if len(cells) == 3 and all(cells):
+                rows.append(cells)
+        return rows
+
+    def scrape(self, output_path):
+        """Scrape every page into output_path and return the number of rows written."""
+        started = time.perf_counter()
+        first = self.fetch(self.page_url(0))
+        pages = self.last_page(first) + 1
+
+        seen = set()
+        written = 0
+        output_path = Path(output_path)
+        partial_path = output_path.with_name(f".{output_path.name}.partial")
+        try:
+            with open(partial_path, "w", newline="", encoding="utf-8") as output, \
+                    ThreadPoolExecutor(max_workers=self.workers) as pool:
+                writer = csv.writer(output)
+                writer.writerow(HEADER)
+                # map() yields in page order while later pages are still downloading
+                results = pool.map(lambda page: self.fetch(self.page_url(page)), range(1, pages))
+                for html in chain([first], results):
+                    for row in self.parse_rows(html):
+                        key = tuple(row)
+                        if key not in seen:
+                            seen.add(key)
+                            writer.writerow(row)
+                            written += 1
+                    output.flush()
+                os.fsync(output.fileno())
+            os.replace(partial_path, output_path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        self.elapsed = time.perf_counter() - started
+        self.pages = pages
+        return written
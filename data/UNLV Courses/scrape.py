@@ -1,35 +1,124 @@
+import argparse
+import hashlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
 import requests
-import pandas as pd
-from bs4 import BeautifulSoup
 
-row_data = []
+from catalog_scraper import CatalogScraper
+
+HERE = Path(__file__).resolve().parent
+CATALOG_URL = "https://www.unlv.edu/online/courses"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves fixtures/page-<n>.html for ?page=<n>, with ETags, like the real site."""
+
+    fixtures = HERE / "fixtures"
+
+    def do_GET(self):
+        page = parse_qs(urlsplit(self.path).query).get("page", ["0"])[0]
+        path = self.fixtures / f"page-{page}.html"
+        if not page.isdigit() or not path.exists():
+            self.send_error(404)
+            return
+        body = path.read_bytes()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(scraper, output):
+    rows = scraper.scrape(output)
+    rate = scraper.pages / scraper.elapsed if scraper.elapsed else 0
+    print(
+        f"{rows} courses from {scraper.pages} pages in {scraper.elapsed:.2f}s "
+        f"({rate:.1f} pages/sec; {scraper.stats['downloaded']} downloaded, "
+        f"{scraper.stats['not_modified']} not modified, {scraper.stats['cached']} from cache)"
+    )
+    return rows
+
 
-# Not a dynamic way to go through every page, but works for our case.
-for i in range(0, 64):
-    url = "https://www.unlv.edu/online/courses?page={0}".format(i)
+def offline(args):
+    """Scrape the saved fixtures twice through a local server and check the results."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/online/courses"
+    cache_dir = HERE / ".cache" / "offline"
+    for path in cache_dir.glob("*"):
+        path.unlink()
+    output = HERE / ".cache" / "offline-courses.csv"
+    try:
+        first = CatalogScraper(url, cache_dir, workers=args.workers, min_interval=0)
+        rows = run(first, output)
+        # the second run revalidates every page and downloads nothing
+        second = CatalogScraper(url, cache_dir, workers=args.workers, min_interval=0)
+        run(second, output)
 
-    # Send a GET request to the URL
-    response = requests.get(url)
-    print(response)
+        # a run that fails part way through leaves the previous output as it was
+        before = output.read_bytes()
+        broken = CatalogScraper(url, cache_dir, workers=args.workers, min_interval=0)
+        page_url = broken.page_url
+        broken.page_url = lambda page: page_url(page) if page < 2 else f"{url}?page=missing"
+        try:
+            broken.scrape(output)
+            kept = False
+        except requests.HTTPError:
+            kept = output.read_bytes() == before and not list(output.parent.glob(f".{output.name}.*"))
+    finally:
+        server.shutdown()
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    table = soup.find("table", class_ = "table table-hover")
+    lines = output.read_text(encoding="utf-8").splitlines()
+    checks = [
+        (first.pages == 3, f"expected 3 pages, found {first.pages}"),
+        (rows == 8 and len(lines) == 9, f"expected 8 unique courses, wrote {rows}"),
+        (lines[1] == "AAS,101,African American Survey", f"unexpected first row {lines[1]!r}"),
+        (second.stats["downloaded"] == 0, "re-run downloaded unchanged pages"),
+        (kept, "a failed run changed the previous output"),
+    ]
+    failures = [message for ok, message in checks if not ok]
+    for message in failures:
+        print(f"FAIL: {message}")
+    print("offline check passed" if not failures else "offline check failed")
+    return 1 if failures else 0
 
-    for row in table.find_all('tr'):
-        col = row.find_all('td')
-        col = [tr.text.strip() for tr in col]
-        row_data.append(col)
-    
-    #time.sleep(1)
 
-df = pd.DataFrame(row_data)
+def main(argv):
+    parser = argparse.ArgumentParser(description="Scrape the UNLV online course catalog into courses.csv")
+    parser.add_argument("--url", default=CATALOG_URL)
+    parser.add_argument("--output", default=str(HERE / "courses.csv"))
+    parser.add_argument("--cache-dir", default=str(HERE / ".cache" / "pages"))
+    parser.add_argument("--workers", type=int, default=4, help="concurrent page fetches")
+    parser.add_argument("--min-interval", type=float, default=0.25,
+                        help="minimum seconds between requests to the same host")
+    parser.add_argument("--max-age", type=float, default=0,
+                        help="reuse cached pages younger than this many seconds without asking the server")
+    parser.add_argument("--offline", action="store_true",
+                        help="run against the saved fixtures on a local server instead of the live site")
+    args = parser.parse_args(argv)
 
-# Drop professor and type columns, drop empty rows
-df.drop(df.columns[[3,4]], axis=1, inplace=True)
-df.dropna(inplace=True)
+    if args.offline:
+        return offline(args)
+    scraper = CatalogScraper(args.url, args.cache_dir, workers=args.workers,
+                             min_interval=args.min_interval, max_age=args.max_age)
+    run(scraper, args.output)
+    return 0
 
-# Drop all duplicate courses
-df.drop_duplicates(keep='first', inplace=True)
 
-# Save to csv file with appropriate header
-df.to_csv('courses.csv', sep=',', index=False, header=['Subject', 'Catalog Number', 'Title'])
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))